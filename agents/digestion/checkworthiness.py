@@ -0,0 +1,47 @@
+from typing import List, Any
+from agents.digestion.base import DigestionAgent
+from agents.digestion.claim_extraction import CLAIM_KEYWORDS
+from agents.digestion.harm_assessment import HarmAssessmentAgent
+from agents.digestion.novelty_scoring import NoveltyScoringAgent
+from schemas.claim import Claim
+from services.observability import observability_service
+
+# Claims extracted only because they contain a number are worth this much
+# of a claim mentioning a crisis keyword
+NUMBER_ONLY_FACTOR = 0.5
+
+class CheckworthinessAgent(DigestionAgent):
+    """
+    Cheap first stage of the verification cascade.
+
+    Scores checkworthiness from novelty and crisis keywords, and harm
+    potential from harm keywords, without any model. The gate score
+    decides whether a claim is worth evidence retrieval and NLI.
+    """
+    def __init__(self):
+        super().__init__(name="CheckworthinessAgent")
+        self.novelty_agent = NoveltyScoringAgent()
+        self.harm_agent = HarmAssessmentAgent()
+
+    async def process(self, item: Any) -> Any:
+        return item
+
+    async def process_claims(self, claims: List[Claim]) -> List[Claim]:
+        # Novelty sets the base checkworthiness; harm sets harm_potential
+        await self.novelty_agent.process_claims(claims)
+        await self.harm_agent.process_claims(claims)
+
+        for claim in claims:
+            text = claim.text.lower()
+            if not any(k in text for k in CLAIM_KEYWORDS):
+                claim.checkworthiness *= NUMBER_ONLY_FACTOR
+            observability_service.log_info(
+                f"Claim {claim.id} checkworthiness: {claim.checkworthiness:.2f}"
+            )
+
+        return claims
+
+    @staticmethod
+    def gate_score(claim: Claim) -> float:
+        """Score compared with the cascade threshold; harmful claims always count"""
+        return max(claim.checkworthiness, claim.harm_potential)
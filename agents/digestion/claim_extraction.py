@@ -5,6 +5,9 @@ from schemas.item import NormalizedItem
 from schemas.claim import Claim
 from services.observability import observability_service
 
+# Words that make a sentence likely to be a checkworthy crisis claim
+CLAIM_KEYWORDS = ["dead", "injured", "killed", "trapped", "flooded", "collapsed", "fire", "leak"]
+
 class ClaimExtractionAgent(DigestionAgent):
     def __init__(self):
         super().__init__(name="ClaimExtractionAgent")
@@ -39,8 +42,7 @@ class ClaimExtractionAgent(DigestionAgent):
                 
             # Heuristic: Sentences with numbers or specific keywords might be claims
             # This is very basic.
-            keywords = ["dead", "injured", "killed", "trapped", "flooded", "collapsed", "fire", "leak"]
-            if any(k in sent.lower() for k in keywords) or re.search(r'\d+', sent):
+            if any(k in sent.lower() for k in CLAIM_KEYWORDS) or re.search(r'\d+', sent):
                 claim = Claim(
                     id=f"{item_id}_claim_{i}",
                     text=sent,
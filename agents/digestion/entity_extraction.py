@@ -18,27 +18,47 @@ class EntityExtractionAgent(DigestionAgent):
             self.nlp = spacy.load("en_core_web_sm")
 
     async def process(self, item: NormalizedItem) -> NormalizedItem:
-        text = item.title or ""
-        if item.text:
-            text += " " + item.text
+        text = self._item_text(item)
         
         if not text:
             return item
 
         doc = self.nlp(text)
         
-        entities = []
-        for ent in doc.ents:
-            entities.append({
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char
-            })
-        
         # Update item with extracted entities
         # We need to create a new object or modify existing (Pydantic models are mutable by default)
-        item.entities = entities
-        observability_service.log_info(f"Extracted {len(entities)} entities from item {item.id}")
+        item.entities = self._doc_entities(doc)
+        observability_service.log_info(f"Extracted {len(item.entities)} entities from item {item.id}")
         
         return item
+
+    async def process_batch(self, items: List[NormalizedItem], batch_size: int = 64) -> List[NormalizedItem]:
+        """Extract entities for many items with a single nlp.pipe pass."""
+        with_text = [(item, self._item_text(item)) for item in items]
+        with_text = [(item, text) for item, text in with_text if text]
+        
+        docs = self.nlp.pipe((text for _, text in with_text), batch_size=batch_size)
+        for (item, _), doc in zip(with_text, docs):
+            item.entities = self._doc_entities(doc)
+        
+        observability_service.log_info(f"Extracted entities from {len(with_text)} items")
+        return items
+
+    @staticmethod
+    def _item_text(item: NormalizedItem) -> str:
+        text = item.title or ""
+        if item.text:
+            text += " " + item.text
+        return text
+
+    @staticmethod
+    def _doc_entities(doc) -> List[Dict[str, Any]]:
+        return [
+            {
+                "text": ent.text,
+                "label": ent.label_,
+                "start": ent.start_char,
+                "end": ent.end_char
+            }
+            for ent in doc.ents
+        ]
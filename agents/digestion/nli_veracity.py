@@ -1,4 +1,5 @@
-from typing import Any
+from typing import Any, List
+import asyncio
 from agents.base import BaseAgent
 from schemas.claim import Claim
 from services.observability import observability_service
@@ -9,6 +10,8 @@ class NliVeracityAgent(BaseAgent):
         super().__init__(name="NliVeracityAgent")
         
     async def run(self, input_data: Any) -> Any:
+        if isinstance(input_data, list):
+            return await self.assess_veracity_batch(input_data)
         if isinstance(input_data, Claim):
             return await self.assess_veracity(input_data)
         return input_data
@@ -42,27 +45,71 @@ class NliVeracityAgent(BaseAgent):
                 # Store the support score in evidence
                 evidence.support_score = support_score
             
-            if support_scores:
-                # Average support score
-                avg_support = sum(support_scores) / len(support_scores)
-                
-                # Convert from [-1, 1] to [0, 1]
-                # -1 (contradicts) -> 0, 0 (neutral) -> 0.5, 1 (supports) -> 1
-                veracity = (avg_support + 1) / 2
-                
-                # Update claim veracity with weighted average
-                # Weight: 70% NLI, 30% existing veracity
-                claim.veracity_likelihood = (
-                    0.7 * veracity + 
-                    0.3 * claim.veracity_likelihood
-                )
-                
-                observability_service.log_info(
-                    f"NLI veracity for claim {claim.id}: {veracity:.3f} "
-                    f"(avg support: {avg_support:.3f})"
-                )
+            self._update_veracity(claim, support_scores)
             
         except Exception as e:
             observability_service.log_error(f"NLI veracity assessment failed: {e}")
         
         return claim
+    
+    async def assess_veracity_batch(self, claims: List[Claim], batch_size: int = 16) -> List[Claim]:
+        """
+        Assess many claims with batched NLI forward passes
+        
+        Every (claim, evidence) pair across all claims goes through the
+        model together, so the model sees full batches instead of one pair
+        at a time. Falls back to per-claim assessment if the batch fails,
+        so one bad input only affects its own claim.
+        """
+        pairs = [
+            (claim, evidence)
+            for claim in claims
+            for evidence in claim.evidence
+            if evidence.text_snippet
+        ]
+        if not pairs:
+            return claims
+        
+        try:
+            # Off the event loop, so other workflows progress during the forward passes
+            scores = await asyncio.to_thread(
+                nli_model.check_veracity_batch,
+                [(claim.text, evidence.text_snippet) for claim, evidence in pairs],
+                batch_size
+            )
+        except Exception as e:
+            observability_service.log_error(f"Batched NLI failed, assessing claims one by one: {e}")
+            return [await self.assess_veracity(claim) for claim in claims]
+        
+        claim_scores = {id(claim): [] for claim in claims}
+        for (claim, evidence), support_score in zip(pairs, scores):
+            evidence.support_score = support_score
+            claim_scores[id(claim)].append(support_score)
+        
+        for claim in claims:
+            self._update_veracity(claim, claim_scores[id(claim)])
+        
+        return claims
+    
+    def _update_veracity(self, claim: Claim, support_scores: List[float]):
+        if not support_scores:
+            return
+        
+        # Average support score
+        avg_support = sum(support_scores) / len(support_scores)
+        
+        # Convert from [-1, 1] to [0, 1]
+        # -1 (contradicts) -> 0, 0 (neutral) -> 0.5, 1 (supports) -> 1
+        veracity = (avg_support + 1) / 2
+        
+        # Update claim veracity with weighted average
+        # Weight: 70% NLI, 30% existing veracity
+        claim.veracity_likelihood = (
+            0.7 * veracity + 
+            0.3 * claim.veracity_likelihood
+        )
+        
+        observability_service.log_info(
+            f"NLI veracity for claim {claim.id}: {veracity:.3f} "
+            f"(avg support: {avg_support:.3f})"
+        )
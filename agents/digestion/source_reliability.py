@@ -3,18 +3,20 @@ from agents.digestion.base import DigestionAgent
 from schemas.claim import Claim
 from services.observability import observability_service
 
+# In prod: Load reliability scores from DB
+SOURCE_RELIABILITY = {
+    "google_fact_check": 0.95,
+    "who_ears": 0.9,
+    "gdelt": 0.7,
+    "youtube": 0.5,
+    "reddit": 0.4,
+    "twitter": 0.3
+}
+
 class SourceReliabilityAgent(DigestionAgent):
     def __init__(self):
         super().__init__(name="SourceReliabilityAgent")
-        # In prod: Load reliability scores from DB
-        self.source_scores = {
-            "google_fact_check": 0.95,
-            "who_ears": 0.9,
-            "gdelt": 0.7,
-            "youtube": 0.5,
-            "reddit": 0.4,
-            "twitter": 0.3
-        }
+        self.source_scores = dict(SOURCE_RELIABILITY)
 
     async def process(self, item: Any) -> Any:
         return item
@@ -46,8 +46,15 @@ class TopicAssignmentAgent(BaseAgent):
         
         return item
     
-    async def assign_topics_batch(self, items: list[NormalizedItem]) -> list[NormalizedItem]:
-        """Assign topics to a batch of items"""
+    async def assign_topics_batch(self, items: list[NormalizedItem], fit: bool = True) -> list[NormalizedItem]:
+        """
+        Assign topics to a batch of items
+        
+        Args:
+            items: Items to assign topics to
+            fit: Fit BERTopic on this batch if it is not fitted yet; pass
+                False to only transform, like assign_topic does
+        """
         texts = [item.text for item in items if item.text]
         
         if not texts:
@@ -58,7 +65,7 @@ class TopicAssignmentAgent(BaseAgent):
             embeddings = embeddings_model.encode(texts, batch_size=32)
             
             # Fit or transform
-            if not self.model_fitted:
+            if fit and not self.model_fitted:
                 observability_service.log_info(f"Fitting BERTopic on {len(texts)} documents")
                 topics, probs = topic_model.fit(texts, embeddings)
                 self.model_fitted = True
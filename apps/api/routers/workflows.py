@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
+import asyncio
 
+from config import settings
 from models.base import get_db
 from models.user import User
 from apps.api.auth.rbac import get_current_user, require_permission
 from workflows.executor import workflow_executor
+from workflows.state_manager import PENDING_REVIEW, state_manager
 from services.observability import observability_service
 
 router = APIRouter(prefix="/workflows", tags=["Workflows"])
 
+REVIEW_SUMMARY_FIELDS = ['raw_item_id', 'risk_score', 'errors', 'updated_at']
+START_MODES = ("inline", "async")
+TIMING_FIELDS = ['status', 'node_timings', 'started_at', 'updated_at']
+
 class WorkflowStart(BaseModel):
     raw_item: dict
 
+class WorkflowBatchStart(BaseModel):
+    # The request waits for the whole batch, so its size is bounded
+    raw_items: list[dict] = Field(min_length=1, max_length=settings.WORKFLOW_BATCH_MAX_ITEMS)
+
 class WorkflowResume(BaseModel):
     human_decision: str  # 'approved' or 'rejected'
     feedback: Optional[str] = None
@@ -31,10 +42,29 @@ class WorkflowStatus(BaseModel):
 @router.post("/start")
 async def start_workflow(
     data: WorkflowStart,
+    mode: Optional[str] = None,
     current_user: User = Depends(require_permission("workflows", "create"))
 ):
-    """Start a new verification workflow"""
+    """
+    Start a new verification workflow
+    
+    In async mode the workflow is queued for the worker pool and its ID
+    returned at once; poll /{workflow_id}/status for progress. Inline mode
+    runs the whole workflow before responding.
+    """
+    mode = mode or settings.WORKFLOW_START_MODE
+    if mode not in START_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown start mode: {mode}")
+    
     try:
+        if mode == "async":
+            workflow_id = await workflow_executor.enqueue_workflow(data.raw_item)
+            return {
+                "workflow_id": workflow_id,
+                "status": "queued",
+                "message": "Workflow queued"
+            }
+        
         workflow_id = await workflow_executor.start_workflow(data.raw_item)
         
         return {
@@ -46,6 +76,24 @@ async def start_workflow(
         observability_service.log_error(f"Failed to start workflow: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/start-batch")
+async def start_workflows_batch(
+    data: WorkflowBatchStart,
+    current_user: User = Depends(require_permission("workflows", "create"))
+):
+    """Run verification workflows for many items in micro-batches"""
+    try:
+        workflow_ids = await workflow_executor.start_workflows_batch(data.raw_items)
+        
+        return {
+            "workflow_ids": workflow_ids,
+            "message": f"Ran {len(workflow_ids)} workflows"
+        }
+        
+    except Exception as e:
+        observability_service.log_error(f"Failed to start workflow batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/{workflow_id}/resume")
 async def resume_workflow(
     workflow_id: str,
@@ -89,6 +137,41 @@ async def get_workflow_status(
         observability_service.log_error(f"Failed to get workflow status: {e}")
         raise HTTPException(status_code=404, detail="Workflow not found")
 
+@router.get("/{workflow_id}/timings")
+async def get_workflow_timings(
+    workflow_id: str,
+    current_user: User = Depends(require_permission("workflows", "read"))
+):
+    """Get how long each node of a workflow took, slowest first"""
+    state = await state_manager.load_fields(workflow_id, TIMING_FIELDS)
+    if not state:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    timings = state.get('node_timings') or {}
+    node_seconds = sum(timings.values())
+    nodes = [
+        {
+            "node": node,
+            "seconds": seconds,
+            "share": seconds / node_seconds if node_seconds else 0.0
+        }
+        for node, seconds in sorted(timings.items(), key=lambda t: t[1], reverse=True)
+    ]
+    
+    # Wall time is less than the node total when branches ran concurrently
+    wall_seconds = None
+    if state.get('started_at') and state.get('updated_at'):
+        wall_seconds = (state['updated_at'] - state['started_at']).total_seconds()
+    
+    return {
+        "workflow_id": workflow_id,
+        "status": state.get('status'),
+        "nodes": nodes,
+        "slowest_node": nodes[0]["node"] if nodes else None,
+        "node_seconds": node_seconds,
+        "wall_seconds": wall_seconds
+    }
+
 @router.post("/{workflow_id}/cancel")
 async def cancel_workflow(
     workflow_id: str,
@@ -109,11 +192,57 @@ async def cancel_workflow(
 
 @router.get("/pending-review")
 async def get_pending_reviews(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_permission("workflows", "read"))
+):
+    """Get workflows pending human review, highest risk first"""
+    try:
+        workflow_ids, next_cursor = await state_manager.list_workflows(
+            PENDING_REVIEW, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    summaries = await asyncio.gather(*(
+        state_manager.load_fields(workflow_id, REVIEW_SUMMARY_FIELDS)
+        for workflow_id in workflow_ids
+    ))
+    
+    return {
+        "pending_reviews": [
+            {"workflow_id": workflow_id, **summary}
+            for workflow_id, summary in zip(workflow_ids, summaries)
+            # Skip states that expired since they were indexed
+            if summary
+        ],
+        "next_cursor": next_cursor,
+        "total": await state_manager.count_workflows(PENDING_REVIEW)
+    }
+
+@router.get("")
+async def list_workflows(
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(require_permission("workflows", "read"))
 ):
-    """Get workflows pending human review"""
-    # In production, maintain an index of workflows by status
-    # For now, return empty list
+    """List workflow IDs by status, most recently updated first"""
+    try:
+        workflow_ids, next_cursor = await state_manager.list_workflows(
+            status, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     return {
-        "pending_reviews": []
+        "workflow_ids": workflow_ids,
+        "next_cursor": next_cursor,
+        "total": await state_manager.count_workflows(status)
     }
+
+@router.get("/counts")
+async def count_workflows(
+    current_user: User = Depends(require_permission("workflows", "read"))
+):
+    """Count workflows per status"""
+    return await state_manager.count_by_status()
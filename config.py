@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -48,6 +49,54 @@ class Settings(BaseSettings):
     GOOGLE_SEARCH_API_KEY: str = ""
     GOOGLE_CSE_ID: str = ""
     
+    # Kafka
+    KAFKA_BOOTSTRAP_SERVERS: str = "localhost:29092"  # comma-separated, or memory:// for the in-process broker
+    KAFKA_DEFAULT_CODEC: str = "json"  # json, orjson or msgpack
+    KAFKA_TOPIC_CODECS: Dict[str, str] = {}  # e.g. {"normalized-items": "msgpack"}
+    KAFKA_HANDLER_CAPACITY: int = 64  # handler slots per process, shared by the consumers running in it
+    KAFKA_EXPRESS_RESERVE: int = 4  # extra slots only express records may use
+    # Shares of contended slots; classes compete only within one process, so
+    # across consumer groups only with run_consumers.py --in-process
+    KAFKA_PRIORITY_WEIGHTS: Dict[str, int] = {"high": 8, "normal": 4, "bulk": 1}
+    KAFKA_TOPIC_PRIORITIES: Dict[str, str] = {
+        "alerts": "high",
+        "notifications": "high",
+        "claims": "normal",
+        "normalized-items": "normal",
+        "user-activity": "normal",
+        "raw-items": "bulk",
+    }
+    KAFKA_BLOB_STORE_URL: str = ""  # file:///path or s3://bucket/prefix; empty disables claim-check
+    KAFKA_BLOB_STORE_ENDPOINT: Optional[str] = None  # S3-compatible endpoint, e.g. MinIO
+    KAFKA_CLAIM_CHECK_THRESHOLD_BYTES: int = 64 * 1024
+    KAFKA_CLAIM_CHECK_FIELDS: List[str] = ["raw_data", "media.metadata"]
+    KAFKA_DEDUP_TTL_SECONDS: int = 6 * 3600  # how long handled keys are remembered
+    KAFKA_DEDUP_CAPACITY: int = 200_000  # keys held by each worker's in-process filter
+    KAFKA_DEDUP_ERROR_RATE: float = 0.001
+    
+    # Workflows
+    WORKFLOW_BATCH_SIZE: int = 32  # items run stage-by-stage together in batch mode
+    WORKFLOW_BATCH_MAX_ITEMS: int = 500  # items accepted by one /workflows/start-batch request
+    WORKFLOW_NLI_BATCH_SIZE: int = 16  # claim/evidence pairs per NLI forward pass
+    WORKFLOW_RESULT_CACHE_TTL_SECONDS: int = 6 * 3600  # 0 disables reuse across duplicate items
+    WORKFLOW_RESULT_CACHE_SIZE: int = 10_000  # results kept in process (LRU)
+    WORKFLOW_MAX_CONCURRENCY: int = 8  # workflows running at once per process
+    WORKFLOW_DEFAULT_SOURCE_QUOTA: int = 6  # running workflows per source
+    WORKFLOW_SOURCE_QUOTAS: Dict[str, int] = {}  # per-source overrides
+    WORKFLOW_PRIORITY_AGING: float = 0.01  # priority gained per second queued
+    WORKFLOW_CLAIM_CONCURRENCY: int = 8  # claims in evidence/NLI at once per process
+    WORKFLOW_CLAIM_TIMEOUT_SECONDS: float = 20.0  # deadline of one claim
+    WORKFLOW_FANOUT_TIMEOUT_SECONDS: float = 60.0  # deadline of all claims of an item
+    WORKFLOW_NLI_MAX_WAIT_MS: int = 10  # wait for concurrent NLI calls to batch with
+    WORKFLOW_CASCADE_ENABLED: bool = False  # gate evidence/NLI/drafting on checkworthiness
+    WORKFLOW_CHECKWORTHINESS_THRESHOLD: float = 0.5  # lowest gate score checked further
+    WORKFLOW_START_MODE: str = "inline"  # inline: /workflows/start waits; async: queued for workers
+    WORKFLOW_QUEUE_STREAM: str = "workflow:jobs"
+    WORKFLOW_QUEUE_GROUP: str = "workflow-workers"
+    WORKFLOW_JOB_VISIBILITY_TIMEOUT_SECONDS: float = 300.0  # idle time before another worker takes a job
+    WORKFLOW_JOB_MAX_DELIVERIES: int = 3  # deliveries before a job is failed
+    WORKFLOW_WORKER_CONCURRENCY: int = 4  # workflows run at once per worker process
+    
     # Model Cache
     MODEL_CACHE_DIR: str = "/app/models/cache"
     MEDIA_ROOT: str = "/app/media"
@@ -1,6 +1,6 @@
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from typing import Literal
+from typing import List, Literal, Tuple
 from config import settings
 from services.observability import observability_service
 import os
@@ -51,23 +51,56 @@ class NLIModel:
         Returns:
             Dict with 'label' and 'scores' for each class
         """
-        self.load()
+        return self.predict_batch([(premise, hypothesis)])[0]
+    
+    def predict_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        batch_size: int = 16
+    ) -> List[dict]:
+        """
+        Predict entailment for many (premise, hypothesis) pairs
+        
+        Pairs are padded into one forward pass per batch_size pairs,
+        which is far cheaper per pair than predicting them one by one.
         
-        # Tokenize
-        inputs = self.tokenizer(
-            premise,
-            hypothesis,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512
-        ).to(self.device)
+        Args:
+            pairs: (premise, hypothesis) tuples
+            batch_size: Pairs per forward pass
+            
+        Returns:
+            One predict() result per pair, in order
+        """
+        if not pairs:
+            return []
         
-        # Predict
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=1)[0]
+        self.load()
         
+        results = []
+        for start in range(0, len(pairs), batch_size):
+            chunk = pairs[start:start + batch_size]
+            
+            # Tokenize
+            inputs = self.tokenizer(
+                [premise for premise, _ in chunk],
+                [hypothesis for _, hypothesis in chunk],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=512
+            ).to(self.device)
+            
+            # Predict
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+                probs = torch.softmax(outputs.logits, dim=1)
+            
+            for row in probs:
+                results.append(self._to_result(row))
+        
+        return results
+    
+    def _to_result(self, probs) -> dict:
         # Get scores
         scores = {
             label: float(prob)
@@ -97,17 +130,34 @@ class NLIModel:
         Returns:
             Support score from -1 (contradicts) to 1 (supports)
         """
-        result = self.predict(evidence, claim)
+        return self._support_score(self.predict(evidence, claim))
+    
+    def check_veracity_batch(
+        self,
+        pairs: List[Tuple[str, str]],
+        batch_size: int = 16
+    ) -> List[float]:
+        """
+        Check many (claim, evidence) pairs in batched forward passes
         
+        Returns:
+            Support score per pair, from -1 (contradicts) to 1 (supports)
+        """
+        results = self.predict_batch(
+            [(evidence, claim) for claim, evidence in pairs],
+            batch_size=batch_size
+        )
+        return [self._support_score(result) for result in results]
+    
+    @staticmethod
+    def _support_score(result: dict) -> float:
         # Convert to support score
         # entailment = +1, neutral = 0, contradiction = -1
-        support_score = (
+        return (
             result["scores"]["entailment"] * 1.0 +
             result["scores"]["neutral"] * 0.0 +
             result["scores"]["contradiction"] * -1.0
         )
-        
-        return support_score
 
 # Singleton instance
 nli_model = NLIModel()
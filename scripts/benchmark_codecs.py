@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Kafka codec microbenchmark.
+
+Compares serialize/deserialize cost and message size of the available wire
+codecs on realistic NormalizedItem payloads.
+
+Usage:
+    python scripts/benchmark_codecs.py [--items 200] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from schemas.item import MediaItem, NormalizedItem
+from services.kafka_codecs import get_codec
+
+CODECS = ['json', 'orjson', 'msgpack']
+
+WORDS = (
+    "flood water level rising evacuation shelter bridge collapsed road closed "
+    "rescue teams deployed residents trapped power outage hospital casualties "
+    "officials confirmed reports unverified rumor district river embankment"
+).split()
+
+
+def make_item(i: int, rng: random.Random) -> dict:
+    """Build a normalized item shaped like real pipeline output."""
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(150, 600)))
+    item = NormalizedItem(
+        id=f"gdelt-{i}",
+        source=rng.choice(['gdelt', 'reddit', 'youtube']),
+        source_id=str(100000 + i),
+        url=f"https://news.example.com/articles/{i}",
+        title=" ".join(rng.choice(WORDS) for _ in range(12)),
+        text=text,
+        author=f"reporter-{i % 17}",
+        timestamp=datetime(2024, 1, 1) + timedelta(minutes=i),
+        language_hint='en',
+        media=[
+            MediaItem(
+                url=f"https://cdn.example.com/{i}/{m}.jpg",
+                type='image',
+                phash=f"{rng.getrandbits(64):016x}",
+                metadata={
+                    'ocr_boxes': [
+                        {'text': rng.choice(WORDS), 'bbox': [rng.randint(0, 640) for _ in range(4)]}
+                        for _ in range(8)
+                    ]
+                }
+            )
+            for m in range(rng.randint(0, 3))
+        ],
+        raw_data={'tone': rng.uniform(-10, 10), 'themes': rng.sample(WORDS, 6)},
+        language_detected='en',
+        entities=[
+            {'text': rng.choice(WORDS).title(), 'label': rng.choice(['GPE', 'ORG', 'PERSON']),
+             'start': rng.randint(0, 500), 'end': rng.randint(500, 1000)}
+            for _ in range(rng.randint(5, 25))
+        ],
+        topics=rng.sample(WORDS, 3),
+        claims=[
+            {'id': f"gdelt-{i}_claim_{c}", 'text': " ".join(rng.sample(WORDS, 10)),
+             'checkworthiness': rng.random(), 'veracity_likelihood': rng.random()}
+            for c in range(rng.randint(0, 6))
+        ],
+        risk_score=rng.random()
+    )
+    return item.dict()
+
+
+def benchmark(codec, items: list[dict], repeat: int) -> dict:
+    """Measure per-message encode/decode time and encoded size."""
+    encoded = [codec.encode(item) for item in items]
+
+    encode_time = min(timeit.repeat(
+        lambda: [codec.encode(item) for item in items], number=1, repeat=repeat
+    ))
+    decode_time = min(timeit.repeat(
+        lambda: [codec.decode(data) for data in encoded], number=1, repeat=repeat
+    ))
+
+    return {
+        'encode_us': encode_time / len(items) * 1e6,
+        'decode_us': decode_time / len(items) * 1e6,
+        'avg_bytes': sum(len(data) for data in encoded) / len(encoded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=200, help='Number of payloads')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is kept)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [make_item(i, rng) for i in range(args.items)]
+
+    print(f"{'codec':<10}{'encode us/msg':>16}{'decode us/msg':>16}{'avg bytes':>12}")
+    baseline = None
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ValueError as e:
+            print(f"{name:<10}  skipped ({e})")
+            continue
+
+        result = benchmark(codec, items, args.repeat)
+        baseline = baseline or result
+        speedup = (baseline['encode_us'] + baseline['decode_us']) / (
+            result['encode_us'] + result['decode_us']
+        )
+        print(
+            f"{name:<10}{result['encode_us']:>16.1f}{result['decode_us']:>16.1f}"
+            f"{result['avg_bytes']:>12.0f}   {speedup:.1f}x vs json"
+        )
+
+
+if __name__ == "__main__":
+    main()
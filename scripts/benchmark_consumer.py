@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+End-to-end consumer throughput benchmark on the in-memory Kafka broker.
+
+Publishes raw items, runs create_main_consumer() until the raw-items and
+normalized-items backlogs are drained, and reports throughput. Handlers are
+replaced by fixed-latency stubs unless --real-handlers is given.
+
+Usage:
+    python scripts/benchmark_consumer.py [--items 2000] [--handler-latency-ms 5]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import settings
+from services.kafka_memory import (
+    MEMORY_BOOTSTRAP,
+    InMemoryBroker,
+    get_memory_broker,
+    set_memory_broker
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_broker() -> InMemoryBroker:
+    """Broker with the production partition layout when PyYAML is available."""
+    try:
+        return InMemoryBroker.from_topics_file(str(ROOT / 'infrastructure/kafka/topics.yaml'))
+    except ImportError:
+        return InMemoryBroker(default_partitions=6)
+
+
+async def run(args) -> dict:
+    from services.kafka_consumer import create_main_consumer
+    from services.kafka_producer import get_kafka_producer, publish_normalized_item
+
+    broker = get_memory_broker()
+    producer = get_kafka_producer()
+
+    items = [
+        {'id': f'bench-{i}', 'source': 'gdelt', 'title': f'Benchmark item {i}', 'risk_score': 0.1}
+        for i in range(args.items)
+    ]
+    start = time.perf_counter()
+    for i in range(0, len(items), 1000):
+        await producer.send_batch('raw-items', items[i:i + 1000])
+    produce_seconds = time.perf_counter() - start
+
+    consumer = create_main_consumer()
+    consumer.processing_mode = args.mode
+
+    if not args.real_handlers:
+        latency = args.handler_latency_ms / 1000
+
+        async def stub_raw_item(message):
+            await asyncio.sleep(latency)
+            await publish_normalized_item(message)
+
+        async def stub_normalized_items(messages):
+            await asyncio.sleep(latency)
+
+        consumer.register_handler('raw-items', stub_raw_item)
+        consumer.register_batch_handler(
+            'normalized-items', stub_normalized_items, max_batch=500, max_wait_ms=200
+        )
+
+    start = time.perf_counter()
+    task = asyncio.create_task(consumer.start())
+
+    def drained() -> bool:
+        normalized = sum(
+            broker.end_offset(tp) for tp in broker.partitions_for('normalized-items')
+        )
+        return (
+            normalized >= args.items
+            and broker.total_lag(consumer.group_id, ['raw-items', 'normalized-items']) == 0
+        )
+
+    while not drained():
+        if task.done():
+            task.result()
+        if time.perf_counter() - start > args.timeout:
+            raise TimeoutError("Backlog was not drained in time")
+        await asyncio.sleep(0.05)
+
+    elapsed = time.perf_counter() - start
+    consumer.stop()
+    await task
+
+    return {
+        'items': args.items,
+        'mode': args.mode,
+        'handler_latency_ms': None if args.real_handlers else args.handler_latency_ms,
+        'produce_msgs_per_sec': args.items / produce_seconds,
+        'consume_seconds': elapsed,
+        'items_per_sec': args.items / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--handler-latency-ms', type=float, default=5.0)
+    parser.add_argument('--mode', choices=['sequential', 'concurrent'], default='concurrent')
+    parser.add_argument('--real-handlers', action='store_true', help='Keep the production handlers')
+    parser.add_argument('--timeout', type=float, default=600.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    settings.KAFKA_BOOTSTRAP_SERVERS = MEMORY_BOOTSTRAP
+    set_memory_broker(make_broker())
+
+    result = asyncio.run(run(args))
+    for key, value in result.items():
+        print(f"{key:>22}: {value:.1f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Workflow state persistence benchmark.
+
+Replays the saves a verification workflow makes (initial state, one
+checkpoint per graph step, the completion save) and compares bytes written
+to Redis by the old whole-state JSON blob against the field-level delta
+hash written by StateManager.
+
+Usage:
+    python scripts/benchmark_state.py [--workflows 200]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from workflows.state import new_workflow_state
+from workflows.state_manager import StateManager, msgpack
+
+WORDS = (
+    "flood water level rising evacuation shelter bridge collapsed road closed "
+    "rescue teams deployed residents trapped power outage hospital casualties "
+    "officials confirmed reports unverified rumor district river embankment"
+).split()
+
+
+class CountingRedis:
+    """Accepts StateManager's writes without a server; bytes are counted by StateManager."""
+
+    def pipeline(self):
+        return self
+
+    def delete(self, key):
+        pass
+
+    def hset(self, key, mapping):
+        pass
+
+    def hdel(self, key, *fields):
+        pass
+
+    def expire(self, key, seconds):
+        pass
+
+    def zadd(self, key, mapping):
+        pass
+
+    def zrem(self, key, *members):
+        pass
+
+    def zremrangebyscore(self, key, low, high):
+        pass
+
+    async def execute(self):
+        return []
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def workflow_steps(i: int, rng: random.Random):
+    """Yield the state after each checkpoint of one workflow run."""
+    raw_item = {
+        'id': f"gdelt-{i}",
+        'source': 'gdelt',
+        'url': f"https://news.example.com/articles/{i}",
+        'title': sentence(rng, 12),
+        'text': sentence(rng, rng.randint(150, 600)),
+        'timestamp': (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat(),
+        'raw_data': {'tone': rng.uniform(-10, 10), 'themes': rng.sample(WORDS, 6)},
+    }
+    state = new_workflow_state(f"wf-{i}", raw_item)
+    now = state['started_at']
+
+    def step(_nodes=(), **updates):
+        nonlocal now
+        now += timedelta(milliseconds=rng.randint(20, 400))
+        state.update(updates, updated_at=now)
+        state['completed_nodes'] = state['completed_nodes'] + list(_nodes)
+        return dict(state)
+
+    yield dict(state)
+    normalized = dict(raw_item, language_detected='en')
+    yield step(normalized_item=normalized, language_detected='en', _nodes=['normalize'])
+
+    claims = [
+        {'id': f"gdelt-{i}_claim_{c}", 'text': sentence(rng, 14),
+         'normalized_item_id': f"gdelt-{i}", 'status': 'new'}
+        for c in range(rng.randint(1, 6))
+    ]
+    yield step(
+        entities=[
+            {'text': rng.choice(WORDS).title(), 'label': rng.choice(['GPE', 'ORG']),
+             'start': rng.randint(0, 500), 'end': rng.randint(500, 1000)}
+            for _ in range(rng.randint(5, 25))
+        ],
+        claims=claims,
+        topics=rng.sample(WORDS, 3),
+        _nodes=['extract_entities', 'extract_claims', 'assign_topics']
+    )
+    yield step(
+        evidence=[
+            {'url': f"https://factcheck.example.com/{i}/{e}", 'text_snippet': sentence(rng, 40),
+             'source_reliability': rng.random(), 'support_score': rng.uniform(-1, 1)}
+            for e in range(len(claims) * 3)
+        ],
+        veracity_scores={c['id']: rng.random() for c in claims},
+        _nodes=['retrieve_evidence', 'assess_veracity']
+    )
+    yield step(risk_score=rng.random(), _nodes=['calculate_risk'])
+
+    advisory = {'title': sentence(rng, 10), 'body': sentence(rng, 200)}
+    yield step(advisory_draft=advisory, _nodes=['draft_advisory'])
+    yield step(
+        advisory_translations={lang: sentence(rng, 220) for lang in ['es', 'fr', 'ar', 'hi']},
+        _nodes=['translate_advisory']
+    )
+    # complete_workflow_node saves, then the executor checkpoints the step
+    yield step(status='completed')
+    yield step(_nodes=['complete'])
+
+
+async def run(workflows: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    manager = StateManager(redis_client=CountingRedis())
+    blob_bytes = 0
+    saves = 0
+
+    for i in range(workflows):
+        for state in workflow_steps(i, rng):
+            blob_bytes += len(json.dumps(state, default=str).encode('utf-8'))
+            await manager.save_state(state['workflow_id'], state)
+            saves += 1
+
+    return {
+        'saves_per_workflow': saves / workflows,
+        'blob_bytes': blob_bytes / workflows,
+        'delta_bytes': manager.bytes_written / workflows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workflows', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.workflows, args.seed))
+
+    print(f"saves per workflow: {result['saves_per_workflow']:.0f}")
+    print(f"large field encoding: {'msgpack+zlib' if msgpack else 'json+zlib'}")
+    print(f"{'format':<22}{'bytes/workflow':>16}")
+    print(f"{'JSON blob per save':<22}{result['blob_bytes']:>16.0f}")
+    print(
+        f"{'delta hash fields':<22}{result['delta_bytes']:>16.0f}   "
+        f"{result['blob_bytes'] / result['delta_bytes']:.1f}x less"
+    )
+
+
+if __name__ == "__main__":
+    main()
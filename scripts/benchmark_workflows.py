@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Verification workflow replay benchmark.
+
+Replays a recorded JSONL corpus of RawItems (one JSON object per line)
+through the verification workflow graph and reports throughput, end-to-end
+and per-node latency percentiles, and peak RSS. Results are written as
+JSON so runs on different commits can be compared; --baseline prints the
+change against an earlier result file.
+
+Model-backed agents (language detection, entities, topics, NLI, advisory
+drafting, translation) are replaced by deterministic, fixed-latency stubs
+unless --models real is given; --real keeps selected agents real in stub
+mode. Stubs are installed as the agent modules before the workflow is
+imported, so the real agents and their models are never loaded. Workflow
+state is saved to an in-memory store unless --redis is given.
+
+Usage:
+    python scripts/benchmark_workflows.py --generate 500 --save-corpus corpus.jsonl
+    python scripts/benchmark_workflows.py --corpus corpus.jsonl --output result.json
+    python scripts/benchmark_workflows.py --corpus corpus.jsonl --models real --warmup 20
+    python scripts/benchmark_workflows.py --corpus corpus.jsonl --baseline result.json
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import settings
+
+RESULT_VERSION = 1
+
+# Fixed latency of each stubbed agent, roughly that of the real model on CPU
+DEFAULT_STUB_LATENCY_MS = {
+    'normalization': 0.1,
+    'entities': 15.0,
+    'topics': 10.0,
+    'nli': 25.0,
+    'advisory': 200.0,
+    'translation': 50.0,
+}
+
+# Module and class the workflow imports each stubbed agent from, the method
+# its nodes call, and the batched method used by the batch executor
+STUBBED_AGENTS = {
+    'normalization': ('agents.ingestion.normalization', 'NormalizationService', 'normalize', None),
+    'entities': ('agents.digestion.entity_extraction', 'EntityExtractionAgent', 'run', 'process_batch'),
+    'topics': ('agents.digestion.topic_assignment', 'TopicAssignmentAgent', 'run', 'assign_topics_batch'),
+    'nli': ('agents.digestion.nli_veracity', 'NliVeracityAgent', 'run', 'assess_veracity_batch'),
+    'advisory': ('agents.publishing.advisory_drafting', 'AdvisoryDraftingAgent', 'run', None),
+    'translation': ('agents.publishing.translation', 'AdvisoryTranslationAgent', 'run', None),
+}
+
+# Agent modules the workflow imports that this tree keeps elsewhere
+RELOCATED_AGENTS = {
+    'agents.scoring.risk_scoring': 'agents.digestion.risk_scoring',
+}
+
+TRANSLATION_LANGUAGES = ('hi', 'mr', 'bn', 'ta', 'te')
+
+WORDS = (
+    "flood water level rising evacuation shelter bridge collapsed road closed "
+    "rescue teams deployed residents trapped power outage hospital injured "
+    "officials confirmed reports unverified rumor district river embankment"
+).split()
+PLACES = ["Dhaka", "Manila", "Jakarta", "Lagos", "Karachi", "Lima", "Chennai", "Accra"]
+
+
+class NullRedis:
+    """Accepts StateManager's writes without a server."""
+
+    def pipeline(self):
+        return self
+
+    def __getattr__(self, name):
+        # delete, hset, hdel, expire, zadd, zrem, zremrangebyscore
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        return []
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+
+
+class StubModels:
+    """Deterministic, fixed-latency stand-ins for the model-backed agents"""
+
+    def __init__(self, latency_ms: Dict[str, float]):
+        self.latency = {name: ms / 1000 for name, ms in latency_ms.items()}
+
+    async def _wait(self, name: str):
+        if self.latency.get(name):
+            await asyncio.sleep(self.latency[name])
+
+    def agent_class(self, name: str) -> type:
+        """Class the workflow constructs in place of a stubbed agent"""
+        _, class_name, method, batch_method = STUBBED_AGENTS[name]
+        stub = getattr(self, name)
+
+        async def call(agent, item):
+            return await stub(item)
+
+        async def call_batch(agent, items, *args, **kwargs):
+            # Concurrent stubs wait once, like one batched forward pass
+            return list(await asyncio.gather(*(stub(item) for item in items)))
+
+        methods = {method: call}
+        if batch_method:
+            methods[batch_method] = call_batch
+        return type(class_name, (), methods)
+
+    async def normalization(self, item):
+        from schemas.item import NormalizedItem
+
+        await self._wait('normalization')
+        return NormalizedItem(**item.dict(), language_detected='en', entities=[], topics=[])
+
+    async def entities(self, item):
+        await self._wait('entities')
+        text = f"{item.title or ''} {item.text or ''}"
+        item.entities = [
+            {'text': place, 'label': 'GPE', 'start': text.find(place), 'end': text.find(place) + len(place)}
+            for place in PLACES if place in text
+        ]
+        return item
+
+    async def topics(self, item):
+        await self._wait('topics')
+        item.topics = [f"topic_{_digest(item.title or item.id) % 20}"]
+        return item
+
+    async def nli(self, claim):
+        await self._wait('nli')
+        claim.veracity_likelihood = (_digest(claim.text) % 1000) / 1000
+        return claim
+
+    async def advisory(self, item):
+        from schemas.advisory import Advisory
+
+        await self._wait('advisory')
+        return Advisory(
+            id=f"adv_{item.id}",
+            claim_id=item.id,
+            title=f"Crisis Advisory: {item.title}",
+            summary=f"Reports indicate {item.title}.",
+            narrative_what_happened=item.text or "No details available.",
+            narrative_verified="Investigation ongoing.",
+            narrative_action="Avoid the area. Follow official channels for updates."
+        )
+
+    async def translation(self, advisory):
+        await self._wait('translation')
+        advisory.translations = {
+            lang: {'title': f"[{lang.upper()}] {advisory.title[:30]}..."}
+            for lang in TRANSLATION_LANGUAGES
+        }
+        return advisory
+
+
+class NormalizationService:
+    """services.normalization_service with the async normalize() the workflow calls"""
+
+    async def normalize(self, item):
+        from services.normalization_service import normalization_service
+
+        return normalization_service.normalize_item(item)
+
+
+def _importable(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:  # parent package missing
+        return False
+
+
+def _fake_module(name: str, **attrs: Any) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install_agent_modules(stubs: Optional[StubModels], keep_real: List[str]):
+    """
+    Provide the agent modules the workflow imports; call before importing it
+
+    Args:
+        stubs: Stub models whose agents replace the real ones, or None to
+            run real models
+        keep_real: Stubbed agents to keep real
+    """
+    for name, (module, class_name, _, _) in STUBBED_AGENTS.items():
+        if stubs is not None and name not in keep_real:
+            sys.modules[module] = _fake_module(module, **{class_name: stubs.agent_class(name)})
+
+    normalization = STUBBED_AGENTS['normalization'][0]
+    if normalization not in sys.modules and not _importable(normalization):
+        sys.modules[normalization] = _fake_module(normalization, NormalizationService=NormalizationService)
+    for module, location in RELOCATED_AGENTS.items():
+        if module not in sys.modules and not _importable(module):
+            sys.modules[module] = importlib.import_module(location)
+
+
+def generate_corpus(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Synthetic RawItems with a mix of checkworthy and throwaway sentences"""
+    rng = random.Random(seed)
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+    items = []
+    for i in range(count):
+        place = rng.choice(PLACES)
+        sentences = [
+            f"{sentence(rng.randint(6, 14))} in {place}."
+            + (f" At least {rng.randint(2, 300)} people affected." if rng.random() < 0.6 else "")
+            for _ in range(rng.randint(2, 8))
+        ]
+        items.append({
+            'id': f"bench-{i}",
+            'source': rng.choice(['gdelt', 'twitter', 'reddit', 'youtube']),
+            'source_id': str(i),
+            'url': f"https://news.example.com/{i}",
+            'title': f"{sentence(6)} in {place}",
+            'text': " ".join(sentences),
+            'timestamp': (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat(),
+            'raw_data': {},
+        })
+    return items
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linearly interpolated percentile, q in [0, 100]"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else None,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None,
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def replay(items: List[Dict[str, Any]], concurrency: int, label: str) -> List[tuple]:
+    """Run one workflow per item; returns (final state, seconds) per item"""
+    from workflows.state import new_workflow_state
+    from workflows.verification_workflow import verification_workflow
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(index: int, raw_item: Dict[str, Any]):
+        async with semaphore:
+            state = new_workflow_state(f"{label}-{index}", raw_item)
+            started = time.perf_counter()
+            final = await verification_workflow.ainvoke(state)
+            return final, time.perf_counter() - started
+
+    return await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+
+
+async def run(args, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from workflows.state_manager import state_manager
+
+    if not args.redis:
+        state_manager._redis = NullRedis()
+    install_agent_modules(
+        StubModels(args.stub_latency_ms) if args.models == 'stub' else None, args.real
+    )
+
+    if args.warmup:
+        await replay(items[:args.warmup], args.concurrency, 'warmup')
+
+    started = time.perf_counter()
+    results = await replay(items, args.concurrency, 'bench')
+    elapsed = time.perf_counter() - started
+
+    node_seconds: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    for final, _ in results:
+        for node, seconds in (final.get('node_timings') or {}).items():
+            node_seconds.setdefault(node, []).append(seconds)
+        statuses[final.get('status')] = statuses.get(final.get('status'), 0) + 1
+
+    return {
+        'benchmark': 'workflow_replay',
+        'version': RESULT_VERSION,
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'corpus': str(args.corpus) if args.corpus else f"generated:{args.generate}:{args.seed}",
+            'corpus_sha256': hashlib.sha256(
+                "\n".join(json.dumps(i, sort_keys=True) for i in items).encode('utf-8')
+            ).hexdigest(),
+            'items': len(items),
+            'concurrency': args.concurrency,
+            'warmup': args.warmup,
+            'models': args.models,
+            'real_agents': sorted(args.real) if args.models == 'stub' else None,
+            'stub_latency_ms': args.stub_latency_ms if args.models == 'stub' else None,
+            'cascade': settings.WORKFLOW_CASCADE_ENABLED,
+            'redis': args.redis,
+        },
+        'throughput': {
+            'items': len(results),
+            'seconds': elapsed,
+            'items_per_sec': len(results) / elapsed if elapsed else None,
+        },
+        'latency_seconds': summarize([seconds for _, seconds in results]),
+        'nodes': {node: summarize(values) for node, values in sorted(node_seconds.items())},
+        'statuses': statuses,
+        'items_with_errors': sum(1 for final, _ in results if final.get('errors')),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def _change(current: Optional[float], baseline: Optional[float]) -> str:
+    if not current or not baseline:
+        return ''
+    return f"{(current - baseline) / baseline * 100:+.1f}%"
+
+
+def print_report(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    base_nodes = (baseline or {}).get('nodes', {})
+    throughput = result['throughput']['items_per_sec']
+    base_throughput = (baseline or {}).get('throughput', {}).get('items_per_sec')
+
+    print(f"items: {result['throughput']['items']}  models: {result['config']['models']}  "
+          f"concurrency: {result['config']['concurrency']}")
+    print(f"items/sec: {throughput:.2f} {_change(throughput, base_throughput)}")
+    print(f"peak RSS: {result['peak_rss_mb']:.0f} MB")
+    print(f"statuses: {result['statuses']}  items with errors: {result['items_with_errors']}")
+
+    print(f"\n{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'p95 vs base':>14}")
+    rows = [('end-to-end', result['latency_seconds'], (baseline or {}).get('latency_seconds', {}))]
+    rows += [(node, stats, base_nodes.get(node, {})) for node, stats in result['nodes'].items()]
+    for name, stats, base in rows:
+        print(
+            f"{name:<22}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+            f"{stats['p99'] * 1000:>10.1f}{_change(stats['p95'], base.get('p95')):>14}"
+        )
+
+
+def parse_latencies(value: str) -> Dict[str, float]:
+    latency = dict(DEFAULT_STUB_LATENCY_MS)
+    for part in filter(None, value.split(',')):
+        name, ms = part.split('=')
+        if name not in latency:
+            raise argparse.ArgumentTypeError(f"Unknown stub: {name}")
+        latency[name] = float(ms)
+    return latency
+
+
+def parse_real(value: str) -> List[str]:
+    names = [name for name in value.split(',') if name]
+    for name in names:
+        if name not in DEFAULT_STUB_LATENCY_MS:
+            raise argparse.ArgumentTypeError(f"Unknown stub: {name}")
+    return names
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', type=Path, help='JSONL file of RawItems to replay')
+    parser.add_argument('--generate', type=int, default=200,
+                        help='Synthetic items to replay when no corpus is given')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-corpus', type=Path, help='Write the replayed corpus as JSONL')
+    parser.add_argument('--concurrency', type=int, default=8, help='Workflows run at once')
+    parser.add_argument('--warmup', type=int, default=0,
+                        help='Items run first and not measured (loads real models)')
+    parser.add_argument('--models', choices=['stub', 'real'], default='stub')
+    parser.add_argument('--real', type=parse_real, default=[],
+                        help=f"Agents kept real in stub mode: {','.join(DEFAULT_STUB_LATENCY_MS)}")
+    parser.add_argument('--stub-latency-ms', type=parse_latencies, default=dict(DEFAULT_STUB_LATENCY_MS),
+                        help='Per-stub latency overrides, e.g. nli=40,advisory=0')
+    parser.add_argument('--cascade', action='store_true', help='Enable the checkworthiness cascade')
+    parser.add_argument('--redis', action='store_true', help='Save workflow state to Redis')
+    parser.add_argument('--output', type=Path, help='Write the result as JSON')
+    parser.add_argument('--baseline', type=Path, help='Earlier result JSON to compare with')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.cascade:
+        settings.WORKFLOW_CASCADE_ENABLED = True
+
+    items = load_corpus(args.corpus) if args.corpus else generate_corpus(args.generate, args.seed)
+    if args.save_corpus:
+        with args.save_corpus.open('w') as f:
+            f.writelines(json.dumps(item) + "\n" for item in items)
+
+    result = asyncio.run(run(args, items))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print_report(result, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
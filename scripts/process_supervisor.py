@@ -0,0 +1,154 @@
+"""
+Supervision of worker processes.
+
+ProcessSupervisor keeps a fixed set of worker slots filled with spawned
+processes. A worker that exits is restarted with exponential backoff per
+slot, reset once the worker has stayed up for HEALTHY_UPTIME_SECONDS. On
+SIGINT/SIGTERM every worker receives SIGTERM to drain, and is killed if it
+has not exited within the shutdown grace period. Subclasses say what a
+slot runs and what the periodic summary logs.
+"""
+import logging
+import multiprocessing as mp
+import signal
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Restart backoff bounds, and uptime after which a worker counts as healthy again
+MIN_RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 60.0
+HEALTHY_UPTIME_SECONDS = 60.0
+
+
+class WorkerSlot:
+    """A supervised worker position that is refilled when its process dies."""
+
+    def __init__(self, group: str, index: int, metrics_port: Optional[int] = None):
+        self.group = group
+        self.index = index
+        self.metrics_port = metrics_port
+        self.process: Optional[mp.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = MIN_RESTART_BACKOFF
+        self.next_start = 0.0
+
+
+class ProcessSupervisor:
+    """Spawn, monitor and restart worker processes."""
+
+    def __init__(
+        self,
+        slots: List[WorkerSlot],
+        shutdown_grace_seconds: float,
+        summary_interval: float = 30.0
+    ):
+        """
+        Initialize supervisor.
+
+        Args:
+            slots: Worker positions to keep filled
+            shutdown_grace_seconds: How long workers get to drain on
+                shutdown before they are killed
+            summary_interval: Seconds between health summaries
+        """
+        self.ctx = mp.get_context('spawn')
+        self.slots = slots
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.summary_interval = summary_interval
+        self._last_summary = time.monotonic()
+        self._stopping = False
+
+    def _target(self, slot: WorkerSlot) -> Tuple[Callable[..., Any], tuple]:
+        """Function a slot's process runs, and its arguments"""
+        raise NotImplementedError
+
+    def _process_name(self, slot: WorkerSlot) -> str:
+        return f"{slot.group}-{slot.index}"
+
+    def _poll(self):
+        """Called about every second while supervising"""
+
+    def _log_summary(self):
+        """Log the health of the workers"""
+
+    def _spawn(self, slot: WorkerSlot):
+        target, args = self._target(slot)
+        slot.process = self.ctx.Process(
+            target=target,
+            args=args,
+            name=self._process_name(slot),
+            daemon=False
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        logger.info(f"Spawned {slot.process.name} (pid {slot.process.pid})")
+
+    def _check_workers(self):
+        """Restart workers that exited, with exponential backoff per slot."""
+        now = time.monotonic()
+        for slot in self.slots:
+            process = slot.process
+            if process is not None and process.is_alive():
+                if now - slot.started_at > HEALTHY_UPTIME_SECONDS:
+                    slot.backoff = MIN_RESTART_BACKOFF
+                continue
+
+            if process is not None:
+                logger.error(
+                    f"{process.name} (pid {process.pid}) exited with code "
+                    f"{process.exitcode}; restarting in {slot.backoff:.0f}s"
+                )
+                process.join(timeout=0)
+                slot.process = None
+                slot.restarts += 1
+                slot.next_start = now + slot.backoff
+                slot.backoff = min(slot.backoff * 2, MAX_RESTART_BACKOFF)
+
+            if now >= slot.next_start:
+                self._spawn(slot)
+
+    def alive(self, slots: Optional[List[WorkerSlot]] = None) -> int:
+        """Number of live worker processes, among slots (default all)"""
+        return sum(
+            1 for slot in (self.slots if slots is None else slots)
+            if slot.process is not None and slot.process.is_alive()
+        )
+
+    def _handle_signal(self, sig, frame):
+        logger.info("Shutdown signal received, draining workers...")
+        self._stopping = True
+
+    def _shutdown(self):
+        """Ask every worker to drain, then kill stragglers."""
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()  # SIGTERM: the worker drains
+
+        deadline = time.monotonic() + self.shutdown_grace_seconds
+        for slot in self.slots:
+            if slot.process is None:
+                continue
+            slot.process.join(timeout=max(deadline - time.monotonic(), 0))
+            if slot.process.is_alive():
+                logger.error(f"{slot.process.name} did not stop in time; killing")
+                slot.process.kill()
+                slot.process.join()
+
+    def run(self):
+        """Supervise workers until SIGINT/SIGTERM."""
+        signal.signal(signal.SIGINT, self._handle_signal)
+        signal.signal(signal.SIGTERM, self._handle_signal)
+
+        try:
+            while not self._stopping:
+                self._check_workers()
+                self._poll()
+                if time.monotonic() - self._last_summary >= self.summary_interval:
+                    self._log_summary()
+                    self._last_summary = time.monotonic()
+                time.sleep(1)
+        finally:
+            self._shutdown()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Replay dead-lettered messages to their original topics.
+
+Replays every DLQ entry that matches the filters, up to the end of the DLQ
+at start time, at a bounded rate. Rerunning with the same --name resumes
+where the previous run stopped, whether it was interrupted or aborted on a
+publish failure. Use a new --name to replay with different filters.
+
+Usage:
+    python scripts/replay_dlq.py --name opensearch-outage \\
+        --topic normalized-items --error-type ConnectionError \\
+        --since 2024-05-01T08:00 --until 2024-05-01T14:00 --rate 200
+    python scripts/replay_dlq.py --name opensearch-outage --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.dlq_replayer import DLQReplayer, ReplayAbortedError
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def replay(args) -> int:
+    replayer = DLQReplayer(
+        name=args.name,
+        topics=args.topic,
+        error_types=args.error_type,
+        since=args.since,
+        until=args.until,
+        rate_per_second=args.rate,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        progress_path=args.progress_file or f"dlq-replay-{args.name}.json",
+        dry_run=args.dry_run
+    )
+
+    def signal_handler(sig, frame):
+        logger.info("Stopping after the current batch; rerun to resume")
+        replayer.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    try:
+        progress = await replayer.run()
+    except ReplayAbortedError as e:
+        logger.error(str(e))
+        return 1
+
+    print(
+        f"{'would replay' if args.dry_run else 'replayed'}={progress['replayed']} "
+        f"skipped={progress['skipped']} invalid={progress['invalid']} "
+        f"completed={progress['completed']}"
+    )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--name', default='default', help='Replay name used to resume')
+    parser.add_argument('--topic', action='append', help='Original topic (repeatable)')
+    parser.add_argument('--error-type', action='append', help='Error type (repeatable)')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='ISO time, inclusive (UTC if naive)')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='ISO time, exclusive (UTC if naive)')
+    parser.add_argument('--rate', type=float, default=50.0, help='Messages per second, 0 for unlimited')
+    parser.add_argument('--concurrency', type=int, default=8, help='Deliveries awaited at once')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--progress-file', help='Defaults to dlq-replay-<name>.json')
+    parser.add_argument('--dry-run', action='store_true', help='Count matches without publishing')
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(replay(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,36 @@
 """
 Consumer runner script.
 
-Starts all Kafka consumers for processing events.
+Supervises Kafka consumer worker processes. Each consumer group runs in N
+worker processes (configurable per group) so CPU-heavy handlers can use
+every core. Crashed workers are restarted with backoff, shutdown drains
+in-flight records and commits before exiting, and an aggregated health/lag
+summary is logged periodically. With --metrics-port, every worker serves its
+Prometheus metrics on its own port, counting up from the given one.
+
+Usage:
+    python scripts/run_consumers.py --workers main=4,notifications=1,activity=1
+    python scripts/run_consumers.py --metrics-port 9100
+    python scripts/run_consumers.py --in-process   # all groups in one process
+
+Handler slots are scheduled by priority within a process only: with
+worker processes each group's topics are ranked among themselves, and
+--in-process is needed to rank e.g. alerts ahead of raw items.
 """
+import argparse
 import asyncio
 import logging
+import os
+import queue
 import signal
-import sys
+import time
+from typing import Callable, Dict, Optional
+
+from prometheus_client import start_http_server
+
+from scripts.process_supervisor import ProcessSupervisor, WorkerSlot
 from services.kafka_consumer import (
+    CrisisKafkaConsumer,
     create_main_consumer,
     create_notifications_consumer,
     create_activity_consumer
@@ -20,23 +43,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CONSUMER_GROUPS: Dict[str, Callable[[], CrisisKafkaConsumer]] = {
+    'main': create_main_consumer,
+    'notifications': create_notifications_consumer,
+    'activity': create_activity_consumer,
+}
+
+DEFAULT_WORKERS = {
+    'main': os.cpu_count() or 1,
+    'notifications': 1,
+    'activity': 1,
+}
 
-async def run_consumers():
-    """Run all Kafka consumers concurrently."""
+# Seconds a worker may take to drain and commit before it is killed
+SHUTDOWN_GRACE_SECONDS = 60
+
+
+async def run_consumers(metrics_port: Optional[int] = None):
+    """Run all Kafka consumers concurrently in this process."""
     logger.info("Starting CrisisLens Kafka Consumers...")
-    
+    if metrics_port:
+        start_http_server(metrics_port)
+        logger.info(f"Serving consumer metrics on port {metrics_port}")
+
     # Create consumers
     main_consumer = create_main_consumer()
     notifications_consumer = create_notifications_consumer()
     activity_consumer = create_activity_consumer()
-    
-    # Setup graceful shutdown
+
+    # Setup graceful shutdown: consumers drain and commit before returning
     def signal_handler(sig, frame):
         logger.info("Shutdown signal received, stopping consumers...")
         main_consumer.stop()
         notifications_consumer.stop()
         activity_consumer.stop()
-        sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -44,14 +84,199 @@ async def run_consumers():
     try:
         # Start all consumers concurrently
         await asyncio.gather(
-            main_consumer.start(),
-            notifications_consumer.start(),
-            activity_consumer.start()
+            main_consumer.start(handle_signals=False),
+            notifications_consumer.start(handle_signals=False),
+            activity_consumer.start(handle_signals=False)
         )
     except Exception as e:
         logger.error(f"Error running consumers: {e}")
         raise
 
 
+async def _run_worker(group: str, index: int, status_queue, report_interval: float):
+    """Run one consumer and report its stats to the supervisor."""
+    consumer = CONSUMER_GROUPS[group]()
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_interval)
+            stats = await consumer.stats()
+            stats.update({'group': group, 'worker': index, 'pid': os.getpid()})
+            try:
+                status_queue.put_nowait(stats)
+            except queue.Full:
+                pass
+
+    reporter = asyncio.create_task(report())
+    try:
+        # start() drains in-flight records and commits on SIGTERM
+        await consumer.start()
+    finally:
+        reporter.cancel()
+
+
+def worker_main(
+    group: str,
+    index: int,
+    status_queue,
+    report_interval: float,
+    metrics_port: Optional[int] = None
+):
+    """Entry point of a consumer worker process."""
+    logger.info(f"Worker {group}/{index} starting (pid {os.getpid()})")
+    if metrics_port:
+        start_http_server(metrics_port)
+        logger.info(f"Worker {group}/{index} serving metrics on port {metrics_port}")
+    asyncio.run(_run_worker(group, index, status_queue, report_interval))
+    logger.info(f"Worker {group}/{index} stopped")
+
+
+class ConsumerSupervisor(ProcessSupervisor):
+    """Spawn, monitor and restart consumer worker processes."""
+
+    def __init__(
+        self,
+        workers: Dict[str, int],
+        summary_interval: float = 30.0,
+        report_interval: float = 10.0,
+        metrics_port: Optional[int] = None
+    ):
+        """
+        Initialize supervisor.
+
+        Args:
+            workers: Consumer group name -> number of worker processes
+            summary_interval: Seconds between aggregated health summaries
+            report_interval: Seconds between worker stats reports
+            metrics_port: First Prometheus port; each worker slot keeps its
+                own port across restarts. None disables the endpoints.
+        """
+        slots = [
+            WorkerSlot(group, i)
+            for group, count in workers.items()
+            for i in range(count)
+        ]
+        if metrics_port:
+            for offset, slot in enumerate(slots):
+                slot.metrics_port = metrics_port + offset
+        super().__init__(slots, SHUTDOWN_GRACE_SECONDS, summary_interval)
+        self.status_queue = self.ctx.Queue(maxsize=10000)
+        self.report_interval = report_interval
+        self._stats: Dict[tuple, dict] = {}
+        self._last_processed: Dict[str, int] = {}
+
+    def _target(self, slot: WorkerSlot):
+        return worker_main, (
+            slot.group,
+            slot.index,
+            self.status_queue,
+            self.report_interval,
+            slot.metrics_port
+        )
+
+    def _process_name(self, slot: WorkerSlot) -> str:
+        return f"consumer-{slot.group}-{slot.index}"
+
+    def _poll(self):
+        self._collect_stats()
+
+    def _collect_stats(self):
+        while True:
+            try:
+                stats = self.status_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._stats[(stats['group'], stats['worker'])] = stats
+
+    def _log_summary(self):
+        """Log workers alive, throughput, in-flight and lag per group."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_summary, 1e-6)
+        self._last_summary = now
+
+        for group in dict.fromkeys(slot.group for slot in self.slots):
+            slots = [s for s in self.slots if s.group == group]
+            alive = self.alive(slots)
+            reports = [self._stats[(group, s.index)] for s in slots if (group, s.index) in self._stats]
+
+            processed = sum(r['processed'] for r in reports)
+            # Counters restart with their worker, so never report a negative rate
+            rate = max(processed - self._last_processed.get(group, processed), 0) / elapsed
+            self._last_processed[group] = processed
+
+            logger.info(
+                f"[{group}] workers={alive}/{len(slots)} "
+                f"restarts={sum(s.restarts for s in slots)} "
+                f"processed={processed} failed={sum(r['failed'] for r in reports)} "
+                f"rate={rate:.1f}/s in_flight={sum(r['in_flight'] for r in reports)} "
+                f"lag={sum(sum(r['lag'].values()) for r in reports)} "
+                f"paused={sum(len(r['backpressure']['paused']) for r in reports)}"
+            )
+
+    def _shutdown(self):
+        """Ask every worker to drain and commit, then kill stragglers."""
+        super()._shutdown()
+        self._collect_stats()
+        self._log_summary()
+        logger.info("All consumer workers stopped")
+
+    def run(self):
+        """Supervise workers until SIGINT/SIGTERM."""
+        logger.info(
+            "Starting consumer supervisor: " + ", ".join(
+                f"{group}={sum(1 for s in self.slots if s.group == group)}"
+                for group in dict.fromkeys(s.group for s in self.slots)
+            )
+        )
+        super().run()
+
+
+def parse_workers(spec: str) -> Dict[str, int]:
+    """Parse 'main=4,notifications=1' into worker counts per group."""
+    workers = dict(DEFAULT_WORKERS)
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        group, _, count = part.partition('=')
+        if group not in CONSUMER_GROUPS:
+            raise ValueError(f"Unknown consumer group: {group}")
+        workers[group] = int(count)
+    return {group: count for group, count in workers.items() if count > 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run CrisisLens Kafka consumers")
+    parser.add_argument(
+        '--workers',
+        default=os.environ.get('CONSUMER_WORKERS', ''),
+        help="Worker processes per group, e.g. main=4,notifications=1,activity=1 "
+             "(env CONSUMER_WORKERS; main defaults to the CPU count)"
+    )
+    parser.add_argument('--summary-interval', type=float, default=30.0)
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=int(os.environ.get('CONSUMER_METRICS_PORT', 0)) or None,
+        help="Serve Prometheus metrics from each worker, on consecutive ports "
+             "starting here (env CONSUMER_METRICS_PORT)"
+    )
+    parser.add_argument(
+        '--in-process',
+        action='store_true',
+        help="Run every group in this process without a supervisor, "
+             "ranking all their topics with one priority scheduler"
+    )
+    args = parser.parse_args()
+
+    if args.in_process:
+        asyncio.run(run_consumers(args.metrics_port))
+        return
+
+    supervisor = ConsumerSupervisor(
+        workers=parse_workers(args.workers),
+        summary_interval=args.summary_interval,
+        metrics_port=args.metrics_port
+    )
+    supervisor.run()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_consumers())
+    main()
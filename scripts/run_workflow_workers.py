@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Workflow worker runner script.
+
+Runs a pool of worker processes that claim verification workflows from
+the Redis stream queue (see workflows/job_queue.py) and run them. Workers
+on any number of hosts share one consumer group, so the pool scales by
+running this script on more nodes. Crashed workers are restarted with
+backoff; their jobs are picked up by other workers once the visibility
+timeout lapses. Shutdown lets running workflows finish within a grace
+period.
+
+Usage:
+    python scripts/run_workflow_workers.py --processes 4 --concurrency 4
+    python scripts/run_workflow_workers.py --metrics-port 9200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from typing import Optional
+
+from prometheus_client import start_http_server
+
+from config import settings
+from scripts.process_supervisor import ProcessSupervisor, WorkerSlot
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Extra time the supervisor gives workers beyond their own grace period
+SHUTDOWN_MARGIN_SECONDS = 10.0
+
+
+async def _run_worker(concurrency: int, grace_seconds: float):
+    from workflows.job_queue import WorkflowWorker
+
+    worker = WorkflowWorker(concurrency=concurrency, shutdown_grace_seconds=grace_seconds)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def worker_main(index: int, concurrency: int, grace_seconds: float, metrics_port: Optional[int]):
+    """Entry point of a workflow worker process."""
+    logger.info(f"Workflow worker {index} starting (pid {os.getpid()})")
+    if metrics_port:
+        start_http_server(metrics_port)
+    asyncio.run(_run_worker(concurrency, grace_seconds))
+
+
+class WorkerPool(ProcessSupervisor):
+    """Spawn, monitor and restart workflow worker processes."""
+
+    def __init__(
+        self,
+        processes: int,
+        concurrency: int,
+        grace_seconds: float = 60.0,
+        metrics_port: Optional[int] = None,
+        summary_interval: float = 30.0
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            processes: Worker processes on this host
+            concurrency: Workflows run at once per process
+            grace_seconds: How long running workflows get to finish on
+                shutdown
+            metrics_port: First Prometheus port, one per worker process;
+                None disables the endpoints
+            summary_interval: Seconds between health summaries
+        """
+        slots = [
+            WorkerSlot('workflow-worker', i, metrics_port + i if metrics_port else None)
+            for i in range(processes)
+        ]
+        super().__init__(slots, grace_seconds + SHUTDOWN_MARGIN_SECONDS, summary_interval)
+        self.concurrency = concurrency
+        self.grace_seconds = grace_seconds
+
+    def _target(self, slot: WorkerSlot):
+        return worker_main, (slot.index, self.concurrency, self.grace_seconds, slot.metrics_port)
+
+    def _log_summary(self):
+        asyncio.run(self._log_queue_summary())
+
+    async def _log_queue_summary(self):
+        from workflows.job_queue import get_job_queue
+
+        try:
+            stats = await get_job_queue().stats()
+        except Exception as e:
+            logger.warning(f"Could not read workflow queue stats: {e}")
+            return
+        logger.info(
+            f"[workflows] workers={self.alive()}/{len(self.slots)} "
+            f"restarts={sum(s.restarts for s in self.slots)} "
+            f"queued={stats['lag']} running={stats['pending']}"
+        )
+
+    def _shutdown(self):
+        super()._shutdown()
+        logger.info("Workflow workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run workflow worker processes")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes on this host")
+    parser.add_argument('--concurrency', type=int, default=settings.WORKFLOW_WORKER_CONCURRENCY,
+                        help="Workflows run at once per process")
+    parser.add_argument('--grace', type=float, default=60.0,
+                        help="Seconds running workflows get to finish on shutdown")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="First Prometheus port; one per worker process")
+    args = parser.parse_args()
+
+    WorkerPool(args.processes, args.concurrency, args.grace, args.metrics_port).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+DLQ Replayer for CrisisLens.
+
+Reads the dead letter queue written by CrisisKafkaConsumer._send_to_dlq and
+re-publishes matching entries to their original topics at a bounded rate.
+Each named replay uses its own consumer group, so its committed offsets
+record how far it got and a rerun resumes there. A JSON progress file keeps
+the running totals across runs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import asyncio
+import base64
+import json
+import logging
+import os
+import tempfile
+
+from kafka import KafkaConsumer
+from kafka.structs import TopicPartition
+
+from config import settings
+from services.kafka_codecs import JSON_CONTENT_TYPE, MessageDecodeError, decode_value
+from services.kafka_consumer import _offset_and_metadata
+from services.kafka_memory import (
+    MEMORY_BOOTSTRAP,
+    InMemoryBroker,
+    InMemoryKafkaConsumer,
+    get_memory_broker
+)
+from services.kafka_producer import CrisisKafkaProducer, get_kafka_producer
+from services.metrics import crisislen_dlq_replay_total
+
+logger = logging.getLogger(__name__)
+
+DLQ_TOPIC = 'dlq'
+# Header on replayed messages naming the DLQ record they came from
+REPLAY_HEADER = 'x-dlq-replay'
+
+
+class ReplayAbortedError(Exception):
+    """Raised when a replayed message could not be published."""
+
+
+class TokenBucket:
+    """Async token bucket limiting an average rate with bounded bursts."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[int] = None):
+        """
+        Initialize bucket.
+
+        Args:
+            rate: Tokens per second; None or 0 disables limiting
+            burst: Bucket size (defaults to one second of tokens)
+        """
+        self.rate = rate or 0.0
+        self.capacity = float(burst or max(1, int(self.rate)))
+        self._tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(
+                        self.capacity,
+                        self._tokens + (now - self._updated) * self.rate
+                    )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive UTC datetime, the format DLQ timestamps are written in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class DLQReplayer:
+    """Redrive dead-lettered messages to their original topics."""
+
+    def __init__(
+        self,
+        name: str = 'default',
+        topics: Optional[Iterable[str]] = None,
+        error_types: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        rate_per_second: Optional[float] = 50.0,
+        concurrency: int = 8,
+        batch_size: int = 500,
+        progress_path: Optional[str] = None,
+        dry_run: bool = False,
+        producer: Optional[CrisisKafkaProducer] = None,
+        bootstrap_servers: list[str] = None,
+        poll_timeout_ms: int = 1000,
+        broker: Optional[InMemoryBroker] = None
+    ):
+        """
+        Initialize replayer.
+
+        Args:
+            name: Replay name; reruns with the same name resume where the
+                last one stopped. Use a new name for a different filter.
+            topics: Only replay entries from these original topics
+            error_types: Only replay entries that failed with these errors
+            since: Only replay entries dead-lettered at or after this time
+            until: Only replay entries dead-lettered before this time
+            rate_per_second: Maximum replayed messages per second
+                (None for unlimited)
+            concurrency: Maximum deliveries awaited at once
+            batch_size: DLQ records fetched per poll
+            progress_path: JSON file accumulating replay totals
+            dry_run: Count what would be replayed without publishing or
+                committing
+            producer: Producer for the original topics
+            bootstrap_servers: List of Kafka broker addresses
+            poll_timeout_ms: How long a single DLQ poll may wait
+            broker: In-process broker to use instead of a Kafka cluster
+        """
+        self.name = name
+        self.group_id = f"crisis-lens-dlq-replay-{name}"
+        self.topics = set(topics) if topics else None
+        self.error_types = set(error_types) if error_types else None
+        self.since = _as_utc(since) if since else None
+        self.until = _as_utc(until) if until else None
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size
+        self.progress_path = progress_path
+        self.dry_run = dry_run
+        self.bootstrap_servers = (
+            bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS.split(',')
+        )
+        if broker is None and self.bootstrap_servers == [MEMORY_BOOTSTRAP]:
+            broker = get_memory_broker()
+        self.broker = broker
+        self.poll_timeout_ms = poll_timeout_ms
+        self._producer = producer
+        self._bucket = TokenBucket(rate_per_second)
+        self._stop_offsets: Dict[TopicPartition, int] = {}
+        self._running = False
+        self._aborted = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.progress = self._load_progress()
+
+    def _load_progress(self) -> Dict[str, Any]:
+        """Totals from earlier runs of this replay, if any."""
+        progress = {
+            'name': self.name,
+            'group_id': self.group_id,
+            'replayed': 0,
+            'skipped': 0,
+            'invalid': 0,
+            'failed': 0,
+            'offsets': {},
+            'completed': False
+        }
+        if self.progress_path and os.path.exists(self.progress_path):
+            with open(self.progress_path) as f:
+                saved = json.load(f)
+            if saved.get('name') == self.name:
+                progress.update(saved)
+                progress['completed'] = False
+        progress['filters'] = {
+            'topics': sorted(self.topics) if self.topics else None,
+            'error_types': sorted(self.error_types) if self.error_types else None,
+            'since': self.since.isoformat() if self.since else None,
+            'until': self.until.isoformat() if self.until else None
+        }
+        return progress
+
+    def _save_progress(self):
+        """Atomically write the progress file."""
+        if not self.progress_path or self.dry_run:
+            return
+        self.progress['updated_at'] = datetime.utcnow().isoformat()
+        directory = os.path.dirname(os.path.abspath(self.progress_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.dlq-progress-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.progress, f, indent=2)
+        os.replace(tmp_path, self.progress_path)
+
+    def _get_consumer(self) -> KafkaConsumer:
+        """Create the DLQ consumer; runs on the replay thread."""
+        consumer_class = KafkaConsumer
+        client_config: Dict[str, Any] = {'bootstrap_servers': self.bootstrap_servers}
+        if self.broker is not None:
+            consumer_class = InMemoryKafkaConsumer
+            client_config = {'broker': self.broker}
+
+        return consumer_class(
+            DLQ_TOPIC,
+            **client_config,
+            group_id=self.group_id,
+            auto_offset_reset='earliest',
+            enable_auto_commit=False,
+            key_deserializer=lambda k: k.decode('utf-8') if k else None,
+            max_poll_records=self.batch_size
+        )
+
+    async def _call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking Kafka client call on the replay thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        """Whether a DLQ entry passes the topic, error type and time filters."""
+        if self.topics is not None and entry.get('original_topic') not in self.topics:
+            return False
+        if self.error_types is not None and entry.get('error_type') not in self.error_types:
+            return False
+        if self.since is None and self.until is None:
+            return True
+
+        try:
+            failed_at = _as_utc(datetime.fromisoformat(entry['timestamp']))
+        except (KeyError, TypeError, ValueError):
+            return False
+        if self.since is not None and failed_at < self.since:
+            return False
+        if self.until is not None and failed_at >= self.until:
+            return False
+        return True
+
+    def _count(self, status: str, topic: Optional[str]):
+        self.progress[status] += 1
+        crisislen_dlq_replay_total.labels(topic=topic or 'unknown', status=status).inc()
+
+    async def _replay_record(self, tp: TopicPartition, record: Any, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Replay one DLQ record.
+
+        Returns:
+            False if publishing failed and the record must be retried
+        """
+        async with semaphore:
+            if self._aborted:
+                return False
+
+            try:
+                entry = decode_value(record.value, record.headers)
+            except MessageDecodeError as e:
+                logger.warning(f"Undecodable DLQ record at offset {record.offset}: {e}")
+                self._count('invalid', None)
+                return True
+
+            if not isinstance(entry, dict) or not self.matches(entry):
+                self._count('skipped', entry.get('original_topic') if isinstance(entry, dict) else None)
+                return True
+
+            topic = entry.get('original_topic')
+            has_raw = entry.get('original_value_base64') is not None
+            if not topic or (not has_raw and entry.get('original_value') is None):
+                self._count('invalid', topic)
+                return True
+
+            await self._bucket.acquire()
+            if self.dry_run:
+                self._count('replayed', topic)
+                return True
+
+            headers = dict(entry.get('original_headers') or {})
+            headers[REPLAY_HEADER] = f"{tp.topic}[{tp.partition}]@{record.offset}"
+            producer = self._producer or get_kafka_producer()
+            if has_raw:
+                # Bytes that could not be decoded are replayed exactly as received
+                sent = await producer.send_encoded(
+                    topic,
+                    base64.b64decode(entry['original_value_base64']),
+                    entry.get('original_content_type') or JSON_CONTENT_TYPE,
+                    key=entry.get('original_key'),
+                    headers=headers
+                )
+            else:
+                sent = await producer.send_event(
+                    topic,
+                    entry['original_value'],
+                    key=entry.get('original_key'),
+                    headers=headers
+                )
+
+            if not sent:
+                self._aborted = True
+                self._count('failed', topic)
+                return False
+            self._count('replayed', topic)
+            return True
+
+    async def _replay_batch(self, consumer: KafkaConsumer, tp: TopicPartition, records: List[Any]):
+        """Replay a batch concurrently and commit up to the first failure."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._replay_record(tp, record, semaphore) for record in records)
+        )
+
+        next_offset = records[-1].offset + 1
+        for record, ok in zip(records, results):
+            if not ok:
+                next_offset = record.offset
+                break
+
+        if not self.dry_run:
+            await self._call(consumer.commit, {tp: _offset_and_metadata(next_offset)})
+            self.progress['offsets'][f"{tp.topic}[{tp.partition}]"] = next_offset
+            self._save_progress()
+
+        if self._aborted:
+            raise ReplayAbortedError(
+                f"Publishing failed at {tp.topic}[{tp.partition}]@{next_offset}; "
+                f"rerun '{self.name}' to resume from there"
+            )
+
+    def _snapshot_end_offsets(self, consumer: KafkaConsumer):
+        """
+        Fix where replay stops for newly assigned partitions.
+
+        Entries that fail again while being replayed are dead-lettered past
+        this point, so one run never loops over its own failures.
+        """
+        new = [tp for tp in consumer.assignment() if tp not in self._stop_offsets]
+        if new:
+            self._stop_offsets.update(consumer.end_offsets(new))
+
+    def _caught_up(self, consumer: KafkaConsumer) -> bool:
+        """Whether every assigned partition reached its stop offset."""
+        assignment = consumer.assignment()
+        return bool(assignment) and all(
+            tp in self._stop_offsets and consumer.position(tp) >= self._stop_offsets[tp]
+            for tp in assignment
+        )
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Replay the DLQ up to its end at the time each partition was assigned.
+
+        Returns:
+            Progress totals
+
+        Raises:
+            ReplayAbortedError: If a message could not be re-published;
+                offsets are committed up to it so a rerun resumes there
+        """
+        self._running = True
+        self._aborted = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dlq-replay')
+        consumer = await self._call(self._get_consumer)
+        logger.info(f"Replaying {DLQ_TOPIC} as {self.group_id} (dry_run={self.dry_run})")
+
+        try:
+            while self._running:
+                records = await self._call(
+                    consumer.poll,
+                    timeout_ms=self.poll_timeout_ms,
+                    max_records=self.batch_size
+                )
+                await self._call(self._snapshot_end_offsets, consumer)
+
+                for tp, batch in records.items():
+                    batch = [r for r in batch if r.offset < self._stop_offsets.get(tp, 0)]
+                    if batch:
+                        await self._replay_batch(consumer, tp, batch)
+
+                if await self._call(self._caught_up, consumer):
+                    self.progress['completed'] = True
+                    break
+        finally:
+            self._running = False
+            self._save_progress()
+            await self._call(consumer.close)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            logger.info(
+                f"DLQ replay '{self.name}': replayed={self.progress['replayed']} "
+                f"skipped={self.progress['skipped']} invalid={self.progress['invalid']} "
+                f"failed={self.progress['failed']} completed={self.progress['completed']}"
+            )
+
+        return self.progress
+
+    def stop(self):
+        """Stop after the current batch; a rerun resumes from there."""
+        self._running = False
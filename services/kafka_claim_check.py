@@ -0,0 +1,358 @@
+"""
+Claim-check storage for large Kafka message fields.
+
+Producers move configured fields (raw source payloads, media metadata)
+that encode above a size threshold into a content-addressed blob store and
+put only a small reference on the topic. Consumers wrap the containers
+holding references so each field is fetched the first time a handler reads
+it; handlers that never touch the field never pay for it. A first read is
+a blocking store call, so consumers fetch the fields of handlers that need
+whole messages in a worker thread beforehand (see ``ClaimCheck.resolve``),
+and producers on the event loop offload in a worker thread.
+"""
+from collections.abc import ItemsView, ValuesView
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+
+from config import settings
+from services.kafka_codecs import codec_for_content_type
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_KEY = '$claim_check'
+
+DEFAULT_FIELDS = ('raw_data', 'media.metadata')
+
+
+class BlobNotFoundError(Exception):
+    """Raised when a referenced blob is missing from the store."""
+
+
+class LocalBlobStore:
+    """Content-addressed blobs on a local or shared filesystem."""
+
+    def __init__(self, root: str):
+        """
+        Initialize store.
+
+        Args:
+            root: Directory holding the blobs
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        """Store a blob once and return its key."""
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if os.path.exists(path):
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        """Read a blob."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(key)
+
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored."""
+        return os.path.exists(self._path(key))
+
+
+class S3BlobStore:
+    """Content-addressed blobs in an S3-compatible bucket (AWS S3, MinIO)."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = '',
+        endpoint_url: Optional[str] = None,
+        client: Any = None
+    ):
+        """
+        Initialize store.
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix inside the bucket
+            endpoint_url: Endpoint of an S3-compatible service
+            client: Preconfigured boto3 S3 client
+        """
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ValueError("S3 blob store requires boto3, which is not installed")
+            client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+        return code in ('404', 'NoSuchKey', 'NotFound')
+
+    def put(self, data: bytes) -> str:
+        """Store a blob once and return its key."""
+        key = hashlib.sha256(data).hexdigest()
+        if not self.exists(key):
+            self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+        return key
+
+    def get(self, key: str) -> bytes:
+        """Read a blob."""
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._is_not_found(e):
+                raise BlobNotFoundError(key)
+            raise
+        return response['Body'].read()
+
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored."""
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if self._is_not_found(e):
+                return False
+            raise
+
+
+def blob_store_from_url(url: str, endpoint_url: Optional[str] = None):
+    """
+    Create a blob store from a URL.
+
+    Args:
+        url: file:///path/to/dir or s3://bucket/prefix
+        endpoint_url: Endpoint of an S3-compatible service
+
+    Raises:
+        ValueError: If the scheme is not supported
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return LocalBlobStore(parsed.path)
+    if parsed.scheme == 's3':
+        return S3BlobStore(parsed.netloc, parsed.path, endpoint_url=endpoint_url)
+    raise ValueError(f"Unsupported blob store URL: {url}")
+
+
+def is_reference(value: Any) -> bool:
+    """Whether a value is a claim-check reference."""
+    return type(value) is dict and len(value) == 1 and REFERENCE_KEY in value
+
+
+class ClaimCheckedDict(dict):
+    """
+    Dict that fetches claim-check references the first time they are read.
+
+    Resolved values replace their reference in place, so each blob is
+    fetched at most once per message. Unpacking (``**message``), ``get``,
+    ``items`` and ``values`` all resolve, blocking on the store;
+    ``detach`` copies the message without fetching anything.
+    """
+
+    def __init__(self, data: Dict[str, Any], store: Any):
+        super().__init__(data)
+        self._store = store
+
+    def _resolve(self, key: Any, value: Any) -> Any:
+        if is_reference(value):
+            reference = value[REFERENCE_KEY]
+            codec = codec_for_content_type(reference.get('content_type'))
+            value = codec.decode(self._store.get(reference['key']))
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._resolve(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # Overriding __iter__ makes ** unpacking go through __getitem__
+        return dict.__iter__(self)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def copy(self) -> 'ClaimCheckedDict':
+        return ClaimCheckedDict(dict(dict.items(self)), self._store)
+
+    def is_resolved(self, key: Any) -> bool:
+        """Whether a field has been fetched (or was never offloaded)."""
+        return not is_reference(dict.get(self, key))
+
+
+def detach(value: Any) -> Any:
+    """Copy a message into plain containers, keeping unread references as they are."""
+    if isinstance(value, dict):
+        return {k: detach(v) for k, v in dict.items(value)}
+    if isinstance(value, list):
+        return [detach(v) for v in value]
+    return value
+
+
+class ClaimCheck:
+    """Offload large fields on produce and attach lazy resolution on consume."""
+
+    def __init__(
+        self,
+        store: Any,
+        threshold_bytes: int = 64 * 1024,
+        fields: Iterable[str] = DEFAULT_FIELDS
+    ):
+        """
+        Initialize claim-check.
+
+        Args:
+            store: Blob store with put/get
+            threshold_bytes: Encoded size above which a field is offloaded
+            fields: Dotted field paths to consider; a path segment naming a
+                list applies to each element, e.g. 'media.metadata'
+        """
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+        self.fields: List[List[str]] = [path.split('.') for path in fields]
+
+    def offload(self, value: Dict[str, Any], codec: Any) -> Dict[str, Any]:
+        """
+        Replace large fields with references, writing them to the store.
+
+        Args:
+            value: Message about to be produced; it is not modified
+            codec: Codec the fields are encoded with
+
+        Returns:
+            Plain message with references in place of large fields
+        """
+        message = detach(value)
+        for path in self.fields:
+            self._offload_path(message, path, codec)
+        return message
+
+    def _offload_path(self, container: Any, path: List[str], codec: Any):
+        if not isinstance(container, dict) or path[0] not in container:
+            return
+        name, rest = path[0], path[1:]
+        field = container[name]
+
+        if rest:
+            for child in field if isinstance(field, list) else [field]:
+                self._offload_path(child, rest, codec)
+            return
+
+        if not field or is_reference(field):
+            return
+        data = codec.encode(field)
+        if len(data) < self.threshold_bytes:
+            return
+        container[name] = {
+            REFERENCE_KEY: {
+                'key': self.store.put(data),
+                'size': len(data),
+                'content_type': codec.content_type
+            }
+        }
+
+    def attach(self, value: Any) -> Any:
+        """Wrap containers holding references so they resolve on first read."""
+        if not isinstance(value, dict):
+            return value
+        for path in self.fields:
+            value = self._attach_path(value, path)
+        return value
+
+    def _attach_path(self, container: Any, path: List[str]) -> Any:
+        if not isinstance(container, dict) or path[0] not in container:
+            return container
+        name, rest = path[0], path[1:]
+        field = dict.__getitem__(container, name)
+
+        if rest:
+            if isinstance(field, list):
+                field[:] = [self._attach_path(child, rest) for child in field]
+            else:
+                dict.__setitem__(container, name, self._attach_path(field, rest))
+            return container
+
+        if is_reference(field) and not isinstance(container, ClaimCheckedDict):
+            return ClaimCheckedDict(container, self.store)
+        return container
+
+    async def resolve(self, value: Any) -> Any:
+        """Fetch every reference of a message in a worker thread."""
+        def load(container: Any, path: List[str]):
+            if not isinstance(container, dict) or path[0] not in container:
+                return
+            field = container[path[0]]
+            if len(path) > 1:
+                for child in field if isinstance(field, list) else [field]:
+                    load(child, path[1:])
+
+        def load_all():
+            for path in self.fields:
+                load(value, path)
+
+        await asyncio.to_thread(load_all)
+        return value
+
+
+@lru_cache(maxsize=1)
+def get_claim_check() -> Optional[ClaimCheck]:
+    """Claim-check configured in settings, or None when disabled."""
+    if not settings.KAFKA_BLOB_STORE_URL:
+        return None
+    store = blob_store_from_url(
+        settings.KAFKA_BLOB_STORE_URL,
+        endpoint_url=settings.KAFKA_BLOB_STORE_ENDPOINT
+    )
+    logger.info(f"Claim-check enabled: {settings.KAFKA_BLOB_STORE_URL}")
+    return ClaimCheck(
+        store,
+        threshold_bytes=settings.KAFKA_CLAIM_CHECK_THRESHOLD_BYTES,
+        fields=settings.KAFKA_CLAIM_CHECK_FIELDS
+    )
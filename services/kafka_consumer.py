@@ -3,19 +3,73 @@ Kafka Consumer Service for CrisisLens.
 
 Consumes events from Kafka topics and triggers appropriate workflows.
 """
-from typing import Callable, Dict, Any, Optional
-from kafka import KafkaConsumer
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, List, Optional, Tuple
+from kafka import ConsumerRebalanceListener, KafkaConsumer
 from kafka.errors import KafkaError
-import json
+from kafka.structs import TopicPartition, OffsetAndMetadata
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+import base64
 import logging
 import asyncio
 from datetime import datetime
 import signal
 import sys
+import time
+
+from config import settings
+from services.kafka_claim_check import ClaimCheck, detach, get_claim_check
+from services.kafka_codecs import CONTENT_TYPE_HEADER, MessageDecodeError, decode_value
+from services.kafka_dedup import DedupFilter, get_dedup_filter
+from services.kafka_dispatch import (
+    EXPRESS,
+    PRIORITY_HEADER,
+    OffsetTracker,
+    PartitionedDispatcher,
+    PriorityScheduler
+)
+from services.kafka_memory import (
+    MEMORY_BOOTSTRAP,
+    InMemoryBroker,
+    InMemoryKafkaConsumer,
+    get_memory_broker
+)
+from services.metrics import (
+    crisislen_kafka_in_flight_records,
+    crisislen_kafka_partition_paused,
+    crisislen_kafka_backpressure_pauses_total,
+    crisislen_kafka_committed_offset,
+    crisislen_kafka_end_offset,
+    crisislen_kafka_consumer_lag,
+    crisislen_kafka_records_consumed_total,
+    crisislen_kafka_records_per_second,
+    crisislen_kafka_handler_duration_seconds,
+    crisislen_kafka_scheduler_wait_seconds,
+    crisislen_kafka_duplicates_skipped_total,
+    crisislen_kafka_dlq_messages_total
+)
 
 logger = logging.getLogger(__name__)
 
 
+class BatchItemsFailed(Exception):
+    """
+    Raised by a batch handler when only some of its messages failed.
+    
+    The consumer dead-letters the failed messages and treats the rest of
+    the batch as handled.
+    """
+    
+    def __init__(self, failures: Dict[int, Exception]):
+        """
+        Args:
+            failures: Position in the handler's message list -> error
+        """
+        super().__init__(f"{len(failures)} messages of the batch failed")
+        self.failures = failures
+
+
 class CrisisKafkaConsumer:
     """Kafka consumer with event processing and error handling."""
     
@@ -25,7 +79,25 @@ class CrisisKafkaConsumer:
         group_id: str,
         bootstrap_servers: list[str] = None,
         auto_offset_reset: str = 'earliest',
-        enable_auto_commit: bool = True
+        enable_auto_commit: bool = True,
+        processing_mode: str = 'sequential',
+        max_concurrency: int = 8,
+        topic_concurrency: Optional[Dict[str, int]] = None,
+        poll_timeout_ms: int = 1000,
+        max_poll_records: int = 100,
+        prefetch_batches: int = 2,
+        at_least_once: bool = False,
+        commit_interval_ms: int = 1000,
+        max_in_flight_per_partition: int = 500,
+        resume_in_flight_per_partition: Optional[int] = None,
+        metrics_interval_ms: int = 15000,
+        scheduler: Optional[PriorityScheduler] = None,
+        topic_priorities: Optional[Dict[str, str]] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        dedup: Optional[DedupFilter] = None,
+        dedup_topics: Optional[Iterable[str]] = None,
+        revoke_timeout_ms: int = 10000,
+        broker: Optional[InMemoryBroker] = None
     ):
         """
         Initialize Kafka consumer.
@@ -36,102 +108,806 @@ class CrisisKafkaConsumer:
             bootstrap_servers: List of Kafka broker addresses
             auto_offset_reset: Where to start reading ('earliest' or 'latest')
             enable_auto_commit: Whether to auto-commit offsets
+            processing_mode: 'sequential' awaits each record in turn;
+                'concurrent' runs records with different partitions/keys
+                concurrently while keeping per-key ordering
+            max_concurrency: Concurrent handlers per topic in concurrent mode
+            topic_concurrency: Per-topic overrides of max_concurrency
+            poll_timeout_ms: How long a single poll may wait for records
+            max_poll_records: Maximum records returned by a single poll
+            prefetch_batches: Polled batches buffered ahead of the handlers
+            at_least_once: Disable auto-commit and commit offsets in bulk
+                only after their handlers have returned
+            commit_interval_ms: How often completed offsets are committed
+                in at-least-once mode
+            max_in_flight_per_partition: High-water mark of unfinished
+                records at which a partition is paused
+            resume_in_flight_per_partition: Low-water mark at which a paused
+                partition is resumed (defaults to half the high-water mark)
+            metrics_interval_ms: How often offset, lag and throughput
+                gauges are refreshed from the brokers
+            scheduler: Priority scheduler granting handler slots; share one
+                between consumers in a process so their topics are
+                scheduled against each other. None runs handlers unscheduled.
+            topic_priorities: Topic -> scheduler priority class; topics not
+                listed are 'normal'. Records with an 'x-priority: express'
+                header always use the express lane.
+            claim_check: Resolves blob references in large fields when a
+                handler reads them (defaults to the one configured in
+                settings, if any)
+            dedup: Skips records whose key (or 'id') was already handled
+                successfully by this consumer group
+            dedup_topics: Topics to deduplicate (all topics when None)
+            revoke_timeout_ms: How long a rebalance waits for in-flight
+                records of revoked partitions; records still running then
+                are cancelled and redelivered to the partitions' new owners
+            broker: In-process broker to use instead of a Kafka cluster
         """
+        if processing_mode not in ('sequential', 'concurrent'):
+            raise ValueError(f"Unknown processing mode: {processing_mode}")
+        self.topic_priorities = topic_priorities or {}
+        if scheduler is not None:
+            unknown = set(self.topic_priorities.values()) - set(scheduler.weights)
+            if unknown:
+                raise ValueError(f"Unknown priority classes: {sorted(unknown)}")
+        self.scheduler = scheduler
+        self.claim_check = claim_check or get_claim_check()
+        self.dedup = dedup
+        self.dedup_topics = set(dedup_topics) if dedup_topics is not None else None
+        
         self.topics = topics
         self.group_id = group_id
-        self.bootstrap_servers = bootstrap_servers or ['localhost:29092']
+        self.bootstrap_servers = (
+            bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS.split(',')
+        )
+        if broker is None and self.bootstrap_servers == [MEMORY_BOOTSTRAP]:
+            broker = get_memory_broker()
+        self.broker = broker
         self.auto_offset_reset = auto_offset_reset
-        self.enable_auto_commit = enable_auto_commit
+        self.at_least_once = at_least_once
+        self.enable_auto_commit = enable_auto_commit and not at_least_once
+        self.commit_interval_ms = commit_interval_ms
         self._consumer: Optional[KafkaConsumer] = None
         self._running = False
         self._handlers: Dict[str, Callable] = {}
+        self._batch_handlers: Dict[str, Dict[str, Any]] = {}
+        self._batch_buffers: Dict[str, List[Any]] = {}
+        self._batch_deadlines: Dict[str, float] = {}
+        self._resolve_topics: set[str] = set()
+        self._offsets = OffsetTracker()
+        self._last_commit = 0.0
+        self.revoke_timeout_ms = revoke_timeout_ms
+        # Bumped on every rebalance; batches polled before it are dropped
+        self._generation = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.max_in_flight_per_partition = max_in_flight_per_partition
+        self.resume_in_flight_per_partition = (
+            resume_in_flight_per_partition
+            if resume_in_flight_per_partition is not None
+            else max_in_flight_per_partition // 2
+        )
+        self._paused: set[TopicPartition] = set()
+        self.records_processed = 0
+        self.records_failed = 0
+        self.metrics_interval_ms = metrics_interval_ms
+        self._last_metrics_refresh = 0.0
+        self._last_metrics_processed = 0
+        self._exported_partitions: set[TopicPartition] = set()
+        self.processing_mode = processing_mode
+        self._dispatcher = PartitionedDispatcher(
+            default_concurrency=max_concurrency,
+            topic_concurrency=topic_concurrency
+        )
+        self.poll_timeout_ms = poll_timeout_ms
+        self.max_poll_records = max_poll_records
+        self.prefetch_batches = prefetch_batches
+        # kafka-python is blocking and not thread-safe, so every call on the
+        # client goes through this single dedicated thread
+        self._executor: Optional[ThreadPoolExecutor] = None
         
     def _get_consumer(self) -> KafkaConsumer:
         """Get or create Kafka consumer instance."""
         if self._consumer is None:
-            self._consumer = KafkaConsumer(
-                *self.topics,
-                bootstrap_servers=self.bootstrap_servers,
+            consumer_class = KafkaConsumer
+            client_config: Dict[str, Any] = {'bootstrap_servers': self.bootstrap_servers}
+            if self.broker is not None:
+                consumer_class = InMemoryKafkaConsumer
+                client_config = {'broker': self.broker}
+            
+            self._consumer = consumer_class(
+                **client_config,
                 group_id=self.group_id,
                 auto_offset_reset=self.auto_offset_reset,
                 enable_auto_commit=self.enable_auto_commit,
-                value_deserializer=lambda m: json.loads(m.decode('utf-8')),
                 key_deserializer=lambda k: k.decode('utf-8') if k else None,
-                max_poll_records=100,
+                max_poll_records=self.max_poll_records,
                 session_timeout_ms=30000,
                 heartbeat_interval_ms=10000
             )
+            self._consumer.subscribe(
+                topics=self.topics,
+                listener=_RebalanceListener(self, self._consumer)
+            )
             logger.info(
                 f"Kafka consumer initialized: group={self.group_id}, "
                 f"topics={self.topics}"
             )
         return self._consumer
     
-    def register_handler(self, topic: str, handler: Callable[[Dict[str, Any]], None]):
+    def register_handler(
+        self,
+        topic: str,
+        handler: Callable[[Dict[str, Any]], None],
+        resolve_claim_checks: bool = False
+    ):
         """
         Register a handler function for a specific topic.
         
         Args:
             topic: Topic name
             handler: Async function to handle messages from this topic
+            resolve_claim_checks: Fetch every claim-checked field in a worker
+                thread before the handler runs. Set it for handlers that read
+                or serialize whole messages; otherwise fields are fetched on
+                first read, which blocks the event loop.
         """
         self._handlers[topic] = handler
+        self._set_resolve(topic, resolve_claim_checks)
         logger.info(f"Registered handler for topic: {topic}")
     
-    async def start(self):
-        """Start consuming messages."""
+    def register_batch_handler(
+        self,
+        topic: str,
+        handler: Callable[[List[Dict[str, Any]]], None],
+        max_batch: int = 100,
+        max_wait_ms: int = 500,
+        resolve_claim_checks: bool = False
+    ):
+        """
+        Register a handler that receives lists of messages for a topic.
+        
+        A batch is delivered once max_batch messages are buffered or the
+        oldest buffered message has waited max_wait_ms, whichever is first.
+        
+        Args:
+            topic: Topic name
+            handler: Async function to handle a list of messages
+            max_batch: Maximum number of messages per batch
+            max_wait_ms: Maximum time a message waits for its batch to fill
+            resolve_claim_checks: Fetch every claim-checked field before the
+                handler runs (see register_handler)
+        """
+        self._batch_handlers[topic] = {
+            'handler': handler,
+            'max_batch': max_batch,
+            'max_wait_ms': max_wait_ms
+        }
+        self._batch_buffers[topic] = []
+        self._set_resolve(topic, resolve_claim_checks)
+        logger.info(
+            f"Registered batch handler for topic: {topic} "
+            f"(max_batch={max_batch}, max_wait_ms={max_wait_ms})"
+        )
+    
+    def _set_resolve(self, topic: str, resolve_claim_checks: bool):
+        if resolve_claim_checks:
+            self._resolve_topics.add(topic)
+        else:
+            self._resolve_topics.discard(topic)
+    
+    async def _resolve_claim_checks(self, topic: str, messages: List[Any]):
+        """Fetch claim-checked fields off the event loop for topics that need whole messages."""
+        if self.claim_check is None or topic not in self._resolve_topics:
+            return
+        await asyncio.gather(*(self.claim_check.resolve(m) for m in messages))
+    
+    async def _call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking Kafka client call on the consumer thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(fn, *args, **kwargs)
+        )
+    
+    def _poll_records(self, consumer: KafkaConsumer) -> Tuple[int, Dict[Any, list]]:
+        """
+        Poll and decode records; runs on the consumer thread.
+        
+        Returns:
+            Rebalance generation the records were fetched in, and the
+            records per partition
+        """
+        messages = consumer.poll(
+            timeout_ms=self.poll_timeout_ms,
+            max_records=self.max_poll_records
+        )
+        # Rebalance callbacks run inside poll(), so this is the generation
+        # the returned records belong to
+        generation = self._generation
+        return generation, {
+            tp: [self._decode_record(record) for record in records]
+            for tp, records in messages.items()
+        }
+    
+    def _decode_record(self, record: Any) -> Any:
+        """Decode a record value by its content-type header."""
+        try:
+            value = decode_value(record.value, record.headers)
+        except MessageDecodeError as e:
+            # Kept on the record so the failure is routed to the DLQ
+            value = e
+        else:
+            if self.claim_check is not None:
+                value = self.claim_check.attach(value)
+        return record._replace(value=value)
+    
+    async def _poll_loop(self, consumer: KafkaConsumer, queue: asyncio.Queue):
+        """Poll Kafka on the consumer thread and feed batches to the event loop."""
+        while self._running:
+            try:
+                generation, messages = await self._call(self._poll_records, consumer)
+            except KafkaError as e:
+                logger.error(f"Kafka poll failed: {e}")
+                await asyncio.sleep(self.poll_timeout_ms / 1000)
+                continue
+            
+            if messages:
+                await queue.put((generation, messages))
+    
+    async def start(self, handle_signals: bool = True):
+        """
+        Start consuming messages.
+        
+        Args:
+            handle_signals: Stop gracefully on SIGINT/SIGTERM. Disable when
+                several consumers share a process and the caller stops them.
+        """
         self._running = True
-        consumer = self._get_consumer()
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"kafka-{self.group_id}"
+        )
+        consumer = await self._call(self._get_consumer)
         
         # Setup graceful shutdown
         def signal_handler(sig, frame):
             logger.info("Received shutdown signal")
             self._running = False
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        if handle_signals:
+            signal.signal(signal.SIGINT, signal_handler)
+            signal.signal(signal.SIGTERM, signal_handler)
         
         logger.info("Starting Kafka consumer loop...")
         
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch_batches)
+        poller = asyncio.create_task(self._poll_loop(consumer, queue))
+        
         try:
-            while self._running:
-                # Poll for messages
-                messages = consumer.poll(timeout_ms=1000, max_records=100)
+            # Keep handling batches the poller already fetched after a stop
+            while self._running or not poller.done() or not queue.empty():
+                try:
+                    generation, messages = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=self._next_wait_timeout()
+                    )
+                except asyncio.TimeoutError:
+                    generation, messages = self._generation, None
+                    if poller.done():
+                        # Surface unexpected poller failures
+                        poller.result()
                 
-                for topic_partition, records in messages.items():
-                    topic = topic_partition.topic
-                    handler = self._handlers.get(topic)
-                    
-                    if not handler:
-                        logger.warning(f"No handler registered for topic: {topic}")
-                        continue
-                    
-                    for record in records:
-                        try:
-                            # Process message
-                            await self._process_message(
-                                topic=topic,
-                                message=record.value,
-                                key=record.key,
-                                offset=record.offset,
-                                partition=record.partition,
-                                handler=handler
-                            )
-                        except Exception as e:
-                            logger.error(
-                                f"Error processing message from {topic}: {e}",
-                                exc_info=True
-                            )
-                            # Send to DLQ
-                            await self._send_to_dlq(topic, record, e)
-                
-                # Allow other tasks to run
-                await asyncio.sleep(0.01)
+                # Batches polled before a rebalance are fetched again by
+                # the partitions' owners from their committed offsets
+                if messages and generation == self._generation:
+                    await self._dispatch_batch(messages)
+                await self._flush_due_batches()
+                await self._apply_backpressure(consumer)
+                await self._maybe_commit(consumer)
+                await self._maybe_refresh_metrics(consumer)
+            
+            await self._flush_due_batches(force=True)
         
         finally:
-            consumer.close()
+            if not poller.done():
+                poller.cancel()
+            await self._dispatcher.drain()
+            if self.at_least_once:
+                await self._commit_offsets(consumer)
+            await self._call(consumer.close)
+            self._clear_partition_metrics()
+            self._consumer = None
+            self._executor.shutdown(wait=True)
+            self._executor = None
             logger.info("Kafka consumer closed")
     
+    async def _dispatch_batch(self, messages: Dict[Any, list]):
+        """Hand a polled batch of records to their topic handlers."""
+        for topic_partition, records in messages.items():
+            topic = topic_partition.topic
+            
+            if topic in self._batch_handlers:
+                for record in records:
+                    self._offsets.track(self._partition_of(record), record.offset)
+                await self._buffer_records(topic, records)
+                continue
+            
+            handler = self._handlers.get(topic)
+            
+            if not handler:
+                logger.warning(f"No handler registered for topic: {topic}")
+                continue
+            
+            for record in records:
+                self._offsets.track(self._partition_of(record), record.offset)
+                if self.processing_mode == 'concurrent':
+                    self._dispatcher.submit(
+                        topic,
+                        self._ordering_key(record),
+                        lambda r=record, h=handler, t=topic: self._handle_record(t, r, h),
+                        partitions=(topic_partition,)
+                    )
+                else:
+                    await self._handle_record(topic, record, handler)
+    
+    async def _buffer_records(self, topic: str, records: List[Any]):
+        """Add records to a topic's batch, submitting full batches."""
+        config = self._batch_handlers[topic]
+        buffer = self._batch_buffers[topic]
+        
+        if not buffer:
+            self._batch_deadlines[topic] = (
+                asyncio.get_running_loop().time() + config['max_wait_ms'] / 1000
+            )
+        buffer.extend(records)
+        
+        while len(buffer) >= config['max_batch']:
+            batch = buffer[:config['max_batch']]
+            del buffer[:config['max_batch']]
+            await self._submit_batch(topic, batch)
+    
+    async def _flush_due_batches(self, force: bool = False):
+        """Submit batches whose oldest record has waited max_wait_ms."""
+        now = asyncio.get_running_loop().time()
+        for topic, buffer in self._batch_buffers.items():
+            if buffer and (force or self._batch_deadlines[topic] <= now):
+                batch = list(buffer)
+                buffer.clear()
+                await self._submit_batch(topic, batch)
+    
+    def _next_wait_timeout(self) -> float:
+        """Seconds to wait for records before a batch deadline or commit is due."""
+        timeout = self.poll_timeout_ms / 1000
+        now = asyncio.get_running_loop().time()
+        for topic, buffer in self._batch_buffers.items():
+            if buffer:
+                timeout = min(timeout, self._batch_deadlines[topic] - now)
+        if self.at_least_once:
+            timeout = min(timeout, self._last_commit + self.commit_interval_ms / 1000 - now)
+        if self._paused:
+            # Check drained partitions often so they resume promptly
+            timeout = min(timeout, 0.1)
+        return max(timeout, 0.001)
+    
+    async def _submit_batch(self, topic: str, batch: List[Any]):
+        """Run the batch handler for a topic, concurrently when enabled."""
+        handler = self._batch_handlers[topic]['handler']
+        if self.processing_mode == 'concurrent':
+            # Batches of one topic keep their order relative to each other
+            self._dispatcher.submit(
+                topic,
+                ('batch', topic),
+                lambda: self._handle_batch(topic, batch, handler),
+                partitions={self._partition_of(record) for record in batch}
+            )
+        else:
+            await self._handle_batch(topic, batch, handler)
+    
+    async def _handle_batch(self, topic: str, batch: List[Any], handler: Callable):
+        """Process a batch of records, routing failures to the DLQ."""
+        undecodable = [r for r in batch if isinstance(r.value, MessageDecodeError)]
+        for record in undecodable:
+            self._count_records(topic, 'failed')
+            await self._send_to_dlq(topic, record, record.value)
+        decoded = [r for r in batch if not isinstance(r.value, MessageDecodeError)]
+        
+        started = None
+        try:
+            decoded = await self._drop_duplicates(topic, decoded)
+            if not decoded:
+                return
+            logger.debug(f"Processing batch of {len(decoded)} messages from {topic}")
+            messages = [record.value for record in decoded]
+            await self._resolve_claim_checks(topic, messages)
+            failures = {}
+            async with self._handler_slot(topic, decoded):
+                started = time.perf_counter()
+                try:
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(messages)
+                    else:
+                        handler(messages)
+                except BatchItemsFailed as e:
+                    failures = e.failures
+            self._observe_handler(topic, started)
+            handled = [r for i, r in enumerate(decoded) if i not in failures]
+            self._count_records(topic, 'processed', len(handled))
+            for record in handled:
+                await self._mark_handled(topic, record)
+            if failures:
+                logger.error(f"{len(failures)} of {len(decoded)} messages from {topic} failed")
+                self._count_records(topic, 'failed', len(failures))
+                for i, error in sorted(failures.items()):
+                    await self._send_to_dlq(topic, decoded[i], error)
+        except Exception as e:
+            logger.error(
+                f"Error processing batch of {len(decoded)} messages from {topic}: {e}",
+                exc_info=True
+            )
+            if started is not None:
+                self._observe_handler(topic, started)
+            self._count_records(topic, 'failed', len(decoded))
+            for record in decoded:
+                await self._send_to_dlq(topic, record, e)
+        finally:
+            for record in batch:
+                self._offsets.complete(self._partition_of(record), record.offset)
+    
+    async def _apply_backpressure(self, consumer: KafkaConsumer):
+        """Pause partitions above the high-water mark, resume drained ones."""
+        for tp in self._offsets.partitions():
+            in_flight = self._offsets.pending_count(tp)
+            labels = {
+                'group': self.group_id,
+                'topic': tp.topic,
+                'partition': str(tp.partition)
+            }
+            crisislen_kafka_in_flight_records.labels(**labels).set(in_flight)
+            
+            try:
+                if tp not in self._paused and in_flight >= self.max_in_flight_per_partition:
+                    await self._call(consumer.pause, tp)
+                    self._paused.add(tp)
+                    crisislen_kafka_partition_paused.labels(**labels).set(1)
+                    crisislen_kafka_backpressure_pauses_total.labels(
+                        group=self.group_id,
+                        topic=tp.topic
+                    ).inc()
+                    logger.warning(
+                        f"Paused {tp.topic}[{tp.partition}]: "
+                        f"{in_flight} records in flight"
+                    )
+                elif tp in self._paused and in_flight <= self.resume_in_flight_per_partition:
+                    await self._call(consumer.resume, tp)
+                    self._paused.discard(tp)
+                    crisislen_kafka_partition_paused.labels(**labels).set(0)
+                    logger.info(f"Resumed {tp.topic}[{tp.partition}]")
+            except KafkaError as e:
+                # Partition may have been revoked by a rebalance
+                logger.warning(f"Backpressure update failed for {tp}: {e}")
+                self._paused.discard(tp)
+    
+    async def _revoke_partitions(self, revoked: set) -> Dict[TopicPartition, int]:
+        """
+        Settle revoked partitions before another member takes them over.
+        
+        Records of revoked partitions still waiting in a batch buffer are
+        dropped, in-flight ones get revoke_timeout_ms to finish, and all
+        state kept for the partitions, including backpressure pauses, is
+        forgotten.
+        
+        Returns:
+            Offsets to commit for the revoked partitions
+        """
+        self._generation += 1
+        for topic, buffer in self._batch_buffers.items():
+            buffer[:] = [r for r in buffer if self._partition_of(r) not in revoked]
+        
+        unfinished = await self._dispatcher.drain_partitions(
+            revoked,
+            timeout=self.revoke_timeout_ms / 1000
+        )
+        # Unfinished records hold back the committable offset, so the new
+        # owner processes them again
+        offsets = {}
+        if self.at_least_once:
+            offsets = {
+                tp: offset for tp, offset in self._offsets.committable().items()
+                if tp in revoked
+            }
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            logger.warning(
+                f"Cancelled {len(unfinished)} records of revoked partitions "
+                f"after {self.revoke_timeout_ms}ms"
+            )
+        
+        for tp in revoked:
+            self._offsets.forget(tp)
+            self._clear_backpressure(tp)
+        return offsets
+    
+    def _clear_backpressure(self, tp: TopicPartition):
+        """Drop the pause of a revoked partition; rebalances resume every partition."""
+        self._paused.discard(tp)
+        labels = {
+            'group': self.group_id,
+            'topic': tp.topic,
+            'partition': str(tp.partition)
+        }
+        crisislen_kafka_partition_paused.labels(**labels).set(0)
+        crisislen_kafka_in_flight_records.labels(**labels).set(0)
+    
+    @staticmethod
+    def _partition_offsets(consumer: KafkaConsumer) -> Dict[TopicPartition, Dict[str, int]]:
+        """
+        Position, committed and end offset of each assigned partition.
+        
+        Runs on the consumer thread. Lag is measured against the committed
+        offset, matching what kafka-consumer-groups reports; partitions the
+        group never committed fall back to the fetch position.
+        """
+        assignment = list(consumer.assignment())
+        if not assignment:
+            return {}
+        end_offsets = consumer.end_offsets(assignment)
+        offsets = {}
+        for tp in assignment:
+            position = consumer.position(tp)
+            committed = consumer.committed(tp)
+            end = end_offsets.get(tp, 0)
+            offsets[tp] = {
+                'position': position,
+                'committed': committed,
+                'end': end,
+                'lag': max(end - (committed if committed is not None else position), 0)
+            }
+        return offsets
+    
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of consumer health for supervisors and dashboards.
+        
+        Lag is the number of records in assigned partitions that the group
+        has not committed yet.
+        """
+        lag = {}
+        if self._consumer is not None and self._executor is not None:
+            try:
+                offsets = await self._call(self._partition_offsets, self._consumer)
+                lag = {
+                    f"{tp.topic}[{tp.partition}]": o['lag']
+                    for tp, o in offsets.items()
+                }
+            except KafkaError as e:
+                logger.warning(f"Could not fetch partition offsets: {e}")
+        
+        return {
+            'group_id': self.group_id,
+            'running': self._running,
+            'processed': self.records_processed,
+            'failed': self.records_failed,
+            'in_flight': self._dispatcher.in_flight,
+            'lag': lag,
+            'backpressure': self.backpressure_state()
+        }
+    
+    def backpressure_state(self) -> Dict[str, Any]:
+        """Current in-flight counts and paused partitions."""
+        return {
+            'in_flight': {
+                f"{tp.topic}[{tp.partition}]": self._offsets.pending_count(tp)
+                for tp in self._offsets.partitions()
+            },
+            'paused': sorted(f"{tp.topic}[{tp.partition}]" for tp in self._paused)
+        }
+    
+    def _priority_of(self, topic: str, records: List[Any]) -> str:
+        """Scheduler class for records: express if any asks for it, else the topic's class."""
+        for record in records:
+            for name, value in record.headers or ():
+                if name == PRIORITY_HEADER and value == EXPRESS.encode('utf-8'):
+                    return EXPRESS
+        return self.topic_priorities.get(topic, 'normal')
+    
+    @asynccontextmanager
+    async def _handler_slot(self, topic: str, records: List[Any]) -> AsyncIterator[None]:
+        """Hold a scheduler slot while a handler runs, when a scheduler is set."""
+        if self.scheduler is None:
+            yield
+            return
+        
+        priority = self._priority_of(topic, records)
+        queued_at = time.perf_counter()
+        async with self.scheduler.slot(priority):
+            crisislen_kafka_scheduler_wait_seconds.labels(priority=priority).observe(
+                time.perf_counter() - queued_at
+            )
+            yield
+    
+    def _dedup_key(self, topic: str, record: Any) -> Optional[str]:
+        """Idempotency key of a record, or None when it is not deduplicated."""
+        if self.dedup is None:
+            return None
+        if self.dedup_topics is not None and topic not in self.dedup_topics:
+            return None
+        if record.key is not None:
+            return str(record.key)
+        if isinstance(record.value, dict) and record.value.get('id') is not None:
+            return str(record.value.get('id'))
+        return None
+    
+    async def _drop_duplicates(self, topic: str, records: List[Any]) -> List[Any]:
+        """Records whose key has not been handled successfully yet."""
+        if self.dedup is None:
+            return records
+        
+        fresh = []
+        for record in records:
+            key = self._dedup_key(topic, record)
+            if key is not None and await self.dedup.seen(f"{self.group_id}:{topic}", key):
+                logger.info(f"Skipping duplicate {topic} record {key} at offset {record.offset}")
+                crisislen_kafka_duplicates_skipped_total.labels(
+                    group=self.group_id,
+                    topic=topic
+                ).inc()
+                continue
+            fresh.append(record)
+        return fresh
+    
+    async def _mark_handled(self, topic: str, record: Any):
+        """Remember a successfully handled record so redeliveries are skipped."""
+        key = self._dedup_key(topic, record)
+        if key is not None:
+            await self.dedup.mark(f"{self.group_id}:{topic}", key)
+    
+    def _count_records(self, topic: str, status: str, count: int = 1):
+        """Count handled records by outcome ('processed' or 'failed')."""
+        if status == 'processed':
+            self.records_processed += count
+        else:
+            self.records_failed += count
+        crisislen_kafka_records_consumed_total.labels(
+            group=self.group_id,
+            topic=topic,
+            status=status
+        ).inc(count)
+    
+    def _observe_handler(self, topic: str, started: float):
+        """Record how long a handler call took."""
+        crisislen_kafka_handler_duration_seconds.labels(
+            group=self.group_id,
+            topic=topic
+        ).observe(time.perf_counter() - started)
+    
+    async def _maybe_refresh_metrics(self, consumer: KafkaConsumer):
+        """Refresh offset, lag and throughput gauges once the metrics interval has elapsed."""
+        now = asyncio.get_running_loop().time()
+        elapsed = now - self._last_metrics_refresh
+        if elapsed < self.metrics_interval_ms / 1000:
+            return
+        
+        if self._last_metrics_refresh:
+            processed = self.records_processed + self.records_failed
+            crisislen_kafka_records_per_second.labels(group=self.group_id).set(
+                (processed - self._last_metrics_processed) / elapsed
+            )
+            self._last_metrics_processed = processed
+        self._last_metrics_refresh = now
+        
+        try:
+            offsets = await self._call(self._partition_offsets, consumer)
+        except Exception as e:
+            # Metrics are best effort and must never stop consumption
+            logger.warning(f"Could not refresh offset metrics: {e}")
+            return
+        
+        for tp, o in offsets.items():
+            labels = {
+                'group': self.group_id,
+                'topic': tp.topic,
+                'partition': str(tp.partition)
+            }
+            if o['committed'] is not None:
+                crisislen_kafka_committed_offset.labels(**labels).set(o['committed'])
+            crisislen_kafka_end_offset.labels(**labels).set(o['end'])
+            crisislen_kafka_consumer_lag.labels(**labels).set(o['lag'])
+        
+        # Partitions moved to another member by a rebalance stop reporting here
+        self._clear_partition_metrics(self._exported_partitions - offsets.keys())
+        self._exported_partitions = set(offsets)
+    
+    def _clear_partition_metrics(self, partitions: Optional[set] = None):
+        """Drop offset gauges of partitions this member no longer owns."""
+        if partitions is None:
+            partitions, self._exported_partitions = self._exported_partitions, set()
+        for tp in partitions:
+            label_values = (self.group_id, tp.topic, str(tp.partition))
+            for gauge in (
+                crisislen_kafka_committed_offset,
+                crisislen_kafka_end_offset,
+                crisislen_kafka_consumer_lag
+            ):
+                try:
+                    gauge.remove(*label_values)
+                except KeyError:
+                    pass
+    
+    async def _maybe_commit(self, consumer: KafkaConsumer):
+        """Commit completed offsets once the commit interval has elapsed."""
+        if not self.at_least_once:
+            return
+        now = asyncio.get_running_loop().time()
+        if now - self._last_commit >= self.commit_interval_ms / 1000:
+            self._last_commit = now
+            await self._commit_offsets(consumer)
+    
+    async def _commit_offsets(self, consumer: KafkaConsumer):
+        """Commit offsets of every record whose handler has returned."""
+        offsets = self._offsets.committable()
+        if not offsets:
+            return
+        
+        try:
+            await self._call(
+                consumer.commit,
+                {tp: _offset_and_metadata(offset) for tp, offset in offsets.items()}
+            )
+            self._offsets.mark_committed(offsets)
+            logger.debug(f"Committed offsets: {offsets}")
+        except KafkaError as e:
+            # Uncommitted records are redelivered, which at-least-once allows
+            logger.error(f"Failed to commit offsets: {e}")
+    
+    @staticmethod
+    def _partition_of(record: Any) -> TopicPartition:
+        """Topic partition a record was consumed from."""
+        return TopicPartition(record.topic, record.partition)
+    
+    @staticmethod
+    def _ordering_key(record: Any):
+        """Records sharing a key keep their order; keyless records keep partition order."""
+        if record.key is not None:
+            return ('key', record.key)
+        return ('partition', record.partition)
+    
+    async def _handle_record(self, topic: str, record: Any, handler: Callable):
+        """Process a record, routing failures to the DLQ."""
+        started = None
+        try:
+            if isinstance(record.value, MessageDecodeError):
+                raise record.value
+            if not await self._drop_duplicates(topic, [record]):
+                return
+            await self._resolve_claim_checks(topic, [record.value])
+            async with self._handler_slot(topic, [record]):
+                started = time.perf_counter()
+                await self._process_message(
+                    topic=topic,
+                    message=record.value,
+                    key=record.key,
+                    offset=record.offset,
+                    partition=record.partition,
+                    handler=handler
+                )
+            self._observe_handler(topic, started)
+            self._count_records(topic, 'processed')
+            await self._mark_handled(topic, record)
+        except Exception as e:
+            logger.error(
+                f"Error processing message from {topic}: {e}",
+                exc_info=True
+            )
+            if started is not None:
+                self._observe_handler(topic, started)
+            self._count_records(topic, 'failed')
+            # Send to DLQ
+            await self._send_to_dlq(topic, record, e)
+        finally:
+            self._offsets.complete(self._partition_of(record), record.offset)
+    
     async def _process_message(
         self,
         topic: str,
@@ -178,17 +954,38 @@ class CrisisKafkaConsumer:
             dlq_message = {
                 'original_topic': topic,
                 'original_key': record.key,
-                'original_value': record.value,
+                # Unread claim-check references stay references
+                'original_value': detach(record.value),
                 'original_partition': record.partition,
                 'original_offset': record.offset,
+                # Replays restore these, e.g. the express priority
+                'original_headers': {
+                    name: value.decode('utf-8', 'replace')
+                    for name, value in record.headers or ()
+                    if name != CONTENT_TYPE_HEADER and value is not None
+                },
                 'error': str(error),
                 'error_type': type(error).__name__,
                 'timestamp': datetime.utcnow().isoformat()
             }
+            if isinstance(record.value, MessageDecodeError):
+                # Keep the exact bytes so the message can be inspected or replayed
+                dlq_message['original_value'] = None
+                dlq_message['original_value_base64'] = base64.b64encode(
+                    record.value.raw
+                ).decode('ascii')
+                dlq_message['original_content_type'] = record.value.content_type
             
             producer = get_kafka_producer()
-            await producer.send_event('dlq', dlq_message)
+            if not await producer.send_event('dlq', dlq_message):
+                logger.error(f"DLQ delivery failed for message from {topic}")
+                return
             
+            crisislen_kafka_dlq_messages_total.labels(
+                group=self.group_id,
+                topic=topic,
+                error_type=type(error).__name__
+            ).inc()
             logger.info(f"Sent failed message to DLQ: {topic}")
         except Exception as e:
             logger.error(f"Failed to send to DLQ: {e}")
@@ -198,6 +995,54 @@ class CrisisKafkaConsumer:
         self._running = False
 
 
+class _RebalanceListener(ConsumerRebalanceListener):
+    """
+    Commit and forget revoked partitions during a rebalance.
+    
+    Callbacks run on the consumer thread inside poll(); the in-flight state
+    lives on the event loop, so revocation is handed to the loop and the
+    consumer waits for it before the group reassigns the partitions.
+    """
+    
+    def __init__(self, owner: CrisisKafkaConsumer, consumer: KafkaConsumer):
+        self.owner = owner
+        self.consumer = consumer
+    
+    def on_partitions_revoked(self, revoked):
+        revoked = set(revoked)
+        loop = self.owner._loop
+        if not revoked or loop is None or loop.is_closed():
+            return
+        
+        offsets = asyncio.run_coroutine_threadsafe(
+            self.owner._revoke_partitions(revoked),
+            loop
+        ).result()
+        if offsets:
+            try:
+                self.consumer.commit(
+                    {tp: _offset_and_metadata(offset) for tp, offset in offsets.items()}
+                )
+                logger.info(f"Committed offsets of revoked partitions: {offsets}")
+            except KafkaError as e:
+                # The new owner reprocesses from the last committed offset
+                logger.error(f"Failed to commit revoked partitions: {e}")
+    
+    def on_partitions_assigned(self, assigned):
+        logger.info(
+            f"Assigned partitions: "
+            f"{sorted(f'{tp.topic}[{tp.partition}]' for tp in assigned)}"
+        )
+
+
+def _offset_and_metadata(offset: int) -> OffsetAndMetadata:
+    """Build commit metadata across kafka-python versions."""
+    # kafka-python 2.1 added leader_epoch to OffsetAndMetadata
+    if 'leader_epoch' in OffsetAndMetadata._fields:
+        return OffsetAndMetadata(offset, '', -1)
+    return OffsetAndMetadata(offset, '')
+
+
 # Message handlers for different topics
 async def handle_raw_item(message: Dict[str, Any]):
     """Handle raw item messages."""
@@ -238,13 +1083,58 @@ async def handle_normalized_item(message: Dict[str, Any]):
                 'message': f"High risk item detected: {message.get('title')}",
                 'data': message
             }
-            await publish_alert(alert_data)
+            await publish_alert(alert_data, express=True)
     
     except Exception as e:
         logger.error(f"Error handling normalized item: {e}")
         raise
 
 
+async def handle_normalized_items(messages: List[Dict[str, Any]]):
+    """
+    Handle a batch of normalized item messages with one bulk index call.
+    
+    Items OpenSearch rejects are reported through BatchItemsFailed, so
+    only they are dead-lettered and raise no alert.
+    """
+    from services.opensearch_service import BulkIndexError, opensearch_service
+    from services.kafka_producer import publish_alert
+    
+    logger.info(f"Bulk indexing {len(messages)} normalized items")
+    
+    try:
+        failures = {}
+        try:
+            await opensearch_service.bulk_index_items(messages)
+        except BulkIndexError as e:
+            failures = {
+                i: RuntimeError(f"Indexing failed: {e.failed[message.get('id')]}")
+                for i, message in enumerate(messages)
+                if message.get('id') in e.failed
+            }
+        
+        # Check for alerts
+        for i, message in enumerate(messages):
+            if i in failures:
+                continue
+            if message.get('risk_score', 0) > 0.8:
+                alert_data = {
+                    'item_id': message.get('id'),
+                    'type': 'high_risk',
+                    'severity': 'critical',
+                    'message': f"High risk item detected: {message.get('title')}",
+                    'data': message
+                }
+                await publish_alert(alert_data, express=True)
+        
+        if failures:
+            raise BatchItemsFailed(failures)
+    
+    except Exception as e:
+        logger.error(f"Error handling normalized item batch: {e}")
+        raise
+
+
 async def handle_claim(message: Dict[str, Any]):
     """Handle claim messages."""
     from workflows.claim_verification import start_verification
@@ -274,7 +1164,10 @@ async def handle_alert(message: Dict[str, Any]):
             'data': message.get('data'),
             'channels': ['email', 'push']  # Send via multiple channels
         }
-        await publish_notification(notification_data)
+        await publish_notification(
+            notification_data,
+            express=notification_data['severity'] == 'critical'
+        )
     
     except Exception as e:
         logger.error(f"Error processing alert: {e}")
@@ -308,16 +1201,52 @@ async def handle_user_activity(message: Dict[str, Any]):
         raise
 
 
+@lru_cache(maxsize=1)
+def get_priority_scheduler() -> PriorityScheduler:
+    """
+    Get this process's scheduler.
+    
+    Consumers created in one process share it, so their topics compete
+    for its slots by priority. The consumer runner starts each group in
+    its own worker processes, so there it only ranks the topics of one
+    group; groups are ranked against each other only with --in-process.
+    """
+    return PriorityScheduler(
+        capacity=settings.KAFKA_HANDLER_CAPACITY,
+        weights=settings.KAFKA_PRIORITY_WEIGHTS,
+        express_reserve=settings.KAFKA_EXPRESS_RESERVE
+    )
+
+
 # Consumer groups
 def create_main_consumer() -> CrisisKafkaConsumer:
     """Create main consumer for item processing."""
     consumer = CrisisKafkaConsumer(
         topics=['raw-items', 'normalized-items', 'claims'],
-        group_id='crisis-lens-main'
+        group_id='crisis-lens-main',
+        processing_mode='concurrent',
+        at_least_once=True,
+        scheduler=get_priority_scheduler(),
+        topic_priorities=settings.KAFKA_TOPIC_PRIORITIES,
+        # Full verification workflows are too expensive to run twice
+        dedup=get_dedup_filter(),
+        dedup_topics=['raw-items', 'claims'],
+        topic_concurrency={
+            'raw-items': 4,  # Full verification workflow per record
+            'normalized-items': 16,
+            'claims': 8
+        }
     )
     
-    consumer.register_handler('raw-items', handle_raw_item)
-    consumer.register_handler('normalized-items', handle_normalized_item)
+    # Workflows and bulk indexing read whole items
+    consumer.register_handler('raw-items', handle_raw_item, resolve_claim_checks=True)
+    consumer.register_batch_handler(
+        'normalized-items',
+        handle_normalized_items,
+        max_batch=500,
+        max_wait_ms=200,
+        resolve_claim_checks=True
+    )
     consumer.register_handler('claims', handle_claim)
     
     return consumer
@@ -327,7 +1256,12 @@ def create_notifications_consumer() -> CrisisKafkaConsumer:
     """Create consumer for notifications and alerts."""
     consumer = CrisisKafkaConsumer(
         topics=['alerts', 'notifications'],
-        group_id='crisis-lens-notifications'
+        group_id='crisis-lens-notifications',
+        # Concurrent so an express alert never queues behind a slow send
+        processing_mode='concurrent',
+        at_least_once=True,
+        scheduler=get_priority_scheduler(),
+        topic_priorities=settings.KAFKA_TOPIC_PRIORITIES
     )
     
     consumer.register_handler('alerts', handle_alert)
@@ -340,7 +1274,9 @@ def create_activity_consumer() -> CrisisKafkaConsumer:
     """Create consumer for user activity."""
     consumer = CrisisKafkaConsumer(
         topics=['user-activity'],
-        group_id='crisis-lens-activity'
+        group_id='crisis-lens-activity',
+        scheduler=get_priority_scheduler(),
+        topic_priorities=settings.KAFKA_TOPIC_PRIORITIES
     )
     
     consumer.register_handler('user-activity', handle_user_activity)
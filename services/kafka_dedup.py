@@ -0,0 +1,207 @@
+"""
+Redelivery deduplication for CrisisLens Kafka consumers.
+
+At-least-once delivery redelivers records after rebalances, failed
+commits and DLQ replays. Consumers check each record's idempotency key
+before running its handler and mark it only after the handler succeeded,
+so a failed record is always retried.
+
+Keys are remembered in two tiers: time-bucketed Redis sets shared by every
+worker of a consumer group, and a memory-bounded rotating Bloom filter in
+process. Redis is authoritative, since a record redelivered after a
+rebalance usually lands on a different worker. The Bloom filter answers on
+its own when Redis is disabled or unreachable, so deduplication degrades
+instead of stopping consumption.
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Optional
+import hashlib
+import logging
+import math
+import time
+
+from redis.exceptions import RedisError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to rely on the in-process filter alone after a Redis error
+REDIS_RETRY_SECONDS = 30.0
+
+# Errors of an unreachable or failing Redis; anything else is a bug and raises
+REDIS_ERRORS = (RedisError, OSError)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Initialize filter.
+
+        Args:
+            capacity: Keys the filter holds at the target error rate
+            error_rate: False positive probability at capacity
+        """
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class RotatingBloomFilter:
+    """
+    Bloom filter with bounded memory that forgets the oldest keys.
+
+    Keys go into the newest generation; once it holds its share of the
+    capacity a fresh generation starts and the oldest is dropped.
+    """
+
+    def __init__(self, capacity: int = 200_000, error_rate: float = 0.001, generations: int = 2):
+        self.generations = max(1, generations)
+        self.generation_capacity = max(1, capacity // self.generations)
+        self.error_rate = error_rate
+        self._filters: Deque[BloomFilter] = deque(
+            [self._new_filter()], maxlen=self.generations
+        )
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(self.generation_capacity, self.error_rate)
+
+    def add(self, key: str):
+        current = self._filters[-1]
+        if current.count >= self.generation_capacity:
+            current = self._new_filter()
+            self._filters.append(current)
+        current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in f for f in self._filters)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(len(f._bits) for f in self._filters)
+
+
+class DedupFilter:
+    """Two-tier record of successfully handled idempotency keys."""
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        ttl_seconds: int = 6 * 3600,
+        capacity: int = 200_000,
+        error_rate: float = 0.001,
+        namespace: str = 'crisislen:dedup',
+        use_redis: bool = True
+    ):
+        """
+        Initialize filter.
+
+        Args:
+            redis_client: Async Redis client (defaults to redis_service)
+            ttl_seconds: How long a handled key is remembered in Redis
+            capacity: Keys remembered in process
+            error_rate: In-process false positive rate
+            namespace: Redis key prefix
+            use_redis: Disable to deduplicate within this process only
+        """
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.namespace = namespace
+        self.use_redis = use_redis
+        self._redis = redis_client
+        self._redis_retry_at = 0.0
+        self._local = RotatingBloomFilter(capacity=capacity, error_rate=error_rate)
+
+    def _redis_available(self) -> bool:
+        return self.use_redis and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, action: str, error: Exception):
+        logger.warning(
+            f"Dedup {action} failed, using the in-process filter for "
+            f"{REDIS_RETRY_SECONDS:.0f}s: {error}"
+        )
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            from services.redis_service import redis_service
+            await redis_service.connect()
+            self._redis = redis_service.redis
+        return self._redis
+
+    def _bucket_keys(self, scope: str, now: Optional[float] = None) -> tuple[str, str]:
+        """Redis sets of the current and previous TTL window."""
+        bucket = int((now or time.time()) // self.ttl_seconds)
+        return (
+            f"{self.namespace}:{scope}:{bucket}",
+            f"{self.namespace}:{scope}:{bucket - 1}"
+        )
+
+    async def seen(self, scope: str, key: str) -> bool:
+        """
+        Whether a key was already handled successfully.
+
+        Args:
+            scope: Namespace of the key, e.g. '<group>:<topic>'
+            key: Idempotency key of the record
+        """
+        local_hit = f"{scope}:{key}" in self._local
+        if not self._redis_available():
+            return local_hit
+
+        try:
+            redis = await self._get_redis()
+            current, previous = self._bucket_keys(scope)
+            pipe = redis.pipeline()
+            pipe.sismember(current, key)
+            pipe.sismember(previous, key)
+            return any(await pipe.execute())
+        except REDIS_ERRORS as e:
+            self._redis_failed('lookup', e)
+            return local_hit
+
+    async def mark(self, scope: str, key: str):
+        """Record that a key was handled successfully."""
+        self._local.add(f"{scope}:{key}")
+        if not self._redis_available():
+            return
+
+        try:
+            redis = await self._get_redis()
+            current, _ = self._bucket_keys(scope)
+            pipe = redis.pipeline()
+            pipe.sadd(current, key)
+            # A key stays visible for one to two TTL windows
+            pipe.expire(current, self.ttl_seconds * 2)
+            await pipe.execute()
+        except REDIS_ERRORS as e:
+            self._redis_failed('mark', e)
+
+
+@lru_cache(maxsize=1)
+def get_dedup_filter() -> DedupFilter:
+    """Get singleton dedup filter configured from settings."""
+    return DedupFilter(
+        ttl_seconds=settings.KAFKA_DEDUP_TTL_SECONDS,
+        capacity=settings.KAFKA_DEDUP_CAPACITY,
+        error_rate=settings.KAFKA_DEDUP_ERROR_RATE
+    )
@@ -0,0 +1,361 @@
+"""
+Concurrent record dispatch for CrisisLens Kafka consumers.
+
+Runs handlers for records from different partitions and keys concurrently
+while preserving the order of records that share an ordering key, and
+tracks which offsets are safe to commit once processing completes.
+A priority scheduler arbitrates handler slots between the topics of the
+consumers that share it, which must run in the same event loop; it does
+not coordinate consumers in other processes.
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple
+)
+import asyncio
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Record header that routes a record to the express lane
+PRIORITY_HEADER = 'x-priority'
+EXPRESS = 'express'
+
+DEFAULT_PRIORITY_WEIGHTS = {'high': 8, 'normal': 4, 'bulk': 1}
+
+
+class PartitionedDispatcher:
+    """
+    Bounded worker pool that keeps per-key ordering.
+
+    Records with the same ordering key run strictly one after another in
+    submission order. Records with different keys run concurrently, with at
+    most ``topic_concurrency[topic]`` (or ``default_concurrency``) handlers
+    active per topic at any time.
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int = 8,
+        topic_concurrency: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            default_concurrency: Concurrent handlers per topic when not overridden
+            topic_concurrency: Per-topic concurrency limits
+        """
+        self.default_concurrency = default_concurrency
+        self.topic_concurrency = topic_concurrency or {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._tails: Dict[Tuple[str, Hashable], asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._task_partitions: Dict[asyncio.Task, frozenset] = {}
+
+    def concurrency_for(self, topic: str) -> int:
+        """Get the concurrency limit for a topic."""
+        return max(1, self.topic_concurrency.get(topic, self.default_concurrency))
+
+    def _get_semaphore(self, topic: str) -> asyncio.Semaphore:
+        """Get or create the semaphore bounding a topic's handlers."""
+        if topic not in self._semaphores:
+            self._semaphores[topic] = asyncio.Semaphore(self.concurrency_for(topic))
+        return self._semaphores[topic]
+
+    def submit(
+        self,
+        topic: str,
+        ordering_key: Hashable,
+        work: Callable[[], Awaitable[Any]],
+        partitions: Iterable[Hashable] = ()
+    ) -> asyncio.Task:
+        """
+        Schedule work for a record.
+
+        Args:
+            topic: Topic the record came from
+            ordering_key: Records sharing this key are processed in order
+            work: Zero-argument coroutine function processing the record
+            partitions: Partitions the work's records came from, so it can
+                be drained when they are revoked
+
+        Returns:
+            Task running the work
+        """
+        lane = (topic, ordering_key)
+        previous = self._tails.get(lane)
+        task = asyncio.ensure_future(
+            self._run(previous, self._get_semaphore(topic), work)
+        )
+        self._tails[lane] = task
+        self._tasks.add(task)
+        self._task_partitions[task] = frozenset(partitions)
+        task.add_done_callback(lambda t: self._on_done(lane, t))
+        return task
+
+    async def _run(
+        self,
+        previous: Optional[asyncio.Task],
+        semaphore: asyncio.Semaphore,
+        work: Callable[[], Awaitable[Any]]
+    ):
+        """Wait for the previous record in the lane, then run under the topic limit."""
+        if previous is not None and not previous.done():
+            # Only ordering matters here; the previous task reports its own errors
+            await asyncio.wait([previous])
+        async with semaphore:
+            return await work()
+
+    def _on_done(self, lane: Tuple[str, Hashable], task: asyncio.Task):
+        """Release bookkeeping for a finished task."""
+        self._tasks.discard(task)
+        self._task_partitions.pop(task, None)
+        if self._tails.get(lane) is task:
+            del self._tails[lane]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Unhandled error in dispatched work for {lane[0]}: {task.exception()}"
+            )
+
+    @property
+    def in_flight(self) -> int:
+        """Number of submitted records not yet finished."""
+        return len(self._tasks)
+
+    async def drain(self):
+        """Wait until every submitted record has finished."""
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    async def drain_partitions(
+        self,
+        partitions: Iterable[Hashable],
+        timeout: Optional[float] = None
+    ) -> set[asyncio.Task]:
+        """
+        Wait for the work of some partitions, e.g. before they are revoked.
+
+        Args:
+            partitions: Partitions whose work to wait for
+            timeout: Most seconds to wait
+
+        Returns:
+            Tasks still unfinished when the timeout elapsed
+        """
+        partitions = set(partitions)
+        tasks = {t for t, owned in self._task_partitions.items() if owned & partitions}
+        if not tasks:
+            return set()
+        _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        return unfinished
+
+
+class OffsetTracker:
+    """
+    Track in-flight offsets per partition for at-least-once commits.
+
+    Records may finish out of order, so the committable offset of a
+    partition is the lowest offset still in flight, or one past the highest
+    offset seen when nothing is in flight.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, set[int]] = {}
+        self._heaps: Dict[Hashable, list[int]] = {}
+        self._highest: Dict[Hashable, int] = {}
+        self._committed: Dict[Hashable, int] = {}
+
+    def track(self, partition: Hashable, offset: int):
+        """Record that an offset has been received and is in flight."""
+        self._pending.setdefault(partition, set()).add(offset)
+        heapq.heappush(self._heaps.setdefault(partition, []), offset)
+        self._highest[partition] = max(self._highest.get(partition, -1), offset)
+
+    def complete(self, partition: Hashable, offset: int):
+        """Record that an offset has finished processing."""
+        pending = self._pending.get(partition)
+        if pending is not None:
+            pending.discard(offset)
+
+    def pending_count(self, partition: Hashable) -> int:
+        """Number of in-flight offsets for a partition."""
+        return len(self._pending.get(partition, ()))
+
+    def partitions(self) -> list[Hashable]:
+        """Partitions that have had records tracked."""
+        return list(self._highest)
+
+    def _next_offset(self, partition: Hashable) -> int:
+        """Offset to commit for a partition (the next one to consume)."""
+        pending = self._pending.get(partition, set())
+        heap = self._heaps.get(partition, [])
+        # Lazily drop finished offsets from the heap
+        while heap and heap[0] not in pending:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0]
+        return self._highest[partition] + 1
+
+    def committable(self) -> Dict[Hashable, int]:
+        """Offsets that advanced since the last commit, per partition."""
+        offsets = {}
+        for partition in self._highest:
+            offset = self._next_offset(partition)
+            if offset > self._committed.get(partition, -1):
+                offsets[partition] = offset
+        return offsets
+
+    def mark_committed(self, offsets: Dict[Hashable, int]):
+        """Record offsets that were successfully committed."""
+        for partition, offset in offsets.items():
+            self._committed[partition] = max(self._committed.get(partition, -1), offset)
+
+    def forget(self, partition: Hashable):
+        """Drop all state for a partition, e.g. after it was revoked."""
+        for store in (self._pending, self._heaps, self._highest, self._committed):
+            store.pop(partition, None)
+
+
+class PriorityScheduler:
+    """
+    Weighted fair scheduling of handler slots across priority classes.
+
+    At most ``capacity`` handlers hold a slot at once. When slots are
+    contended, waiting classes are served in proportion to their weights
+    (stride scheduling), so bulk work keeps progressing but cannot starve
+    higher classes. The express class bypasses the weights entirely: its
+    waiters are served first and may use ``express_reserve`` slots beyond
+    the capacity, so urgent records do not wait for long-running bulk
+    handlers to finish.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        weights: Optional[Dict[str, int]] = None,
+        express_reserve: int = 4
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            capacity: Handler slots shared by all non-express classes
+            weights: Priority class -> relative share of contended slots
+            express_reserve: Extra slots only the express class may use
+        """
+        self.capacity = max(1, capacity)
+        self.weights = dict(weights or DEFAULT_PRIORITY_WEIGHTS)
+        if EXPRESS in self.weights:
+            raise ValueError(f"'{EXPRESS}' is a strict priority class and takes no weight")
+        if any(weight <= 0 for weight in self.weights.values()):
+            raise ValueError("Priority weights must be positive")
+        self.express_reserve = max(0, express_reserve)
+        self._active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in (EXPRESS, *self.weights)
+        }
+        self._pass: Dict[str, float] = {priority: 0.0 for priority in self.weights}
+        self._virtual_time = 0.0
+
+    def _limit(self, priority: str) -> int:
+        """Slots a class may fill."""
+        if priority == EXPRESS:
+            return self.capacity + self.express_reserve
+        return self.capacity
+
+    def _charge(self, priority: str):
+        """Advance a weighted class's pass after it was granted a slot."""
+        if priority == EXPRESS:
+            return
+        self._virtual_time = max(self._virtual_time, self._pass[priority])
+        self._pass[priority] += 1 / self.weights[priority]
+
+    def _next_priority(self) -> Optional[str]:
+        """Waiting class to serve next: express first, then lowest pass."""
+        if self._waiters[EXPRESS]:
+            return EXPRESS
+        waiting = [p for p in self.weights if self._waiters[p]]
+        if not waiting:
+            return None
+        return min(waiting, key=lambda p: (self._pass[p], -self.weights[p]))
+
+    def _grant(self):
+        """Hand free slots to waiters in scheduling order."""
+        while True:
+            priority = self._next_priority()
+            if priority is None or self._active >= self._limit(priority):
+                return
+            waiter = self._waiters[priority].popleft()
+            if waiter.done():
+                continue  # Cancelled while waiting
+            self._active += 1
+            self._charge(priority)
+            waiter.set_result(None)
+
+    async def acquire(self, priority: str):
+        """
+        Wait for a handler slot.
+
+        Args:
+            priority: Priority class, or EXPRESS
+        """
+        if priority not in self._waiters:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        if self._active < self._limit(priority) and not any(self._waiters.values()):
+            self._active += 1
+            self._charge(priority)
+            return
+
+        if priority != EXPRESS and not self._waiters[priority]:
+            # A class returning from idle does not get credit for the time it was away
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        self._grant()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation landed
+                self.release()
+            raise
+
+    def release(self):
+        """Return a handler slot."""
+        self._active -= 1
+        self._grant()
+
+    @asynccontextmanager
+    async def slot(self, priority: str) -> AsyncIterator[None]:
+        """Hold a handler slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def active(self) -> int:
+        """Slots currently held."""
+        return self._active
+
+    def queued(self) -> Dict[str, int]:
+        """Waiters per priority class."""
+        return {
+            priority: sum(1 for waiter in waiters if not waiter.done())
+            for priority, waiters in self._waiters.items()
+        }
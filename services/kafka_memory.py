@@ -0,0 +1,455 @@
+"""
+In-process Kafka stand-in for CrisisLens.
+
+Implements the subset of the kafka-python ``KafkaProducer``/``KafkaConsumer``
+API used by ``CrisisKafkaProducer`` and ``CrisisKafkaConsumer`` on top of an
+in-memory broker with topics, partitions, consumer groups, committed offsets
+and lag. It lets the pipeline run in tests and benchmarks without a broker.
+
+Select it with ``KAFKA_BOOTSTRAP_SERVERS=memory://`` or by passing a broker
+to ``CrisisKafkaProducer``/``CrisisKafkaConsumer``.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from collections import namedtuple
+from kafka.errors import IllegalStateError, KafkaError
+from kafka.structs import TopicPartition
+import itertools
+import logging
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BOOTSTRAP = 'memory://'
+
+MemoryRecord = namedtuple(
+    'MemoryRecord',
+    ['topic', 'partition', 'offset', 'timestamp', 'key', 'value', 'headers']
+)
+
+RecordMetadata = namedtuple(
+    'RecordMetadata',
+    ['topic', 'partition', 'offset', 'timestamp']
+)
+
+
+class InMemoryBroker:
+    """Thread-safe in-memory broker holding partition logs and group state."""
+
+    def __init__(
+        self,
+        topics: Optional[Dict[str, int]] = None,
+        default_partitions: int = 3
+    ):
+        """
+        Initialize broker.
+
+        Args:
+            topics: Topic name -> partition count to create up front
+            default_partitions: Partitions for topics created on first use
+        """
+        self.default_partitions = default_partitions
+        self._logs: Dict[str, List[List[MemoryRecord]]] = {}
+        self._committed: Dict[str, Dict[TopicPartition, int]] = {}
+        self._members: Dict[str, List['InMemoryKafkaConsumer']] = {}
+        self._round_robin = itertools.count()
+        self._condition = threading.Condition()
+        self._version = 0
+
+        for name, partitions in (topics or {}).items():
+            self.create_topic(name, partitions)
+
+    @classmethod
+    def from_topics_file(cls, path: str = 'infrastructure/kafka/topics.yaml') -> 'InMemoryBroker':
+        """Create a broker with the topics and partition counts of a topics.yaml."""
+        import yaml
+
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f)
+        return cls(topics={t['name']: t['partitions'] for t in config['topics']})
+
+    def create_topic(self, name: str, partitions: Optional[int] = None):
+        """Create a topic if it does not exist."""
+        with self._condition:
+            if name not in self._logs:
+                self._logs[name] = [[] for _ in range(partitions or self.default_partitions)]
+
+    def topics(self) -> List[str]:
+        """Names of all topics."""
+        with self._condition:
+            return list(self._logs)
+
+    def partitions_for(self, topic: str) -> List[TopicPartition]:
+        """Partitions of a topic, creating the topic if needed."""
+        self.create_topic(topic)
+        with self._condition:
+            return [TopicPartition(topic, p) for p in range(len(self._logs[topic]))]
+
+    def append(
+        self,
+        topic: str,
+        value: Any,
+        key: Optional[bytes] = None,
+        headers: Optional[list] = None,
+        partition: Optional[int] = None
+    ) -> RecordMetadata:
+        """Append a record to a topic and wake waiting consumers."""
+        self.create_topic(topic)
+        with self._condition:
+            log = self._logs[topic]
+            if partition is None:
+                if key is not None:
+                    partition = zlib.crc32(key) % len(log)
+                else:
+                    partition = next(self._round_robin) % len(log)
+
+            timestamp = int(time.time() * 1000)
+            offset = len(log[partition])
+            log[partition].append(
+                MemoryRecord(topic, partition, offset, timestamp, key, value, list(headers or []))
+            )
+            self._version += 1
+            self._condition.notify_all()
+            return RecordMetadata(topic, partition, offset, timestamp)
+
+    def fetch(self, tp: TopicPartition, offset: int, max_records: int) -> List[MemoryRecord]:
+        """Read up to max_records from a partition starting at offset."""
+        with self._condition:
+            return self._logs[tp.topic][tp.partition][offset:offset + max_records]
+
+    @property
+    def version(self) -> int:
+        """Counter incremented on every append."""
+        with self._condition:
+            return self._version
+
+    def wait_for_records(self, seen_version: int, timeout: float):
+        """Block until a record is appended after seen_version or the timeout elapses."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != seen_version, timeout)
+
+    def end_offset(self, tp: TopicPartition) -> int:
+        """Offset the next record of a partition will get."""
+        self.create_topic(tp.topic)
+        with self._condition:
+            return len(self._logs[tp.topic][tp.partition])
+
+    def commit(self, group_id: str, offsets: Dict[TopicPartition, int]):
+        """Store committed offsets for a consumer group."""
+        with self._condition:
+            self._committed.setdefault(group_id, {}).update(offsets)
+
+    def committed(self, group_id: str, tp: TopicPartition) -> Optional[int]:
+        """Committed offset of a group for a partition, if any."""
+        with self._condition:
+            return self._committed.get(group_id, {}).get(tp)
+
+    def lag(self, group_id: str, topics: Optional[Iterable[str]] = None) -> Dict[TopicPartition, int]:
+        """Records not yet committed by a group, per partition."""
+        lag = {}
+        for topic in topics or self.topics():
+            for tp in self.partitions_for(topic):
+                lag[tp] = self.end_offset(tp) - (self.committed(group_id, tp) or 0)
+        return lag
+
+    def total_lag(self, group_id: str, topics: Optional[Iterable[str]] = None) -> int:
+        """Records not yet committed by a group across partitions."""
+        return sum(self.lag(group_id, topics).values())
+
+    def join(self, consumer: 'InMemoryKafkaConsumer'):
+        """Add a consumer to its group and rebalance."""
+        with self._condition:
+            self._members.setdefault(consumer.group_id, []).append(consumer)
+            self._rebalance(consumer.group_id)
+
+    def leave(self, consumer: 'InMemoryKafkaConsumer'):
+        """Remove a consumer from its group and rebalance."""
+        with self._condition:
+            members = self._members.get(consumer.group_id, [])
+            if consumer in members:
+                members.remove(consumer)
+                self._rebalance(consumer.group_id)
+
+    def rebalance(self, group_id: str):
+        """Reassign a group's partitions, e.g. after a subscription change."""
+        with self._condition:
+            self._rebalance(group_id)
+
+    def _rebalance(self, group_id: str):
+        """Round-robin the group's subscribed partitions across its members."""
+        members = self._members.get(group_id, [])
+        topics = sorted({t for m in members for t in m.subscription()})
+        for topic in topics:
+            if topic not in self._logs:
+                self._logs[topic] = [[] for _ in range(self.default_partitions)]
+
+        assignments: Dict[int, List[TopicPartition]] = {id(m): [] for m in members}
+        for topic in topics:
+            subscribers = [m for m in members if topic in m.subscription()]
+            for p in range(len(self._logs[topic])):
+                member = subscribers[p % len(subscribers)]
+                assignments[id(member)].append(TopicPartition(topic, p))
+
+        for member in members:
+            member._assign(assignments[id(member)])
+
+
+class MemoryFuture:
+    """Completed send future with the kafka-python callback API."""
+
+    def __init__(self, value: Any = None, exception: Optional[BaseException] = None):
+        self.value = value
+        self.exception = exception
+        self.is_done = True
+
+    def succeeded(self) -> bool:
+        return self.exception is None
+
+    def failed(self) -> bool:
+        return self.exception is not None
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+    def add_callback(self, fn: Callable, *args, **kwargs) -> 'MemoryFuture':
+        if self.exception is None:
+            fn(*args, self.value, **kwargs)
+        return self
+
+    def add_errback(self, fn: Callable, *args, **kwargs) -> 'MemoryFuture':
+        if self.exception is not None:
+            fn(*args, self.exception, **kwargs)
+        return self
+
+
+class InMemoryKafkaProducer:
+    """Drop-in for kafka-python's KafkaProducer backed by an InMemoryBroker."""
+
+    def __init__(self, broker: InMemoryBroker, **configs):
+        self.broker = broker
+        self.config = configs
+        self._value_serializer = configs.get('value_serializer')
+        self._key_serializer = configs.get('key_serializer')
+        self._closed = False
+
+    def send(
+        self,
+        topic: str,
+        value: Any = None,
+        key: Any = None,
+        headers: Optional[list] = None,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None
+    ) -> MemoryFuture:
+        """Append a record; the returned future is already complete."""
+        if self._closed:
+            return MemoryFuture(exception=KafkaError("Producer is closed"))
+        try:
+            if self._value_serializer is not None:
+                value = self._value_serializer(value)
+            if self._key_serializer is not None:
+                key = self._key_serializer(key)
+            metadata = self.broker.append(topic, value, key=key, headers=headers, partition=partition)
+        except Exception as e:
+            return MemoryFuture(exception=e)
+        return MemoryFuture(value=metadata)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Records are appended synchronously, so there is nothing to flush."""
+
+    def close(self, timeout: Optional[float] = None):
+        self._closed = True
+
+
+class InMemoryKafkaConsumer:
+    """Drop-in for kafka-python's KafkaConsumer backed by an InMemoryBroker."""
+
+    def __init__(self, *topics: str, broker: InMemoryBroker, **configs):
+        self.broker = broker
+        self.group_id = configs.get('group_id')
+        self.auto_offset_reset = configs.get('auto_offset_reset', 'latest')
+        self.enable_auto_commit = configs.get('enable_auto_commit', True)
+        self.max_poll_records = configs.get('max_poll_records', 500)
+        self._key_deserializer = configs.get('key_deserializer')
+        self._value_deserializer = configs.get('value_deserializer')
+        self._topics = set(topics)
+        self._assignment: List[TopicPartition] = []
+        self._positions: Dict[TopicPartition, int] = {}
+        self._paused: set[TopicPartition] = set()
+        self._listener = None
+        self._pending_assignment: Optional[List[TopicPartition]] = None
+        self._closed = False
+        self.broker.join(self)
+
+    def subscribe(self, topics: Iterable[str] = (), pattern: Optional[str] = None, listener: Any = None):
+        """
+        Replace the subscription and rebalance the group.
+
+        With a listener, assignments take effect on the consumer's next
+        poll(), which first calls ``listener.on_partitions_revoked`` with
+        the whole current assignment and then ``on_partitions_assigned``
+        with the new one, like kafka-python's eager rebalance protocol.
+        """
+        if pattern is not None:
+            raise NotImplementedError("Pattern subscriptions are not supported")
+        self._topics = set(topics)
+        self._listener = listener
+        self.broker.rebalance(self.group_id)
+
+    def subscription(self) -> set:
+        return set(self._topics)
+
+    def _assign(self, partitions: List[TopicPartition]):
+        """Called by the broker, holding its lock, on rebalance."""
+        if self._listener is not None:
+            # Rebalance callbacks run on the polling thread
+            self._pending_assignment = list(partitions)
+            return
+        self._apply_assignment(partitions)
+
+    def _complete_rebalance(self):
+        """Run the listener's callbacks and switch to a pending assignment."""
+        if self._pending_assignment is None:
+            return
+        # Callbacks run without the broker lock; they may wait on code that
+        # produces to the broker
+        self._listener.on_partitions_revoked(set(self._assignment))
+        with self.broker._condition:
+            # Take the latest assignment; the group may have moved on meanwhile
+            partitions, self._pending_assignment = self._pending_assignment, None
+            self._apply_assignment(partitions)
+        self._listener.on_partitions_assigned(set(partitions))
+
+    def _apply_assignment(self, partitions: List[TopicPartition]):
+        self._assignment = list(partitions)
+        # Like kafka-python, a rebalance resumes every partition
+        self._paused = set()
+        self._positions = {tp: self._initial_position(tp) for tp in partitions}
+
+    def _initial_position(self, tp: TopicPartition) -> int:
+        committed = self.broker.committed(self.group_id, tp)
+        if committed is not None:
+            return committed
+        if self.auto_offset_reset == 'earliest':
+            return 0
+        return self.broker.end_offset(tp)
+
+    def assignment(self) -> set:
+        return set(self._assignment)
+
+    def poll(self, timeout_ms: int = 0, max_records: Optional[int] = None) -> Dict[TopicPartition, list]:
+        """Return records from assigned, unpaused partitions."""
+        if self._closed:
+            raise IllegalStateError("Consumer is closed")
+        self._complete_rebalance()
+        if self.enable_auto_commit:
+            self.commit()
+
+        max_records = max_records or self.max_poll_records
+        deadline = time.monotonic() + timeout_ms / 1000
+
+        while True:
+            version = self.broker.version
+            records = self._fetch(max_records)
+            remaining = deadline - time.monotonic()
+            if records or remaining <= 0:
+                return records
+            self.broker.wait_for_records(version, remaining)
+
+    def _fetch(self, max_records: int) -> Dict[TopicPartition, list]:
+        fetched_by_partition = {}
+        # A rebalance on another member's thread replaces the assignment
+        # and positions under the same lock
+        with self.broker._condition:
+            for tp in self._assignment:
+                if max_records <= 0:
+                    break
+                if tp in self._paused:
+                    continue
+                fetched = self.broker.fetch(tp, self._positions[tp], max_records)
+                if not fetched:
+                    continue
+                self._positions[tp] = fetched[-1].offset + 1
+                max_records -= len(fetched)
+                fetched_by_partition[tp] = fetched
+        return {
+            tp: [self._deserialize(record) for record in fetched]
+            for tp, fetched in fetched_by_partition.items()
+        }
+
+    def _deserialize(self, record: MemoryRecord) -> MemoryRecord:
+        key, value = record.key, record.value
+        if self._key_deserializer is not None:
+            key = self._key_deserializer(key)
+        if self._value_deserializer is not None:
+            value = self._value_deserializer(value)
+        return record._replace(key=key, value=value)
+
+    def commit(self, offsets: Optional[Dict[TopicPartition, Any]] = None):
+        """Commit explicit offsets, or the current positions."""
+        if offsets is None:
+            with self.broker._condition:
+                offsets = dict(self._positions)
+        else:
+            offsets = {
+                tp: getattr(meta, 'offset', meta)
+                for tp, meta in offsets.items()
+            }
+        self.broker.commit(self.group_id, offsets)
+
+    def committed(self, tp: TopicPartition) -> Optional[int]:
+        return self.broker.committed(self.group_id, tp)
+
+    def position(self, tp: TopicPartition) -> int:
+        if tp not in self._positions:
+            raise IllegalStateError(f"Partition {tp} is not assigned")
+        return self._positions[tp]
+
+    def end_offsets(self, partitions: Iterable[TopicPartition]) -> Dict[TopicPartition, int]:
+        return {tp: self.broker.end_offset(tp) for tp in partitions}
+
+    def pause(self, *partitions: TopicPartition):
+        for tp in partitions:
+            if tp not in self._positions:
+                raise IllegalStateError(f"Partition {tp} is not assigned")
+            self._paused.add(tp)
+
+    def resume(self, *partitions: TopicPartition):
+        for tp in partitions:
+            if tp not in self._positions:
+                raise IllegalStateError(f"Partition {tp} is not assigned")
+            self._paused.discard(tp)
+
+    def paused(self) -> set:
+        return set(self._paused)
+
+    def close(self, autocommit: bool = True):
+        if self._closed:
+            return
+        if autocommit and self.enable_auto_commit:
+            self.commit()
+        self._closed = True
+        self.broker.leave(self)
+
+
+_memory_broker: Optional[InMemoryBroker] = None
+_memory_broker_lock = threading.Lock()
+
+
+def get_memory_broker() -> InMemoryBroker:
+    """Process-wide broker used when KAFKA_BOOTSTRAP_SERVERS is memory://."""
+    global _memory_broker
+    with _memory_broker_lock:
+        if _memory_broker is None:
+            _memory_broker = InMemoryBroker()
+        return _memory_broker
+
+
+def set_memory_broker(broker: Optional[InMemoryBroker]):
+    """Replace the process-wide broker, e.g. with one built from topics.yaml."""
+    global _memory_broker
+    with _memory_broker_lock:
+        _memory_broker = broker
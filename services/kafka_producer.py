@@ -3,14 +3,30 @@ Kafka Producer Service for CrisisLens.
 
 Handles publishing events to Kafka topics with error handling and retry logic.
 """
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
-import json
 import logging
+import time
 from datetime import datetime
 import asyncio
-from functools import lru_cache
+from functools import lru_cache, partial
+
+from config import settings
+from services.kafka_claim_check import ClaimCheck, get_claim_check
+from services.kafka_codecs import CONTENT_TYPE_HEADER, get_codec
+from services.kafka_dispatch import EXPRESS, PRIORITY_HEADER
+from services.kafka_memory import (
+    MEMORY_BOOTSTRAP,
+    InMemoryBroker,
+    InMemoryKafkaProducer,
+    get_memory_broker
+)
+from services.metrics import (
+    crisislen_kafka_messages_produced_total,
+    crisislen_kafka_delivery_latency_seconds,
+    crisislen_kafka_messages_pending
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +37,12 @@ class CrisisKafkaProducer:
     def __init__(
         self,
         bootstrap_servers: list[str] = None,
-        client_id: str = "crisis-lens-producer"
+        client_id: str = "crisis-lens-producer",
+        delivery_timeout: float = 10.0,
+        default_codec: Optional[str] = None,
+        topic_codecs: Optional[Dict[str, str]] = None,
+        claim_check: Optional[ClaimCheck] = None,
+        broker: Optional[InMemoryBroker] = None
     ):
         """
         Initialize Kafka producer.
@@ -29,18 +50,48 @@ class CrisisKafkaProducer:
         Args:
             bootstrap_servers: List of Kafka broker addresses
             client_id: Client identifier for this producer
+            delivery_timeout: Seconds to wait for a broker acknowledgement
+            default_codec: Wire codec for topics without an override
+                ('json', 'orjson' or 'msgpack')
+            topic_codecs: Per-topic wire codec overrides
+            claim_check: Moves large fields to a blob store before sending
+                (defaults to the one configured in settings, if any)
+            broker: In-process broker to use instead of a Kafka cluster
         """
-        self.bootstrap_servers = bootstrap_servers or ['localhost:29092']
+        self.bootstrap_servers = (
+            bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS.split(',')
+        )
+        if broker is None and self.bootstrap_servers == [MEMORY_BOOTSTRAP]:
+            broker = get_memory_broker()
+        self.broker = broker
         self.client_id = client_id
+        self.delivery_timeout = delivery_timeout
+        self.default_codec = default_codec or settings.KAFKA_DEFAULT_CODEC
+        self.topic_codecs = (
+            topic_codecs if topic_codecs is not None
+            else dict(settings.KAFKA_TOPIC_CODECS)
+        )
+        # Fail fast on unknown or uninstalled codecs
+        for codec_name in {self.default_codec, *self.topic_codecs.values()}:
+            get_codec(codec_name)
+        self.claim_check = claim_check or get_claim_check()
         self._producer: Optional[KafkaProducer] = None
+        # Last send waiting for its blob writes; later sends queue behind it
+        self._offload_tail: Optional[asyncio.Future] = None
         
     def _get_producer(self) -> KafkaProducer:
         """Get or create Kafka producer instance."""
+        if self._producer is None and self.broker is not None:
+            self._producer = InMemoryKafkaProducer(
+                self.broker,
+                client_id=self.client_id,
+                key_serializer=lambda k: k.encode('utf-8') if k else None
+            )
+            logger.info("Kafka producer initialized: in-memory broker")
         if self._producer is None:
             self._producer = KafkaProducer(
                 bootstrap_servers=self.bootstrap_servers,
                 client_id=self.client_id,
-                value_serializer=lambda v: json.dumps(v, default=str).encode('utf-8'),
                 key_serializer=lambda k: k.encode('utf-8') if k else None,
                 acks='all',  # Wait for all replicas
                 retries=3,
@@ -52,51 +103,237 @@ class CrisisKafkaProducer:
             logger.info(f"Kafka producer initialized: {self.bootstrap_servers}")
         return self._producer
     
-    async def send_event(
+    def _enrich(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        """Add producer metadata to an event."""
+        return {
+            **value,
+            '_timestamp': datetime.utcnow().isoformat(),
+            '_producer': self.client_id
+        }
+    
+    def _codec(self, topic: str) -> Any:
+        """Wire codec of a topic."""
+        return get_codec(self.topic_codecs.get(topic, self.default_codec))
+    
+    def _encode(
+        self,
+        topic: str,
+        value: Dict[str, Any],
+        headers: Optional[Dict[str, str]],
+        offload: bool = True
+    ) -> tuple[bytes, list]:
+        """
+        Encode an event with the topic's codec and build Kafka headers.
+        
+        Args:
+            topic: Kafka topic name
+            value: Event data
+            headers: Optional message headers
+            offload: Move large fields to the claim-check store; this
+                writes blobs, so callers on the event loop offload first
+                in a worker thread and pass False
+        """
+        codec = self._codec(topic)
+        kafka_headers = [(CONTENT_TYPE_HEADER, codec.content_type.encode('utf-8'))]
+        if headers:
+            kafka_headers.extend((k, v.encode('utf-8')) for k, v in headers.items())
+        if offload and self.claim_check is not None:
+            value = self.claim_check.offload(value, codec)
+        return codec.encode(self._enrich(value)), kafka_headers
+    
+    def send_event_nowait(
         self,
         topic: str,
         value: Dict[str, Any],
         key: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None
-    ) -> bool:
+    ) -> asyncio.Future:
         """
-        Send an event to Kafka topic asynchronously.
+        Enqueue an event without waiting for the broker.
+        
+        The message joins the producer's linger/batch pipeline immediately.
+        The returned future resolves on the event loop with the record
+        metadata once the broker acknowledges it, or with the delivery error.
         
         Args:
             topic: Kafka topic name
-            value: Event data (will be JSON serialized)
+            value: Event data, encoded with the topic's configured codec
             key: Optional partition key
             headers: Optional message headers
             
         Returns:
-            True if successful, False otherwise
+            Awaitable delivery future
         """
-        try:
-            # Add metadata
-            enriched_value = {
-                **value,
-                '_timestamp': datetime.utcnow().isoformat(),
-                '_producer': self.client_id
-            }
+        if self.claim_check is not None:
+            return self._send_after_offload(topic, value, key, headers)
+        return self._send_nowait(topic, key, lambda: self._encode(topic, value, headers))
+    
+    def _send_after_offload(
+        self,
+        topic: str,
+        value: Dict[str, Any],
+        key: Optional[str],
+        headers: Optional[Dict[str, str]]
+    ) -> asyncio.Future:
+        """
+        Write large fields to the claim-check store off the event loop, then send.
+        
+        Blob writes run concurrently in worker threads, while sends keep
+        the order in which events were enqueued.
+        """
+        loop = asyncio.get_running_loop()
+        offloaded = loop.run_in_executor(
+            None,
+            partial(self.claim_check.offload, value, self._codec(topic))
+        )
+        previous = self._offload_tail
+        
+        async def send() -> Any:
+            await asyncio.wait([offloaded])
+            if previous is not None and not previous.done():
+                await asyncio.wait([previous])
+            # offloaded.result() re-raises a failed blob write as a send failure
+            return await self._send_nowait(
+                topic,
+                key,
+                lambda: self._encode(topic, offloaded.result(), headers, offload=False)
+            )
+        
+        self._offload_tail = asyncio.ensure_future(send())
+        return self._offload_tail
+    
+    def send_encoded_nowait(
+        self,
+        topic: str,
+        payload: bytes,
+        content_type: str,
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> asyncio.Future:
+        """
+        Enqueue an already encoded message, e.g. bytes replayed from the DLQ.
+        
+        Args:
+            topic: Kafka topic name
+            payload: Encoded message value
+            content_type: Content type the payload is encoded with
+            key: Optional partition key
+            headers: Optional message headers
             
-            # Prepare headers
-            kafka_headers = []
+        Returns:
+            Awaitable delivery future
+        """
+        def encoded() -> tuple[bytes, list]:
+            kafka_headers = [(CONTENT_TYPE_HEADER, content_type.encode('utf-8'))]
             if headers:
-                kafka_headers = [(k, v.encode('utf-8')) for k, v in headers.items()]
-            
-            # Send message
+                kafka_headers.extend((k, v.encode('utf-8')) for k, v in headers.items())
+            return payload, kafka_headers
+        
+        return self._send_nowait(topic, key, encoded)
+    
+    def _send_nowait(
+        self,
+        topic: str,
+        key: Optional[str],
+        encode: Callable[[], tuple[bytes, list]]
+    ) -> asyncio.Future:
+        """Hand an encoded message to the client and bridge its delivery to the loop."""
+        loop = asyncio.get_running_loop()
+        delivery: asyncio.Future = loop.create_future()
+        enqueued_at = time.monotonic()
+        
+        def resolve(result: Any = None, error: Optional[BaseException] = None):
+            # Runs on the event loop
+            crisislen_kafka_messages_pending.dec()
+            if error is None:
+                crisislen_kafka_messages_produced_total.labels(topic=topic, status='delivered').inc()
+                crisislen_kafka_delivery_latency_seconds.labels(topic=topic).observe(
+                    time.monotonic() - enqueued_at
+                )
+            else:
+                crisislen_kafka_messages_produced_total.labels(topic=topic, status='failed').inc()
+            if delivery.done():
+                return
+            if error is None:
+                delivery.set_result(result)
+            else:
+                delivery.set_exception(error)
+        
+        crisislen_kafka_messages_pending.inc()
+        try:
+            payload, kafka_headers = encode()
             producer = self._get_producer()
             future = producer.send(
                 topic,
-                value=enriched_value,
+                value=payload,
                 key=key,
                 headers=kafka_headers
             )
+        except Exception as e:
+            resolve(error=e)
+            return delivery
+        
+        # Delivery callbacks fire on the producer's I/O thread
+        future.add_callback(
+            lambda metadata: loop.call_soon_threadsafe(resolve, metadata)
+        )
+        future.add_errback(
+            lambda exc: loop.call_soon_threadsafe(partial(resolve, error=exc))
+        )
+        return delivery
+    
+    async def send_event(
+        self,
+        topic: str,
+        value: Dict[str, Any],
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Send an event to Kafka topic asynchronously.
+        
+        Awaits the broker acknowledgement without blocking the event loop,
+        so concurrent callers share the producer's batches.
+        
+        Args:
+            topic: Kafka topic name
+            value: Event data, encoded with the topic's configured codec
+            key: Optional partition key
+            headers: Optional message headers
             
-            # Wait for send to complete
-            record_metadata = future.get(timeout=10)
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._await_delivery(
+            topic,
+            self.send_event_nowait(topic, value, key=key, headers=headers)
+        )
+    
+    async def send_encoded(
+        self,
+        topic: str,
+        payload: bytes,
+        content_type: str,
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> bool:
+        """
+        Send an already encoded message and wait for the acknowledgement.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._await_delivery(
+            topic,
+            self.send_encoded_nowait(topic, payload, content_type, key=key, headers=headers)
+        )
+    
+    async def _await_delivery(self, topic: str, delivery: asyncio.Future) -> bool:
+        """Wait for a delivery future within the delivery timeout."""
+        try:
+            record_metadata = await asyncio.wait_for(delivery, timeout=self.delivery_timeout)
             
-            logger.info(
+            logger.debug(
                 f"Message sent to {topic} "
                 f"[partition: {record_metadata.partition}, "
                 f"offset: {record_metadata.offset}]"
@@ -106,6 +343,9 @@ class CrisisKafkaProducer:
         except KafkaError as e:
             logger.error(f"Kafka error sending to {topic}: {e}")
             return False
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out waiting for delivery to {topic}")
+            return False
         except Exception as e:
             logger.error(f"Unexpected error sending to {topic}: {e}")
             return False
@@ -122,7 +362,7 @@ class CrisisKafkaProducer:
         
         Args:
             topic: Kafka topic name
-            value: Event data (will be JSON serialized)
+            value: Event data, encoded with the topic's configured codec
             key: Optional partition key
             headers: Optional message headers
             
@@ -130,23 +370,12 @@ class CrisisKafkaProducer:
             True if successful, False otherwise
         """
         try:
-            # Add metadata
-            enriched_value = {
-                **value,
-                '_timestamp': datetime.utcnow().isoformat(),
-                '_producer': self.client_id
-            }
-            
-            # Prepare headers
-            kafka_headers = []
-            if headers:
-                kafka_headers = [(k, v.encode('utf-8')) for k, v in headers.items()]
-            
             # Send message
+            payload, kafka_headers = self._encode(topic, value, headers)
             producer = self._get_producer()
             future = producer.send(
                 topic,
-                value=enriched_value,
+                value=payload,
                 key=key,
                 headers=kafka_headers
             )
@@ -176,6 +405,9 @@ class CrisisKafkaProducer:
         """
         Send multiple messages to a topic.
         
+        Every message is enqueued before any acknowledgement is awaited,
+        so the whole batch shares the producer's linger/batch window.
+        
         Args:
             topic: Kafka topic name
             messages: List of message dictionaries
@@ -183,10 +415,23 @@ class CrisisKafkaProducer:
         Returns:
             Number of successfully sent messages
         """
-        success_count = 0
-        for msg in messages:
-            if await self.send_event(topic, msg):
-                success_count += 1
+        if not messages:
+            return 0
+        
+        deliveries = [self.send_event_nowait(topic, msg) for msg in messages]
+        done, pending = await asyncio.wait(deliveries, timeout=self.delivery_timeout)
+        
+        if pending:
+            logger.error(f"Timed out waiting for {len(pending)} deliveries to {topic}")
+            for delivery in pending:
+                delivery.cancel()
+        
+        success_count = sum(1 for d in done if d.exception() is None)
+        if success_count < len(messages):
+            logger.error(
+                f"Failed to send {len(messages) - success_count} of "
+                f"{len(messages)} messages to {topic}"
+            )
         return success_count
     
     def flush(self, timeout: Optional[float] = None):
@@ -228,16 +473,25 @@ async def publish_claim(claim_data: Dict[str, Any]) -> bool:
     return await producer.send_event('claims', claim_data, key=claim_data.get('id'))
 
 
-async def publish_alert(alert_data: Dict[str, Any]) -> bool:
-    """Publish an alert to the alerts topic."""
+async def publish_alert(alert_data: Dict[str, Any], express: bool = False) -> bool:
+    """Publish an alert to the alerts topic, on the consumers' express lane if requested."""
     producer = get_kafka_producer()
-    return await producer.send_event('alerts', alert_data, key=alert_data.get('id'))
+    return await producer.send_event(
+        'alerts',
+        alert_data,
+        key=alert_data.get('id'),
+        headers={PRIORITY_HEADER: EXPRESS} if express else None
+    )
 
 
-async def publish_notification(notification_data: Dict[str, Any]) -> bool:
-    """Publish a notification event."""
+async def publish_notification(notification_data: Dict[str, Any], express: bool = False) -> bool:
+    """Publish a notification event, on the consumers' express lane if requested."""
     producer = get_kafka_producer()
-    return await producer.send_event('notifications', notification_data)
+    return await producer.send_event(
+        'notifications',
+        notification_data,
+        headers={PRIORITY_HEADER: EXPRESS} if express else None
+    )
 
 
 async def publish_user_activity(activity_data: Dict[str, Any]) -> bool:
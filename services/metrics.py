@@ -31,6 +31,157 @@ crisislen_risk_score = Histogram(
     buckets=[0.1, 0.3, 0.5, 0.7, 0.9, 1.0]
 )
 
+# Workflow metrics
+crisislen_workflow_cache_requests_total = Counter(
+    'crisislen_workflow_cache_requests_total',
+    'Workflow result cache lookups by content fingerprint; hit rate is hit / all',
+    ['result']
+)
+
+crisislen_workflow_queue_depth = Gauge(
+    'crisislen_workflow_queue_depth',
+    'Workflows waiting for admission',
+    ['source']
+)
+
+crisislen_workflow_admission_wait_seconds = Histogram(
+    'crisislen_workflow_admission_wait_seconds',
+    'Time workflows waited for admission',
+    ['source'],
+    buckets=[0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0]
+)
+
+crisislen_workflow_node_duration_seconds = Histogram(
+    'crisislen_workflow_node_duration_seconds',
+    'Duration of workflow graph nodes',
+    ['node'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+)
+
+crisislen_workflow_node_errors_total = Counter(
+    'crisislen_workflow_node_errors_total',
+    'Errors raised or recorded by workflow graph nodes',
+    ['node']
+)
+
+crisislen_workflow_cascade_claims_total = Counter(
+    'crisislen_workflow_cascade_claims_total',
+    'Claims gated by checkworthiness in cascade mode (checked or skipped)',
+    ['decision']
+)
+
+crisislen_workflow_cascade_skipped_total = Counter(
+    'crisislen_workflow_cascade_skipped_total',
+    'Work skipped by the cascade: claims per gated stage, advisories for draft_advisory',
+    ['stage']
+)
+
+crisislen_workflow_jobs_total = Counter(
+    'crisislen_workflow_jobs_total',
+    'Workflow queue job events (enqueued, completed, reclaimed, lost, dead_lettered)',
+    ['event']
+)
+
+# Kafka consumer metrics
+crisislen_kafka_in_flight_records = Gauge(
+    'crisislen_kafka_in_flight_records',
+    'Records received but not yet fully processed',
+    ['group', 'topic', 'partition']
+)
+
+crisislen_kafka_partition_paused = Gauge(
+    'crisislen_kafka_partition_paused',
+    'Whether a partition is paused for backpressure (1) or consuming (0)',
+    ['group', 'topic', 'partition']
+)
+
+crisislen_kafka_backpressure_pauses_total = Counter(
+    'crisislen_kafka_backpressure_pauses_total',
+    'Times a partition was paused because in-flight records hit the high-water mark',
+    ['group', 'topic']
+)
+
+crisislen_kafka_committed_offset = Gauge(
+    'crisislen_kafka_committed_offset',
+    'Last committed offset of the consumer group',
+    ['group', 'topic', 'partition']
+)
+
+crisislen_kafka_end_offset = Gauge(
+    'crisislen_kafka_end_offset',
+    'Offset the next record written to the partition will get',
+    ['group', 'topic', 'partition']
+)
+
+crisislen_kafka_consumer_lag = Gauge(
+    'crisislen_kafka_consumer_lag',
+    'Records written to the partition but not yet committed by the group',
+    ['group', 'topic', 'partition']
+)
+
+crisislen_kafka_records_consumed_total = Counter(
+    'crisislen_kafka_records_consumed_total',
+    'Records handled by consumers, by outcome',
+    ['group', 'topic', 'status']
+)
+
+crisislen_kafka_records_per_second = Gauge(
+    'crisislen_kafka_records_per_second',
+    'Records handled per second over the last metrics interval',
+    ['group']
+)
+
+crisislen_kafka_handler_duration_seconds = Histogram(
+    'crisislen_kafka_handler_duration_seconds',
+    'Time spent in a topic handler per record or batch',
+    ['group', 'topic'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+)
+
+crisislen_kafka_scheduler_wait_seconds = Histogram(
+    'crisislen_kafka_scheduler_wait_seconds',
+    'Time records waited for a handler slot, by priority class',
+    ['priority'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0]
+)
+
+crisislen_kafka_duplicates_skipped_total = Counter(
+    'crisislen_kafka_duplicates_skipped_total',
+    'Redelivered records skipped because their key was already handled',
+    ['group', 'topic']
+)
+
+crisislen_dlq_replay_total = Counter(
+    'crisislen_dlq_replay_total',
+    'DLQ entries handled by the replayer, by outcome',
+    ['topic', 'status']
+)
+
+crisislen_kafka_dlq_messages_total = Counter(
+    'crisislen_kafka_dlq_messages_total',
+    'Records sent to the dead letter queue',
+    ['group', 'topic', 'error_type']
+)
+
+# Kafka producer metrics
+crisislen_kafka_messages_produced_total = Counter(
+    'crisislen_kafka_messages_produced_total',
+    'Messages published to Kafka, by delivery outcome',
+    ['topic', 'status']
+)
+
+crisislen_kafka_delivery_latency_seconds = Histogram(
+    'crisislen_kafka_delivery_latency_seconds',
+    'Time from enqueueing a message to broker acknowledgement',
+    ['topic'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0]
+)
+
+crisislen_kafka_messages_pending = Gauge(
+    'crisislen_kafka_messages_pending',
+    'Messages enqueued in the producer and awaiting acknowledgement'
+)
+
 def get_metrics():
     """Return Prometheus metrics"""
     return Response(
@@ -1,10 +1,26 @@
 from opensearchpy import OpenSearch, helpers
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import json
 from config import settings
 from services.observability import observability_service
 
+
+class BulkIndexError(Exception):
+    """Raised when a bulk request indexed some documents but rejected others"""
+
+    def __init__(self, failed: Dict[str, Any], indexed: int):
+        """
+        Args:
+            failed: Document ID -> error reported for it
+            indexed: Number of documents that were indexed
+        """
+        super().__init__(f"Bulk indexing failed for {len(failed)} items")
+        self.failed = failed
+        self.indexed = indexed
+
+
 class OpenSearchService:
     def __init__(self):
         self.client = OpenSearch(
@@ -96,6 +112,40 @@ class OpenSearchService:
         except Exception as e:
             observability_service.log_error(f"Failed to index item {item['id']}: {e}")
     
+    async def bulk_index_items(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Index many normalized items in a single bulk request.
+        
+        Returns:
+            Number of successfully indexed items
+        
+        Raises:
+            BulkIndexError: If any item was rejected; the others are indexed
+        """
+        if not items:
+            return 0
+        
+        actions = [
+            {'_index': self.items_index, '_id': item['id'], '_source': item}
+            for item in items
+        ]
+        # The client is synchronous; keep the event loop free while it runs
+        success, errors = await asyncio.to_thread(
+            helpers.bulk, self.client, actions, raise_on_error=False
+        )
+        observability_service.log_info(f"Bulk indexed {success} items")
+        
+        if errors:
+            failed = {}
+            for error in errors:
+                result = next(iter(error.values()))
+                failed[result.get('_id')] = result.get('error', result.get('status'))
+            observability_service.log_error(
+                f"Bulk indexing failed for {len(failed)} of {len(items)} items"
+            )
+            raise BulkIndexError(failed, success)
+        return success
+    
     async def index_claim(self, claim: Dict[str, Any]):
         """Index a claim"""
         try:
@@ -1,6 +1,6 @@
 import redis.asyncio as redis
 import json
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 from datetime import timedelta
 from config import settings
 from services.observability import observability_service
@@ -8,6 +8,7 @@ from services.observability import observability_service
 class RedisService:
     def __init__(self):
         self.redis = None
+        self.binary_redis = None
         
     async def connect(self):
         """Connect to Redis"""
@@ -19,10 +20,20 @@ class RedisService:
             )
             observability_service.log_info("Connected to Redis")
     
+    async def connect_binary(self):
+        """Connect a client that returns raw bytes, for binary values"""
+        if not self.binary_redis:
+            self.binary_redis = await redis.from_url(
+                f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+                decode_responses=False
+            )
+    
     async def disconnect(self):
         """Disconnect from Redis"""
         if self.redis:
             await self.redis.close()
+        if self.binary_redis:
+            await self.binary_redis.close()
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
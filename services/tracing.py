@@ -1,25 +1,30 @@
 from opentelemetry import trace
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from config import settings
 
+try:
+    from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+except ImportError:  # optional; spans are still created, just not exported
+    JaegerExporter = None
+
 # Initialize tracer
 trace.set_tracer_provider(TracerProvider())
 tracer = trace.get_tracer(__name__)
 
 # Configure Jaeger exporter
-jaeger_exporter = JaegerExporter(
-    agent_host_name=getattr(settings, 'JAEGER_HOST', 'localhost'),
-    agent_port=getattr(settings, 'JAEGER_PORT', 6831),
-)
-
-# Add span processor
-trace.get_tracer_provider().add_span_processor(
-    BatchSpanProcessor(jaeger_exporter)
-)
+if JaegerExporter is not None:
+    jaeger_exporter = JaegerExporter(
+        agent_host_name=getattr(settings, 'JAEGER_HOST', 'localhost'),
+        agent_port=getattr(settings, 'JAEGER_PORT', 6831),
+    )
+    
+    # Add span processor
+    trace.get_tracer_provider().add_span_processor(
+        BatchSpanProcessor(jaeger_exporter)
+    )
 
 def instrument_app(app):
     """Instrument FastAPI app with tracing"""
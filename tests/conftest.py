@@ -7,6 +7,7 @@ from typing import Generator, AsyncGenerator
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from fastapi.testclient import TestClient
+import fakeredis
 import redis
 from unittest.mock import Mock, AsyncMock
 
@@ -66,6 +67,18 @@ def mock_redis():
     return mock
 
 
+@pytest.fixture
+def fake_redis():
+    """In-memory async Redis client returning bytes, like redis_service.binary_redis."""
+    return fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def fake_text_redis():
+    """In-memory async Redis client decoding responses, like redis_service.redis."""
+    return fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
 @pytest.fixture
 def mock_kafka_producer():
     """Mock Kafka producer."""
@@ -108,5 +108,41 @@ async def test_checkpoint():
     
     await redis_service.disconnect()
 
+@pytest.mark.asyncio
+async def test_batch_workflow_isolates_items():
+    """Test batch mode runs every item and keeps failures per item"""
+    await redis_service.connect()
+    
+    from workflows.batch_executor import BatchWorkflowExecutor
+    
+    raw_items = [
+        {
+            'id': f'batch_item_{i}',
+            'source': 'test',
+            'source_id': str(i),
+            'url': f'http://test.com/item/{i}',
+            'title': 'Flooding reported downtown',
+            'text': f'Officials say {i} streets are flooded after the storm.',
+            'timestamp': '2024-01-01T00:00:00Z',
+            'language_hint': 'en'
+        }
+        for i in range(3)
+    ]
+    # Missing required fields, so normalization fails for this item only
+    raw_items.append({'id': 'broken_item'})
+    
+    states = await BatchWorkflowExecutor(batch_size=2).run(raw_items)
+    
+    assert [s['raw_item_id'] for s in states] == [item['id'] for item in raw_items]
+    assert len({s['workflow_id'] for s in states}) == len(raw_items)
+    assert any(e.startswith('Normalization') for e in states[-1]['errors'])
+    for state in states[:-1]:
+        assert state['normalized_item'] is not None
+        assert not any(e.startswith('Normalization') for e in state['errors'])
+    
+    for state in states:
+        await state_manager.delete_state(state['workflow_id'])
+    await redis_service.disconnect()
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
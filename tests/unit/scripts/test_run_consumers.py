@@ -0,0 +1,130 @@
+"""
+Unit tests for the consumer supervisor.
+"""
+import types
+from unittest.mock import patch
+
+import pytest
+
+from scripts import process_supervisor
+from scripts.process_supervisor import (
+    HEALTHY_UPTIME_SECONDS,
+    MAX_RESTART_BACKOFF,
+    MIN_RESTART_BACKOFF
+)
+from scripts.run_consumers import ConsumerSupervisor
+from scripts.run_workflow_workers import WorkerPool
+
+
+class FakeProcess:
+    """Worker process that lives until the test kills it."""
+
+    pids = iter(range(1000, 2000))
+
+    def __init__(self, target=None, args=(), name=None, daemon=None):
+        self.name = name
+        self.pid = None
+        self.exitcode = None
+        self.alive = False
+
+    def start(self):
+        self.pid = next(self.pids)
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+    def crash(self, exitcode=1):
+        self.alive = False
+        self.exitcode = exitcode
+
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch.object(process_supervisor.time, 'monotonic', clock):
+        yield clock
+
+
+@pytest.fixture
+def supervisor(clock):
+    supervisor = ConsumerSupervisor({'main': 1})
+    supervisor.ctx = types.SimpleNamespace(Process=FakeProcess)
+    return supervisor
+
+
+@pytest.mark.unit
+class TestConsumerSupervisor:
+    """Test suite for restarting crashed consumer workers."""
+
+    def test_crashed_worker_restarts_after_backoff(self, supervisor, clock):
+        """Test a crashed worker is respawned only once its backoff elapses."""
+        slot, = supervisor.slots
+        supervisor._check_workers()
+        first = slot.process
+        assert first.is_alive()
+
+        first.crash()
+        supervisor._check_workers()
+        assert slot.process is None
+        assert slot.restarts == 1
+        assert slot.next_start == clock.now + MIN_RESTART_BACKOFF
+
+        clock.now += MIN_RESTART_BACKOFF
+        supervisor._check_workers()
+        assert slot.process is not first
+        assert slot.process.is_alive()
+
+    def test_backoff_doubles_up_to_the_cap(self, supervisor, clock):
+        """Test repeated crashes back off exponentially, bounded by the maximum."""
+        slot, = supervisor.slots
+        delays = []
+        for _ in range(10):
+            supervisor._check_workers()
+            slot.process.crash()
+            supervisor._check_workers()
+            delays.append(slot.next_start - clock.now)
+            clock.now = slot.next_start
+
+        assert delays[:3] == [MIN_RESTART_BACKOFF, 2 * MIN_RESTART_BACKOFF, 4 * MIN_RESTART_BACKOFF]
+        assert max(delays) == MAX_RESTART_BACKOFF
+        assert slot.restarts == 10
+
+    def test_healthy_worker_resets_backoff(self, supervisor, clock):
+        """Test a worker that stayed up long enough restarts quickly again."""
+        slot, = supervisor.slots
+        for _ in range(3):
+            supervisor._check_workers()
+            slot.process.crash()
+            supervisor._check_workers()
+            clock.now = slot.next_start
+        supervisor._check_workers()
+        assert slot.backoff == 8 * MIN_RESTART_BACKOFF
+
+        clock.now += HEALTHY_UPTIME_SECONDS + 1
+        supervisor._check_workers()
+        assert slot.backoff == MIN_RESTART_BACKOFF
+
+    def test_workflow_pool_spawns_one_worker_per_process(self, clock):
+        """Test the workflow pool is supervised the same way."""
+        pool = WorkerPool(processes=2, concurrency=4, metrics_port=9200)
+        pool.ctx = types.SimpleNamespace(Process=FakeProcess)
+
+        pool._check_workers()
+
+        assert [slot.process.name for slot in pool.slots] == ['workflow-worker-0', 'workflow-worker-1']
+        assert [slot.metrics_port for slot in pool.slots] == [9200, 9201]
+        assert pool.alive() == 2
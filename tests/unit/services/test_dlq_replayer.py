@@ -0,0 +1,148 @@
+"""
+Unit tests for the DLQ replayer.
+"""
+import asyncio
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from services.dlq_replayer import (
+    REPLAY_HEADER,
+    DLQReplayer,
+    ReplayAbortedError,
+    TokenBucket
+)
+from services.kafka_memory import InMemoryBroker
+from services.kafka_producer import CrisisKafkaProducer
+
+
+def dlq_entry(i, topic='normalized-items', error_type='ConnectionError', timestamp='2024-05-01T10:00:00'):
+    """DLQ message shaped like CrisisKafkaConsumer._send_to_dlq output."""
+    return {
+        'original_topic': topic,
+        'original_key': f'item-{i}',
+        'original_value': {'id': f'item-{i}'},
+        'original_partition': 0,
+        'original_offset': i,
+        'original_headers': {},
+        'error': 'boom',
+        'error_type': error_type,
+        'timestamp': timestamp
+    }
+
+
+@pytest.mark.unit
+class TestDLQReplayer:
+    """Test suite for DLQ replay."""
+
+    @pytest.fixture
+    def broker(self):
+        """Broker with the DLQ and an original topic."""
+        return InMemoryBroker(topics={'dlq': 1, 'normalized-items': 1, 'claims': 1})
+
+    def fill_dlq(self, broker, entries):
+        for entry in entries:
+            broker.append('dlq', json.dumps(entry).encode('utf-8'))
+
+    def replayed(self, broker, topic):
+        tp = broker.partitions_for(topic)[0]
+        return broker.fetch(tp, 0, 1000)
+
+    def make_replayer(self, broker, **kwargs):
+        kwargs.setdefault('producer', CrisisKafkaProducer(broker=broker))
+        return DLQReplayer(broker=broker, rate_per_second=None, poll_timeout_ms=10, **kwargs)
+
+    def test_filters(self, broker):
+        """Test topic, error type and time range filters."""
+        replayer = self.make_replayer(
+            broker,
+            topics=['normalized-items'],
+            error_types=['ConnectionError'],
+            since=datetime(2024, 5, 1, 8),
+            until=datetime(2024, 5, 1, 14)
+        )
+
+        assert replayer.matches(dlq_entry(0))
+        assert not replayer.matches(dlq_entry(0, topic='claims'))
+        assert not replayer.matches(dlq_entry(0, error_type='ValueError'))
+        assert not replayer.matches(dlq_entry(0, timestamp='2024-05-01T14:00:00'))
+        assert not replayer.matches(dlq_entry(0, timestamp='not a time'))
+
+    @pytest.mark.asyncio
+    async def test_replays_matching_entries_and_resumes(self, broker, tmp_path):
+        """Test matching entries are re-published once across reruns."""
+        self.fill_dlq(broker, [dlq_entry(i) for i in range(5)] + [dlq_entry(9, topic='claims')])
+        progress_path = str(tmp_path / 'progress.json')
+
+        replayer = self.make_replayer(
+            broker, name='outage', topics=['normalized-items'], progress_path=progress_path
+        )
+        progress = await asyncio.wait_for(replayer.run(), timeout=5)
+
+        assert progress['replayed'] == 5
+        assert progress['skipped'] == 1
+        assert progress['completed']
+        records = self.replayed(broker, 'normalized-items')
+        assert [json.loads(r.value)['id'] for r in records] == [f'item-{i}' for i in range(5)]
+        assert dict(records[0].headers)[REPLAY_HEADER] == b'dlq[0]@0'
+        assert self.replayed(broker, 'claims') == []
+
+        # A rerun has nothing left and keeps the earlier totals
+        rerun = self.make_replayer(
+            broker, name='outage', topics=['normalized-items'], progress_path=progress_path
+        )
+        progress = await asyncio.wait_for(rerun.run(), timeout=5)
+        assert progress['replayed'] == 5
+        assert len(self.replayed(broker, 'normalized-items')) == 5
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_aborts_and_resumes_there(self, broker):
+        """Test a failed publish stops the replay without skipping the entry."""
+        self.fill_dlq(broker, [dlq_entry(i) for i in range(4)])
+        failing = CrisisKafkaProducer(broker=broker)
+        real_send = failing.send_event
+
+        async def send_event(topic, value, **kwargs):
+            if value['id'] == 'item-2':
+                return False
+            return await real_send(topic, value, **kwargs)
+
+        failing.send_event = send_event
+
+        replayer = self.make_replayer(broker, name='flaky', producer=failing, concurrency=1)
+        with pytest.raises(ReplayAbortedError):
+            await asyncio.wait_for(replayer.run(), timeout=5)
+        assert broker.committed(replayer.group_id, broker.partitions_for('dlq')[0]) == 2
+
+        rerun = self.make_replayer(broker, name='flaky')
+        progress = await asyncio.wait_for(rerun.run(), timeout=5)
+        assert progress['replayed'] == 2
+        ids = [json.loads(r.value)['id'] for r in self.replayed(broker, 'normalized-items')]
+        assert ids == ['item-0', 'item-1', 'item-2', 'item-3']
+
+    @pytest.mark.asyncio
+    async def test_undecodable_originals_are_replayed_byte_for_byte(self, broker):
+        """Test entries stored as base64 are re-published with their content type."""
+        entry = dlq_entry(0)
+        entry['original_value'] = None
+        entry['original_value_base64'] = base64.b64encode(b'\x82\xa2id').decode('ascii')
+        entry['original_content_type'] = 'application/msgpack'
+        self.fill_dlq(broker, [entry])
+
+        await asyncio.wait_for(self.make_replayer(broker).run(), timeout=5)
+
+        record = self.replayed(broker, 'normalized-items')[0]
+        assert record.value == b'\x82\xa2id'
+        assert ('content-type', b'application/msgpack') in record.headers
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_limits_rate(self):
+        """Test the bucket spaces acquisitions at the configured rate."""
+        bucket = TokenBucket(rate=200, burst=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(11):
+            await bucket.acquire()
+        assert loop.time() - start >= 0.045
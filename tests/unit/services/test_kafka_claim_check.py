@@ -0,0 +1,194 @@
+"""
+Unit tests for claim-check storage of large message fields.
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from services.kafka_claim_check import (
+    REFERENCE_KEY,
+    ClaimCheck,
+    ClaimCheckedDict,
+    LocalBlobStore,
+    detach
+)
+from services.kafka_codecs import get_codec
+from services.kafka_consumer import CrisisKafkaConsumer
+from services.kafka_memory import InMemoryBroker
+from services.kafka_producer import CrisisKafkaProducer
+
+
+class CountingStore(LocalBlobStore):
+    """Local store that counts reads and records the threads doing I/O."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.reads = 0
+        self.threads = set()
+
+    def get(self, key):
+        self.reads += 1
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def put(self, data):
+        self.threads.add(threading.get_ident())
+        return super().put(data)
+
+
+def make_item(raw_size=10000):
+    """Item with a large raw payload and media metadata."""
+    return {
+        'id': 'gdelt-1',
+        'title': 'Bridge collapsed',
+        'raw_data': {'html': 'x' * raw_size},
+        'media': [
+            {'url': 'https://cdn.example.com/1.jpg', 'metadata': {'ocr': 'y' * raw_size}},
+            {'url': 'https://cdn.example.com/2.jpg', 'metadata': {}}
+        ]
+    }
+
+
+@pytest.mark.unit
+class TestClaimCheck:
+    """Test suite for claim-check offload and lazy resolution."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Counting blob store in a temporary directory."""
+        return CountingStore(str(tmp_path / 'blobs'))
+
+    @pytest.fixture
+    def claim_check(self, store):
+        """Claim-check with a small threshold."""
+        return ClaimCheck(store, threshold_bytes=1024)
+
+    def test_offloads_only_large_fields(self, claim_check):
+        """Test large fields become references and small ones stay inline."""
+        item = make_item()
+        message = claim_check.offload(item, get_codec('json'))
+
+        assert REFERENCE_KEY in message['raw_data']
+        assert REFERENCE_KEY in message['media'][0]['metadata']
+        assert message['media'][1]['metadata'] == {}
+        assert message['title'] == 'Bridge collapsed'
+        # The caller's message is untouched
+        assert item['raw_data'] == {'html': 'x' * 10000}
+
+        small = claim_check.offload(make_item(raw_size=10), get_codec('json'))
+        assert small['raw_data'] == {'html': 'x' * 10}
+
+    def test_identical_payloads_share_a_blob(self, claim_check):
+        """Test content addressing stores equal payloads once."""
+        codec = get_codec('json')
+        first = claim_check.offload(make_item(), codec)
+        second = claim_check.offload(make_item(), codec)
+
+        assert first['raw_data'] == second['raw_data']
+
+    def test_fields_resolve_on_first_read(self, claim_check, store):
+        """Test blobs are fetched only when a handler reads the field."""
+        message = claim_check.attach(claim_check.offload(make_item(), get_codec('json')))
+
+        assert isinstance(message, ClaimCheckedDict)
+        assert message['title'] == 'Bridge collapsed'
+        assert store.reads == 0
+
+        assert message['raw_data'] == {'html': 'x' * 10000}
+        assert message.get('raw_data') == {'html': 'x' * 10000}
+        assert store.reads == 1
+
+        assert message['media'][0]['metadata'] == {'ocr': 'y' * 10000}
+        assert store.reads == 2
+
+    def test_unpacking_resolves_and_detach_does_not(self, claim_check, store):
+        """Test ** unpacking resolves references while detach keeps them."""
+        message = claim_check.attach(claim_check.offload(make_item(), get_codec('json')))
+
+        detached = detach(message)
+        assert REFERENCE_KEY in detached['raw_data']
+        assert store.reads == 0
+
+        assert {**message}['raw_data'] == {'html': 'x' * 10000}
+
+    @pytest.mark.asyncio
+    async def test_resolve_fetches_everything(self, claim_check, store):
+        """Test resolve() fetches every reference ahead of the handler."""
+        message = claim_check.attach(claim_check.offload(make_item(), get_codec('json')))
+
+        await claim_check.resolve(message)
+
+        assert store.reads == 2
+        assert message.is_resolved('raw_data')
+
+    @pytest.mark.asyncio
+    async def test_end_to_end_through_broker(self, claim_check, store):
+        """Test only the reference travels on the topic and handlers see the payload."""
+        broker = InMemoryBroker(topics={'raw-items': 1})
+        producer = CrisisKafkaProducer(broker=broker, claim_check=claim_check)
+        assert await producer.send_event('raw-items', make_item(raw_size=100000), key='gdelt-1')
+
+        record = broker.fetch(broker.partitions_for('raw-items')[0], 0, 10)[0]
+        assert len(record.value) < 2000
+
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            broker=broker,
+            claim_check=claim_check,
+            poll_timeout_ms=50
+        )
+        received = []
+
+        async def handler(message):
+            received.append(message['raw_data']['html'])
+            consumer.stop()
+
+        consumer.register_handler('raw-items', handler)
+
+        with patch('services.kafka_consumer.signal.signal'):
+            await asyncio.wait_for(consumer.start(), timeout=5)
+
+        assert received == ['x' * 100000]
+
+    @pytest.mark.asyncio
+    async def test_blob_io_stays_off_the_event_loop(self, claim_check, store):
+        """Test producers offload and resolving consumers fetch in worker threads."""
+        broker = InMemoryBroker(topics={'raw-items': 1})
+        producer = CrisisKafkaProducer(broker=broker, claim_check=claim_check)
+        items = [
+            {**make_item(raw_size=size), 'id': f'gdelt-{i}'}
+            for i, size in enumerate([100000, 10, 100000, 10])
+        ]
+        assert await producer.send_batch('raw-items', items) == 4
+
+        # Small messages do not overtake large ones still being offloaded
+        records = broker.fetch(broker.partitions_for('raw-items')[0], 0, 10)
+        assert [json.loads(r.value)['id'] for r in records] == [i['id'] for i in items]
+
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            broker=broker,
+            claim_check=claim_check,
+            poll_timeout_ms=50
+        )
+        received = []
+
+        async def handler(message):
+            assert REFERENCE_KEY not in detach(message)['raw_data']
+            received.append(message['id'])
+            if len(received) == 4:
+                consumer.stop()
+
+        consumer.register_handler('raw-items', handler, resolve_claim_checks=True)
+
+        with patch('services.kafka_consumer.signal.signal'):
+            await asyncio.wait_for(consumer.start(), timeout=5)
+
+        assert len(received) == 4
+        assert store.reads == 4
+        assert threading.get_ident() not in store.threads
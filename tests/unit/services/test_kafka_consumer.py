@@ -0,0 +1,419 @@
+"""
+Unit tests for Kafka consumer service.
+"""
+import asyncio
+import json
+import sys
+import threading
+import types
+from collections import namedtuple
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from services.kafka_consumer import BatchItemsFailed, CrisisKafkaConsumer, handle_normalized_items
+from services.kafka_dispatch import (
+    EXPRESS,
+    OffsetTracker,
+    PartitionedDispatcher,
+    PriorityScheduler
+)
+
+TopicPartition = namedtuple('TopicPartition', ['topic', 'partition'])
+Record = namedtuple('Record', ['topic', 'partition', 'offset', 'key', 'value', 'headers'])
+
+
+def make_record(topic, partition, offset, key=None, value=None, headers=None):
+    """Build a raw consumer record like the ones returned by poll()."""
+    payload = json.dumps(value or {'id': f'{topic}-{offset}'}).encode('utf-8')
+    return Record(topic, partition, offset, key, payload, headers or [])
+
+
+@pytest.mark.unit
+class TestPartitionedDispatcher:
+    """Test suite for the concurrent dispatcher."""
+
+    @pytest.mark.asyncio
+    async def test_same_key_runs_in_order(self):
+        """Test records sharing a key are processed sequentially."""
+        dispatcher = PartitionedDispatcher(default_concurrency=4)
+        seen = []
+
+        async def work(i, delay):
+            await asyncio.sleep(delay)
+            seen.append(i)
+
+        for i, delay in enumerate([0.03, 0.01, 0.0]):
+            dispatcher.submit('raw-items', 'item-1', lambda i=i, d=delay: work(i, d))
+        await dispatcher.drain()
+
+        assert seen == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_topic_concurrency_limit(self):
+        """Test a topic never exceeds its concurrency limit."""
+        dispatcher = PartitionedDispatcher(default_concurrency=8, topic_concurrency={'raw-items': 2})
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        for i in range(10):
+            dispatcher.submit('raw-items', i, work)
+        await dispatcher.drain()
+
+        assert peak == 2
+        assert dispatcher.in_flight == 0
+
+
+@pytest.mark.unit
+class TestOffsetTracker:
+    """Test suite for at-least-once offset tracking."""
+
+    def test_commits_stop_at_lowest_pending_offset(self):
+        """Test out-of-order completion never commits past unfinished records."""
+        tracker = OffsetTracker()
+        tp = TopicPartition('raw-items', 0)
+        for offset in (10, 11, 12):
+            tracker.track(tp, offset)
+
+        tracker.complete(tp, 11)
+        tracker.complete(tp, 12)
+        assert tracker.committable() == {tp: 10}
+
+        tracker.complete(tp, 10)
+        assert tracker.committable() == {tp: 13}
+
+        tracker.mark_committed({tp: 13})
+        assert tracker.committable() == {}
+
+
+@pytest.mark.unit
+class TestPriorityScheduler:
+    """Test suite for weighted fair handler scheduling."""
+
+    async def _grant_order(self, scheduler, holder, priorities):
+        """Queue waiters behind a held slot and return the order they are granted."""
+        order = []
+
+        async def waiter(priority):
+            async with scheduler.slot(priority):
+                order.append(priority)
+                await asyncio.sleep(0)
+
+        await scheduler.acquire(holder)
+        tasks = [asyncio.create_task(waiter(p)) for p in priorities]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    @pytest.mark.asyncio
+    async def test_contended_slots_follow_weights(self):
+        """Test classes share contended slots in proportion to their weights."""
+        scheduler = PriorityScheduler(capacity=1, weights={'high': 4, 'bulk': 1})
+
+        order = await self._grant_order(scheduler, 'bulk', ['bulk'] * 10 + ['high'] * 10)
+
+        # Roughly 4:1 while both are waiting, and bulk is never starved
+        assert order[:10].count('high') >= 8
+        assert 'bulk' in order[:10]
+
+    @pytest.mark.asyncio
+    async def test_express_jumps_queue_and_uses_reserve(self):
+        """Test express waiters go first and may exceed the capacity."""
+        scheduler = PriorityScheduler(capacity=1, express_reserve=1)
+        await scheduler.acquire('bulk')
+
+        # The reserve slot is free even though the capacity is used up
+        await asyncio.wait_for(scheduler.acquire(EXPRESS), timeout=1)
+        assert scheduler.active == 2
+        scheduler.release()
+        scheduler.release()
+
+        order = await self._grant_order(scheduler, 'normal', ['high', 'bulk', EXPRESS])
+        assert order[0] == EXPRESS
+
+    def test_rejects_unknown_topic_priority(self):
+        """Test consumers refuse topic priorities the scheduler does not know."""
+        with pytest.raises(ValueError):
+            CrisisKafkaConsumer(
+                topics=['alerts'],
+                group_id='test',
+                scheduler=PriorityScheduler(),
+                topic_priorities={'alerts': 'urgent'}
+            )
+
+
+@pytest.mark.unit
+class TestKafkaConsumer:
+    """Test suite for Kafka consumer."""
+
+    def test_invalid_processing_mode(self):
+        """Test unknown processing modes are rejected."""
+        with pytest.raises(ValueError):
+            CrisisKafkaConsumer(topics=['raw-items'], group_id='test', processing_mode='parallel')
+
+    @pytest.mark.asyncio
+    async def test_concurrent_mode_overlaps_partitions(self):
+        """Test records from different partitions are handled concurrently."""
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            processing_mode='concurrent'
+        )
+        active = 0
+        peak = 0
+
+        async def handler(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        consumer.register_handler('raw-items', handler)
+
+        batch = {
+            TopicPartition('raw-items', p): [make_record('raw-items', p, 0)]
+            for p in range(3)
+        }
+
+        def poll(**kwargs):
+            consumer.stop()
+            return batch
+
+        mock_kafka_consumer = Mock()
+        mock_kafka_consumer.poll.side_effect = poll
+
+        with patch.object(consumer, '_get_consumer', return_value=mock_kafka_consumer), \
+             patch('services.kafka_consumer.signal.signal'):
+            await consumer.start()
+
+        assert peak == 3
+        mock_kafka_consumer.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_poll_runs_off_event_loop(self):
+        """Test blocking polls run on the dedicated consumer thread."""
+        consumer = CrisisKafkaConsumer(topics=['alerts'], group_id='test')
+        poll_threads = []
+
+        def poll(**kwargs):
+            poll_threads.append(threading.current_thread().name)
+            consumer.stop()
+            return {}
+
+        mock_kafka_consumer = Mock()
+        mock_kafka_consumer.poll.side_effect = poll
+
+        with patch.object(consumer, '_get_consumer', return_value=mock_kafka_consumer), \
+             patch('services.kafka_consumer.signal.signal'):
+            await consumer.start()
+
+        assert poll_threads
+        assert all(name.startswith('kafka-test') for name in poll_threads)
+
+    @pytest.mark.asyncio
+    async def test_failed_record_goes_to_dlq(self):
+        """Test handler failures are routed to the dead letter queue."""
+        consumer = CrisisKafkaConsumer(topics=['claims'], group_id='test')
+
+        async def handler(message):
+            raise RuntimeError("boom")
+
+        record = consumer._decode_record(make_record('claims', 0, 7))
+
+        with patch.object(consumer, '_send_to_dlq') as mock_dlq:
+            await consumer._handle_record('claims', record, handler)
+
+        mock_dlq.assert_called_once()
+        assert mock_dlq.call_args[0][1] is record
+
+    @pytest.mark.asyncio
+    async def test_batch_handler_commits_after_return(self):
+        """Test batches respect max_batch and offsets commit only after the handler."""
+        consumer = CrisisKafkaConsumer(
+            topics=['normalized-items'],
+            group_id='test',
+            at_least_once=True
+        )
+        batches = []
+        commits = []
+
+        async def batch_handler(messages):
+            batches.append(messages)
+
+        def commit(offsets):
+            # Never commit past records whose handler has not returned
+            handled = sum(len(b) for b in batches)
+            assert all(offset.offset <= handled for offset in offsets.values())
+            commits.append(offsets)
+
+        consumer.register_batch_handler('normalized-items', batch_handler, max_batch=2, max_wait_ms=50)
+
+        records = [make_record('normalized-items', 0, offset) for offset in range(5)]
+
+        def poll(**kwargs):
+            consumer.stop()
+            return {TopicPartition('normalized-items', 0): records}
+
+        mock_kafka_consumer = Mock()
+        mock_kafka_consumer.poll.side_effect = poll
+        mock_kafka_consumer.commit.side_effect = commit
+
+        with patch.object(consumer, '_get_consumer', return_value=mock_kafka_consumer), \
+             patch('services.kafka_consumer.signal.signal'):
+            await consumer.start()
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert consumer.enable_auto_commit is False
+        committed = commits[-1]
+        assert [offset.offset for offset in committed.values()] == [5]
+
+    @pytest.mark.asyncio
+    async def test_partially_failed_batch_dead_letters_failed_records(self):
+        """Test only the records a batch handler reports as failed go to the DLQ."""
+        consumer = CrisisKafkaConsumer(topics=['normalized-items'], group_id='test')
+        error = RuntimeError("mapping conflict")
+
+        async def batch_handler(messages):
+            raise BatchItemsFailed({1: error})
+
+        batch = [
+            consumer._decode_record(make_record('normalized-items', 0, offset))
+            for offset in range(3)
+        ]
+        with patch.object(consumer, '_send_to_dlq') as mock_dlq:
+            await consumer._handle_batch('normalized-items', batch, batch_handler)
+
+        mock_dlq.assert_called_once_with('normalized-items', batch[1], error)
+        assert consumer.records_processed == 2
+        assert consumer.records_failed == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_items_raise_no_alerts(self):
+        """Test items OpenSearch rejects are reported as failed and not alerted on."""
+        class BulkIndexError(Exception):
+            def __init__(self, failed):
+                super().__init__('rejected')
+                self.failed = failed
+
+        opensearch = types.SimpleNamespace(
+            bulk_index_items=AsyncMock(side_effect=BulkIndexError({'b': 'mapper_parsing_exception'}))
+        )
+        producer = types.SimpleNamespace(publish_alert=AsyncMock())
+        modules = {
+            'services.opensearch_service': types.SimpleNamespace(
+                BulkIndexError=BulkIndexError, opensearch_service=opensearch
+            ),
+            'services.kafka_producer': producer
+        }
+        messages = [{'id': 'a', 'risk_score': 0.9}, {'id': 'b', 'risk_score': 0.9}]
+
+        with patch.dict(sys.modules, modules), pytest.raises(BatchItemsFailed) as failed:
+            await handle_normalized_items(messages)
+
+        assert list(failed.value.failures) == [1]
+        assert [call.args[0]['item_id'] for call in producer.publish_alert.await_args_list] == ['a']
+
+    @pytest.mark.asyncio
+    async def test_backpressure_pauses_and_resumes_partition(self):
+        """Test partitions pause at the high-water mark and resume when drained."""
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            max_in_flight_per_partition=4,
+            resume_in_flight_per_partition=1
+        )
+        tp = TopicPartition('raw-items', 0)
+        for offset in range(4):
+            consumer._offsets.track(tp, offset)
+
+        mock_kafka_consumer = Mock()
+        await consumer._apply_backpressure(mock_kafka_consumer)
+
+        mock_kafka_consumer.pause.assert_called_once_with(tp)
+        assert consumer.backpressure_state()['paused'] == ['raw-items[0]']
+
+        for offset in range(3):
+            consumer._offsets.complete(tp, offset)
+        await consumer._apply_backpressure(mock_kafka_consumer)
+
+        mock_kafka_consumer.resume.assert_called_once_with(tp)
+        assert consumer.backpressure_state()['paused'] == []
+
+    @pytest.mark.asyncio
+    async def test_revoked_partition_drops_its_pause(self):
+        """Test a rebalance forgets pauses so the new assignment is not left paused."""
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            max_in_flight_per_partition=2
+        )
+        tp = TopicPartition('raw-items', 0)
+        for offset in range(2):
+            consumer._offsets.track(tp, offset)
+        await consumer._apply_backpressure(Mock())
+        assert consumer.backpressure_state()['paused'] == ['raw-items[0]']
+
+        await consumer._revoke_partitions({tp})
+
+        assert consumer.backpressure_state() == {'in_flight': {}, 'paused': []}
+
+    @pytest.mark.asyncio
+    async def test_undecodable_record_goes_to_dlq(self):
+        """Test values that fail to decode are routed to the DLQ, not the handler."""
+        consumer = CrisisKafkaConsumer(topics=['claims'], group_id='test')
+        handler = Mock()
+        raw = make_record('claims', 0, 3)._replace(value=b'{not json')
+        record = consumer._decode_record(raw)
+
+        with patch.object(consumer, '_send_to_dlq') as mock_dlq:
+            await consumer._handle_record('claims', record, handler)
+
+        handler.assert_not_called()
+        mock_dlq.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_metrics_refresh_reports_lag_from_committed_offsets(self):
+        """Test lag gauges use committed offsets and drop revoked partitions."""
+        consumer = CrisisKafkaConsumer(topics=['claims'], group_id='test', metrics_interval_ms=0)
+        tp = TopicPartition('claims', 0)
+
+        mock_kafka_consumer = Mock()
+        mock_kafka_consumer.assignment.return_value = {tp}
+        mock_kafka_consumer.end_offsets.return_value = {tp: 10}
+        mock_kafka_consumer.position.return_value = 8
+        mock_kafka_consumer.committed.return_value = 3
+
+        with patch('services.kafka_consumer.crisislen_kafka_consumer_lag') as mock_lag:
+            await consumer._maybe_refresh_metrics(mock_kafka_consumer)
+
+            mock_lag.labels.assert_called_with(group='test', topic='claims', partition='0')
+            mock_lag.labels.return_value.set.assert_called_once_with(7)
+
+            mock_kafka_consumer.assignment.return_value = set()
+            await consumer._maybe_refresh_metrics(mock_kafka_consumer)
+
+            mock_lag.remove.assert_called_once_with('test', 'claims', '0')
+
+    def test_express_header_selects_express_lane(self):
+        """Test records carrying the express header bypass their topic's class."""
+        consumer = CrisisKafkaConsumer(
+            topics=['alerts'],
+            group_id='test',
+            scheduler=PriorityScheduler(),
+            topic_priorities={'alerts': 'high'}
+        )
+        normal = make_record('alerts', 0, 0)
+        express = make_record('alerts', 0, 1, headers=[('x-priority', b'express')])
+
+        assert consumer._priority_of('alerts', [normal]) == 'high'
+        assert consumer._priority_of('alerts', [express]) == EXPRESS
+        assert consumer._priority_of('raw-items', [normal]) == 'normal'
@@ -0,0 +1,113 @@
+"""
+Unit tests for consumer redelivery deduplication.
+"""
+import json
+from collections import namedtuple
+
+import pytest
+from unittest.mock import AsyncMock
+
+from services.kafka_consumer import CrisisKafkaConsumer
+from services.kafka_dedup import BloomFilter, DedupFilter, RotatingBloomFilter
+
+Record = namedtuple('Record', ['topic', 'partition', 'offset', 'key', 'value', 'headers'])
+
+
+class BrokenRedis:
+    def __init__(self, error=None):
+        self.error = error or ConnectionError("redis down")
+
+    def pipeline(self):
+        raise self.error
+
+
+@pytest.mark.unit
+class TestBloomFilter:
+    """Test suite for the in-process filters."""
+
+    def test_no_false_negatives(self):
+        """Test every added key is reported as present."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'item-{i}')
+        assert all(f'item-{i}' in bloom for i in range(1000))
+
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+    def test_rotation_bounds_memory(self):
+        """Test old generations are dropped instead of growing the filter."""
+        bloom = RotatingBloomFilter(capacity=100, error_rate=0.01, generations=2)
+        for i in range(100):
+            bloom.add(f'item-{i}')
+        size = bloom.memory_bytes
+        for i in range(100, 1000):
+            bloom.add(f'item-{i}')
+
+        assert bloom.memory_bytes == size
+        assert 'item-999' in bloom
+
+
+@pytest.mark.unit
+class TestDedupFilter:
+    """Test suite for the two-tier dedup filter."""
+
+    @pytest.mark.asyncio
+    async def test_marks_are_shared_across_workers(self, fake_text_redis):
+        """Test a key handled by one worker is seen by another via Redis."""
+        first = DedupFilter(redis_client=fake_text_redis)
+        second = DedupFilter(redis_client=fake_text_redis)
+
+        assert not await second.seen('main:raw-items', 'item-1')
+        await first.mark('main:raw-items', 'item-1')
+        assert await second.seen('main:raw-items', 'item-1')
+        assert not await second.seen('main:claims', 'item-1')
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_filter_without_redis(self):
+        """Test Redis errors degrade to in-process dedup."""
+        dedup = DedupFilter(redis_client=BrokenRedis())
+
+        await dedup.mark('main:raw-items', 'item-1')
+
+        assert await dedup.seen('main:raw-items', 'item-1')
+        assert not await dedup.seen('main:raw-items', 'item-2')
+
+    @pytest.mark.asyncio
+    async def test_unexpected_errors_are_not_swallowed(self):
+        """Test only Redis and connection errors fall back to the local filter."""
+        dedup = DedupFilter(redis_client=BrokenRedis(TypeError("bad argument")))
+
+        with pytest.raises(TypeError):
+            await dedup.mark('main:raw-items', 'item-1')
+        with pytest.raises(TypeError):
+            await dedup.seen('main:raw-items', 'item-1')
+
+
+@pytest.mark.unit
+class TestConsumerDedup:
+    """Test suite for dedup in CrisisKafkaConsumer."""
+
+    def make_record(self, offset, item_id):
+        value = json.dumps({'id': item_id}).encode('utf-8')
+        return Record('raw-items', 0, offset, None, value, [])
+
+    @pytest.mark.asyncio
+    async def test_skips_redelivered_records_after_success_only(self):
+        """Test duplicates are skipped, but failed records are retried."""
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='test',
+            dedup=DedupFilter(use_redis=False)
+        )
+        handler = AsyncMock(side_effect=[RuntimeError("boom"), None])
+        consumer._send_to_dlq = AsyncMock()
+
+        for offset in range(3):
+            record = consumer._decode_record(self.make_record(offset, 'item-1'))
+            await consumer._handle_record('raw-items', record, handler)
+
+        # Failed once, succeeded on redelivery, then skipped
+        assert handler.await_count == 2
+        assert consumer.records_failed == 1
+        assert consumer.records_processed == 1
@@ -0,0 +1,160 @@
+"""
+Unit tests for the in-memory Kafka broker.
+"""
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import Mock, patch
+
+from services.kafka_consumer import CrisisKafkaConsumer
+from services.kafka_memory import InMemoryBroker, InMemoryKafkaConsumer
+from services.kafka_producer import CrisisKafkaProducer
+
+
+@pytest.mark.unit
+class TestInMemoryBroker:
+    """Test suite for the in-memory broker."""
+
+    @pytest.fixture
+    def broker(self):
+        """Broker with a partitioned topic."""
+        return InMemoryBroker(topics={'raw-items': 3})
+
+    def test_keyed_records_share_a_partition(self, broker):
+        """Test records with the same key land on the same partition."""
+        partitions = {broker.append('raw-items', b'{}', key=b'item-1').partition for _ in range(5)}
+        assert len(partitions) == 1
+
+    def test_group_members_split_partitions(self, broker):
+        """Test a consumer group spreads partitions across its members."""
+        first = InMemoryKafkaConsumer('raw-items', broker=broker, group_id='g')
+        second = InMemoryKafkaConsumer('raw-items', broker=broker, group_id='g')
+
+        assert len(first.assignment()) + len(second.assignment()) == 3
+        assert not first.assignment() & second.assignment()
+
+        second.close()
+        assert len(first.assignment()) == 3
+
+    def test_rebalance_waits_for_an_in_progress_fetch(self, broker):
+        """Test a member joining mid-poll does not swap the assignment under the fetch."""
+        for i in range(6):
+            broker.append('raw-items', b'{}', key=str(i).encode())
+        consumer = InMemoryKafkaConsumer(
+            'raw-items', broker=broker, group_id='g', auto_offset_reset='earliest'
+        )
+        joiners = []
+        fetch = broker.fetch
+
+        def fetch_while_joining(tp, offset, max_records):
+            if not joiners:
+                joiner = threading.Thread(
+                    target=InMemoryKafkaConsumer,
+                    args=('raw-items',),
+                    kwargs={'broker': broker, 'group_id': 'g'}
+                )
+                joiners.append(joiner)
+                joiner.start()
+                joiner.join(timeout=0.1)
+            return fetch(tp, offset, max_records)
+
+        with patch.object(broker, 'fetch', side_effect=fetch_while_joining):
+            records = consumer.poll(timeout_ms=0)
+        joiners[0].join()
+
+        assert sum(len(r) for r in records.values()) == 6
+        assert len(consumer.assignment()) == 2
+
+    def test_lag_tracks_commits(self, broker):
+        """Test lag is end offset minus committed offset."""
+        for i in range(4):
+            broker.append('raw-items', b'{}', key=str(i).encode())
+        consumer = InMemoryKafkaConsumer(
+            'raw-items', broker=broker, group_id='g',
+            auto_offset_reset='earliest', enable_auto_commit=False
+        )
+        assert broker.total_lag('g', ['raw-items']) == 4
+
+        consumer.poll(timeout_ms=0)
+        consumer.commit()
+        assert broker.total_lag('g', ['raw-items']) == 0
+
+    @pytest.mark.asyncio
+    async def test_end_to_end_through_crisis_clients(self, broker):
+        """Test CrisisKafkaProducer and CrisisKafkaConsumer run against the broker."""
+        producer = CrisisKafkaProducer(broker=broker)
+        sent = await producer.send_batch('raw-items', [{'id': f'item-{i}'} for i in range(20)])
+        assert sent == 20
+
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='crisis-lens-main',
+            broker=broker,
+            processing_mode='concurrent',
+            at_least_once=True,
+            poll_timeout_ms=50,
+            commit_interval_ms=10
+        )
+        received = []
+
+        async def handler(message):
+            received.append(message['id'])
+            if len(received) == 20:
+                consumer.stop()
+
+        consumer.register_handler('raw-items', handler)
+
+        with patch('services.kafka_consumer.signal.signal'):
+            await asyncio.wait_for(consumer.start(), timeout=5)
+
+        assert sorted(received) == sorted(f'item-{i}' for i in range(20))
+        assert broker.total_lag('crisis-lens-main', ['raw-items']) == 0
+
+    @pytest.mark.asyncio
+    async def test_rebalance_commits_and_forgets_revoked_partitions(self, broker):
+        """Test a rebalance commits handled offsets before partitions move."""
+        producer = CrisisKafkaProducer(broker=broker)
+        await producer.send_batch('raw-items', [{'id': f'item-{i}'} for i in range(12)])
+
+        consumer = CrisisKafkaConsumer(
+            topics=['raw-items'],
+            group_id='g',
+            broker=broker,
+            processing_mode='concurrent',
+            at_least_once=True,
+            poll_timeout_ms=20,
+            commit_interval_ms=60000
+        )
+        received = []
+
+        async def handler(message):
+            received.append(message['id'])
+
+        consumer.register_handler('raw-items', handler)
+
+        async def wait_until(condition):
+            for _ in range(200):
+                if condition():
+                    return
+                await asyncio.sleep(0.01)
+            raise AssertionError("condition not reached")
+
+        running = asyncio.create_task(consumer.start(handle_signals=False))
+        await wait_until(lambda: len(received) == 12)
+
+        newcomer = InMemoryKafkaConsumer(
+            'raw-items', broker=broker, group_id='g', enable_auto_commit=False
+        )
+        newcomer.subscribe(['raw-items'], listener=Mock())
+        # Revoked partitions are committed though no periodic commit is due
+        await wait_until(lambda: broker.total_lag('g', ['raw-items']) == 0)
+
+        assert newcomer.poll(timeout_ms=0) == {}
+        taken = newcomer.assignment()
+        assert taken
+        assert not set(consumer._offsets.partitions()) & taken
+
+        consumer.stop()
+        await asyncio.wait_for(running, timeout=5)
+        assert sorted(received) == sorted(f'item-{i}' for i in range(12))
@@ -1,11 +1,21 @@
 """
 Unit tests for Kafka producer service.
 """
+import asyncio
 import pytest
+from kafka.errors import KafkaError
 from unittest.mock import Mock, patch, AsyncMock
 from services.kafka_producer import CrisisKafkaProducer, publish_raw_item
 
 
+def make_delivered_future(metadata):
+    """Kafka future that invokes callbacks immediately, as a completed send does."""
+    future = Mock()
+    future.get.return_value = metadata
+    future.add_callback.side_effect = lambda fn: fn(metadata)
+    return future
+
+
 @pytest.mark.unit
 class TestKafkaProducer:
     """Test suite for Kafka producer."""
@@ -31,9 +41,7 @@ class TestKafkaProducer:
         
         with patch.object(producer, '_get_producer') as mock_get_producer:
             mock_kafka_producer = Mock()
-            mock_future = Mock()
-            mock_future.get.return_value = Mock(partition=0, offset=123)
-            mock_kafka_producer.send.return_value = mock_future
+            mock_kafka_producer.send.return_value = make_delivered_future(Mock(partition=0, offset=123))
             mock_get_producer.return_value = mock_kafka_producer
             
             result = await producer.send_event('test-topic', test_event)
@@ -49,9 +57,7 @@ class TestKafkaProducer:
         
         with patch.object(producer, '_get_producer') as mock_get_producer:
             mock_kafka_producer = Mock()
-            mock_future = Mock()
-            mock_future.get.return_value = Mock(partition=0, offset=123)
-            mock_kafka_producer.send.return_value = mock_future
+            mock_kafka_producer.send.return_value = make_delivered_future(Mock(partition=0, offset=123))
             mock_get_producer.return_value = mock_kafka_producer
             
             await producer.send_event('test-topic', test_event, key=test_key)
@@ -72,18 +78,46 @@ class TestKafkaProducer:
     
     @pytest.mark.asyncio
     async def test_send_batch(self, producer):
-        """Test batch sending."""
+        """Test batch sending enqueues every message before awaiting delivery."""
         messages = [
             {"id": "1"},
             {"id": "2"},
             {"id": "3"}
         ]
         
-        with patch.object(producer, 'send_event', return_value=True) as mock_send:
-            count = await producer.send_batch('test-topic', messages)
+        with patch.object(producer, '_get_producer') as mock_get_producer:
+            mock_kafka_producer = Mock()
+            pending_callbacks = []
+            future = Mock()
+            future.add_callback.side_effect = pending_callbacks.append
+            mock_kafka_producer.send.return_value = future
+            mock_get_producer.return_value = mock_kafka_producer
+            
+            batch = asyncio.ensure_future(producer.send_batch('test-topic', messages))
+            await asyncio.sleep(0)
+            
+            # All messages were handed to the producer before any ack arrived
+            assert mock_kafka_producer.send.call_count == 3
+            assert not batch.done()
+            
+            for callback in pending_callbacks:
+                callback(Mock(partition=0, offset=1))
+            count = await batch
             
             assert count == 3
-            assert mock_send.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_send_event_delivery_error(self, producer):
+        """Test broker delivery errors are reported as failures."""
+        with patch.object(producer, '_get_producer') as mock_get_producer:
+            mock_kafka_producer = Mock()
+            future = Mock()
+            future.add_errback.side_effect = lambda fn: fn(KafkaError("broker down"))
+            mock_kafka_producer.send.return_value = future
+            mock_get_producer.return_value = mock_kafka_producer
+            
+            result = await producer.send_event('test-topic', {"id": "1"})
+            assert result is False
     
     @pytest.mark.asyncio
     async def test_publish_raw_item_convenience_function(self, mock_kafka_producer):
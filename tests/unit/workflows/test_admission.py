@@ -0,0 +1,93 @@
+"""
+Unit tests for workflow admission control.
+"""
+import asyncio
+
+import pytest
+
+from workflows.admission import BurstTracker, WorkflowAdmission
+
+
+def item(source, text='Routine council meeting notes', title='Update'):
+    return {'source': source, 'title': title, 'text': text}
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.unit
+class TestWorkflowAdmission:
+    """Test suite for the workflow admission scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_and_source_quota(self):
+        """Test a source at its quota waits while others still run."""
+        admission = WorkflowAdmission(max_concurrency=2, default_source_quota=1)
+        reddit = await admission.acquire(item('reddit'))
+
+        second_reddit = asyncio.create_task(admission.acquire(item('reddit', text='other')))
+        await settle()
+        assert not second_reddit.done()
+        assert admission.queued() == {'reddit': 1}
+
+        await admission.acquire(item('gdelt'))
+        assert admission.active == 2
+
+        admission.release(reddit)
+        assert await asyncio.wait_for(second_reddit, 1) == 'reddit'
+        assert sum(admission.queued().values()) == 0
+
+    @pytest.mark.asyncio
+    async def test_reliable_and_risky_items_jump_the_queue(self):
+        """Test waiting items are admitted by priority, not arrival."""
+        admission = WorkflowAdmission(
+            max_concurrency=1,
+            source_reliability={'who_ears': 0.9, 'reddit': 0.4},
+            keywords=['trapped']
+        )
+        holder = await admission.acquire(item('reddit'))
+        admitted = []
+
+        async def run(raw_item, name):
+            source = await admission.acquire(raw_item)
+            admitted.append(name)
+            admission.release(source)
+
+        tasks = [
+            asyncio.create_task(run(item('reddit', text='bake sale'), 'low')),
+            asyncio.create_task(run(item('who_ears', text='clinic hours'), 'reliable')),
+            asyncio.create_task(run(item('reddit', text='Families trapped by floods'), 'keyword')),
+        ]
+        await settle()
+        admission.release(holder)
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+
+        # reddit + keyword (0.9) ties who_ears (0.9); earlier arrival wins
+        assert admitted == ['reliable', 'keyword', 'low']
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        """Test cancelling a queued workflow does not leak a slot."""
+        admission = WorkflowAdmission(max_concurrency=1)
+        holder = await admission.acquire(item('gdelt'))
+        waiting = asyncio.create_task(admission.acquire(item('gdelt', text='next')))
+        await settle()
+
+        waiting.cancel()
+        await settle()
+        admission.release(holder)
+
+        assert admission.active == 0
+        async with admission.slot(item('gdelt')):
+            assert admission.active == 1
+
+    def test_burst_tracker(self):
+        """Test a signal bursts once it repeats enough within the window."""
+        tracker = BurstTracker(window_seconds=60, threshold=3)
+
+        assert not tracker.record(['content:abc'], now=0)
+        assert not tracker.record(['content:abc'], now=10)
+        assert tracker.record(['content:abc'], now=20)
+        assert not tracker.record(['content:abc'], now=200)
@@ -0,0 +1,235 @@
+"""
+Unit tests for micro-batched workflow execution.
+"""
+import contextlib
+import importlib
+import sys
+import types
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from schemas.item import NormalizedItem
+from workflows import instrumentation
+from workflows.admission import WorkflowAdmission
+
+
+def make_raw_item(i):
+    return {
+        'id': f'item-{i}',
+        'source': 'test',
+        'source_id': str(i),
+        'url': f'http://test.com/item/{i}',
+        'title': 'Flooding reported downtown',
+        'text': f'Officials say {i} streets are flooded.',
+        'timestamp': '2024-01-01T00:00:00Z'
+    }
+
+
+def fake_verification_workflow():
+    """Module standing in for workflows.verification_workflow, without models."""
+    workflow = types.ModuleType('workflows.verification_workflow')
+
+    async def normalize_node(state):
+        try:
+            state['normalized_item'] = NormalizedItem(**state['raw_item']).model_dump()
+        except Exception as e:
+            state['errors'].append(f"Normalization: {e}")
+        return state
+
+    async def extract_claims_node(state):
+        if state['normalized_item']:
+            item_id = state['normalized_item']['id']
+            state['claims'] = [
+                {'id': f'{item_id}_claim_0', 'text': 'Streets are flooded', 'normalized_item_id': item_id}
+            ]
+        return state
+
+    async def passthrough(state):
+        return state
+
+    async def complete_workflow_node(state):
+        state['status'] = 'completed'
+        return state
+
+    async def check_human_review_needed(state):
+        return 'draft_advisory'
+
+    async def process_batch(items):
+        for item in items:
+            item.entities = [{'text': 'downtown', 'label': 'LOC'}]
+
+    async def assign_topics_batch(items, fit=False):
+        for item in items:
+            item.topics = ['flood']
+
+    async def assess_veracity_batch(claims, batch_size=32):
+        for claim in claims:
+            claim.veracity_likelihood = 0.9
+
+    workflow.normalize_node = normalize_node
+    workflow.extract_claims_node = extract_claims_node
+    workflow.complete_workflow_node = complete_workflow_node
+    workflow.check_human_review_needed = check_human_review_needed
+    for name in (
+        'score_claims_node', 'retrieve_evidence_node', 'calculate_risk_node',
+        'human_review_node', 'draft_advisory_node', 'translate_advisory_node'
+    ):
+        setattr(workflow, name, passthrough)
+    # Per-item nodes used when a batched call fails
+    workflow.extract_entities_node = AsyncMock(
+        side_effect=lambda state: state.update(entities=['per-item'])
+    )
+    workflow.assign_topics_node = AsyncMock(side_effect=passthrough)
+    workflow.assess_veracity_node = AsyncMock(
+        side_effect=lambda state: state.update(
+            veracity_scores={c['id']: 0.1 for c in state['claims']}
+        )
+    )
+    workflow.entity_agent = types.SimpleNamespace(process_batch=AsyncMock(side_effect=process_batch))
+    workflow.topic_agent = types.SimpleNamespace(
+        assign_topics_batch=AsyncMock(side_effect=assign_topics_batch)
+    )
+    workflow.nli_agent = types.SimpleNamespace(
+        assess_veracity_batch=AsyncMock(side_effect=assess_veracity_batch)
+    )
+    return workflow
+
+
+@pytest.fixture
+def batch_executor():
+    """workflows.batch_executor imported against the fake workflow module."""
+    workflow = fake_verification_workflow()
+    with patch.dict(sys.modules, {'workflows.verification_workflow': workflow}):
+        sys.modules.pop('workflows.batch_executor', None)
+        module = importlib.import_module('workflows.batch_executor')
+        with patch.object(module.state_manager, 'save_state', AsyncMock()), \
+                patch.object(module, 'get_workflow_admission', return_value=WorkflowAdmission()):
+            yield module, workflow
+
+
+@pytest.mark.unit
+class TestBatchWorkflowExecutor:
+    """Test suite for running workflows stage by stage."""
+
+    @pytest.mark.asyncio
+    async def test_failing_item_does_not_fail_its_batch(self, batch_executor):
+        """Test an item that cannot be normalized keeps its errors to itself."""
+        module, _ = batch_executor
+        raw_items = [make_raw_item(i) for i in range(3)] + [{'id': 'broken'}]
+
+        states = await module.BatchWorkflowExecutor(batch_size=2).run(raw_items)
+
+        assert [s['raw_item_id'] for s in states] == ['item-0', 'item-1', 'item-2', 'broken']
+        broken = states[-1]
+        assert any(e.startswith('Normalization') for e in broken['errors'])
+        assert broken['veracity_scores'] == {}
+        for state in states[:-1]:
+            assert state['errors'] == []
+            assert state['status'] == 'completed'
+            assert state['entities'] == [{'text': 'downtown', 'label': 'LOC'}]
+            assert state['topics'] == ['flood']
+            assert list(state['veracity_scores'].values()) == [0.9]
+
+    @pytest.mark.asyncio
+    async def test_failed_batched_call_falls_back_per_item(self, batch_executor):
+        """Test a batched model call that raises reruns each item's own node."""
+        module, workflow = batch_executor
+        workflow.entity_agent.process_batch.side_effect = RuntimeError('CUDA out of memory')
+        workflow.nli_agent.assess_veracity_batch.side_effect = RuntimeError('CUDA out of memory')
+
+        states = await module.BatchWorkflowExecutor(batch_size=4).run(
+            [make_raw_item(i) for i in range(3)]
+        )
+
+        assert workflow.extract_entities_node.await_count == 3
+        assert workflow.assess_veracity_node.await_count == 3
+        for state in states:
+            assert state['entities'] == ['per-item']
+            assert list(state['veracity_scores'].values()) == [0.1]
+            assert state['topics'] == ['flood']
+            assert state['status'] == 'completed'
+
+    @pytest.mark.asyncio
+    async def test_stages_are_timed_and_their_errors_counted(self, batch_executor):
+        """Test batched and per-item stages are observed like graph nodes."""
+        module, _ = batch_executor
+        raw_items = [make_raw_item(0), {'id': 'broken'}]
+
+        with patch('services.metrics.crisislen_workflow_node_errors_total') as errors, \
+                patch('services.metrics.crisislen_workflow_node_duration_seconds') as durations:
+            states = await module.BatchWorkflowExecutor(batch_size=2).run(raw_items)
+
+        for state in states:
+            assert set(state['node_timings']) == set(state['completed_nodes'])
+            assert all(seconds >= 0 for seconds in state['node_timings'].values())
+        assert 'extract_entities' in states[0]['node_timings']
+        # Per-item nodes are observed per item, batched stages once per batch
+        observed = [call.kwargs['node'] for call in durations.labels.call_args_list]
+        assert observed.count('normalize') == 2
+        assert observed.count('assess_veracity') == 1
+        errors.labels.assert_any_call(node='normalize')
+        errors.labels.assert_any_call(node='extract_entities')
+
+    @pytest.mark.asyncio
+    async def test_each_batch_holds_one_admission_slot(self, batch_executor):
+        """Test batches wait for admission like single workflows do."""
+        module, _ = batch_executor
+        admission = module.get_workflow_admission()
+        raw_items = [make_raw_item(i) for i in range(5)]
+        active = []
+
+        run_batch = module.BatchWorkflowExecutor._run_batch
+
+        async def record_admission(self, states):
+            active.append(admission.active)
+            await run_batch(self, states)
+
+        with patch.object(admission, 'slot', wraps=admission.slot) as slot, \
+                patch.object(module.BatchWorkflowExecutor, '_run_batch', record_admission):
+            await module.BatchWorkflowExecutor(batch_size=2).run(raw_items)
+
+        assert [call.args[0]['id'] for call in slot.call_args_list] == ['item-0', 'item-2', 'item-4']
+        assert active == [1, 1, 1]
+        assert admission.active == 0
+
+    @pytest.mark.asyncio
+    async def test_workflows_are_queued_until_their_batch_starts(self, batch_executor):
+        """Test later batches stay queued while an earlier batch runs."""
+        module, _ = batch_executor
+        saved = []
+
+        async def save_state(workflow_id, state):
+            saved.append((state['raw_item_id'], state['status']))
+
+        module.state_manager.save_state.side_effect = save_state
+        await module.BatchWorkflowExecutor(batch_size=2).run([make_raw_item(i) for i in range(3)])
+
+        assert saved[:3] == [('item-0', 'queued'), ('item-1', 'queued'), ('item-2', 'queued')]
+        # item-2 is still queued when the first batch starts running
+        assert saved[3:5] == [('item-0', 'running'), ('item-1', 'running')]
+        assert saved[-2:] == [('item-2', 'running'), ('item-2', 'completed')]
+
+    @pytest.mark.asyncio
+    async def test_batched_stage_spans_carry_every_workflow_id(self, batch_executor):
+        """Test a span of a batched stage can be found from any workflow in it."""
+        module, _ = batch_executor
+        spans = {}
+
+        @contextlib.contextmanager
+        def start_as_current_span(name, attributes):
+            spans.setdefault(name, []).append(attributes)
+            yield None
+
+        tracer = types.SimpleNamespace(start_as_current_span=start_as_current_span)
+        with patch.object(instrumentation, '_tracer', return_value=tracer):
+            states = await module.BatchWorkflowExecutor(batch_size=2).run(
+                [make_raw_item(i) for i in range(2)]
+            )
+
+        ids = [state['workflow_id'] for state in states]
+        batched, = spans['workflow.assess_veracity']
+        assert batched['workflow.ids'] == ids
+        assert batched['workflow.batch_size'] == 2
+        assert sorted(span['workflow.id'] for span in spans['workflow.normalize']) == sorted(ids)
+        assert all('workflow.ids' not in span for span in spans['workflow.normalize'])
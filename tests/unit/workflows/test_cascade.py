@@ -0,0 +1,62 @@
+"""
+Unit tests for the checkworthiness-gated cascade.
+"""
+import pytest
+
+from workflows.cascade import gate_claims, should_draft_advisory, split_claims
+
+
+def claims(*ids):
+    return [{'id': claim_id, 'text': f"claim {claim_id}"} for claim_id in ids]
+
+
+@pytest.mark.unit
+class TestCascade:
+    """Test suite for cascade gating decisions."""
+
+    def test_gate_keeps_claims_at_or_above_threshold(self):
+        """Test only checkworthy claims pass and the skipped work is counted."""
+        cascade = gate_claims(claims('a', 'b', 'c'), [0.9, 0.3, 0.5], threshold=0.5)
+
+        assert cascade['checkworthy'] == ['a', 'c']
+        assert cascade['claims'] == 3
+        assert cascade['skipped'] == {'retrieve_evidence': 1, 'assess_veracity': 1}
+
+    def test_disabled_gate_passes_every_claim(self):
+        """Test without cascade mode nothing is skipped."""
+        cascade = gate_claims(claims('a', 'b'), [0.9, 0.1], threshold=0.5, enabled=False)
+
+        assert cascade['checkworthy'] == ['a', 'b']
+        assert cascade['skipped'] == {}
+
+    def test_completed_stages_are_not_counted_as_saved(self):
+        """Test stages reused from the result cache save nothing."""
+        cascade = gate_claims(
+            claims('a', 'b'), [0.9, 0.1], threshold=0.5,
+            completed=['retrieve_evidence', 'assess_veracity']
+        )
+
+        assert cascade['skipped'] == {}
+
+    def test_split_claims_follows_the_decision(self):
+        """Test claims split by the decision, all claims checked without one."""
+        state = {
+            'claims': claims('a', 'b', 'c'),
+            'cascade': gate_claims(claims('a', 'b', 'c'), [0.1, 0.8, 0.2], threshold=0.5),
+        }
+
+        checkworthy, skipped = split_claims(state)
+
+        assert [c['id'] for c in checkworthy] == ['b']
+        assert [c['id'] for c in skipped] == ['a', 'c']
+        assert split_claims({'claims': claims('a')}) == (claims('a'), [])
+
+    def test_advisory_needs_a_checkworthy_claim_or_approval(self):
+        """Test drafting is skipped only when the gate left nothing to check."""
+        gated_out = gate_claims(claims('a'), [0.1], threshold=0.5)
+        disabled = gate_claims(claims('a'), [0.1], threshold=0.5, enabled=False)
+
+        assert not should_draft_advisory({'cascade': gated_out})
+        assert should_draft_advisory({'cascade': gated_out, 'human_review_status': 'approved'})
+        assert should_draft_advisory({'cascade': disabled})
+        assert should_draft_advisory({})
@@ -0,0 +1,183 @@
+"""
+Unit tests for the claim fan-out engine.
+"""
+import asyncio
+
+import pytest
+
+from workflows.fanout import ClaimFanOut, MicroBatcher
+
+
+class FakeClaim:
+    def __init__(self, claim_id, delay=0.0, fail=False):
+        self.id = claim_id
+        self.delay = delay
+        self.fail = fail
+        self.evidence = False
+        self.assessed = False
+
+
+class FakeAgents:
+    """Evidence retrieval and batched NLI that record what they were given."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.batches = []
+
+    async def retrieve(self, claim):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(claim.delay)
+            if claim.fail:
+                raise RuntimeError('search unavailable')
+            claim.evidence = True
+            return claim
+        finally:
+            self.running -= 1
+
+    async def assess_batch(self, claims):
+        self.batches.append([claim.id for claim in claims])
+        for claim in claims:
+            claim.assessed = True
+        return claims
+
+
+@pytest.mark.unit
+class TestMicroBatcher:
+    """Test suite for coalescing concurrent calls."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_a_batch(self):
+        """Test calls in flight together are sent as one batch."""
+        calls = []
+
+        async def double(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, max_batch=10, max_wait_seconds=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+        assert results == [0, 2, 4, 6]
+        assert calls == [[0, 1, 2, 3]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self):
+        """Test a full batch does not wait for the timer."""
+        calls = []
+
+        async def echo(items):
+            calls.append(list(items))
+            return items
+
+        batcher = MicroBatcher(echo, max_batch=2, max_wait_seconds=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), 1
+        )
+
+        assert results == [0, 1, 2, 3]
+        assert calls == [[0, 1], [2, 3]]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_is_dropped_from_batch(self):
+        """Test an item cancelled before its batch is sent is not processed."""
+        calls = []
+
+        async def echo(items):
+            calls.append(list(items))
+            return items
+
+        batcher = MicroBatcher(echo, max_batch=10, max_wait_seconds=0.02)
+        cancelled = asyncio.create_task(batcher.submit('a'))
+        kept = asyncio.create_task(batcher.submit('b'))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await kept == 'b'
+        assert calls == [['b']]
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """Test an exception from the batch is raised in each caller."""
+        async def broken(items):
+            raise ValueError('model crashed')
+
+        batcher = MicroBatcher(broken)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.unit
+class TestClaimFanOut:
+    """Test suite for bounded, cancellable claim processing."""
+
+    @pytest.mark.asyncio
+    async def test_processes_claims_with_bounded_concurrency(self):
+        """Test all claims finish in order without exceeding the cap."""
+        agents = FakeAgents()
+        fanout = ClaimFanOut(
+            agents.retrieve, agents.assess_batch,
+            max_concurrency=3, nli_batch_size=16, nli_max_wait_seconds=0.005
+        )
+        claims = [FakeClaim(f"c{i}", delay=0.01) for i in range(10)]
+
+        result = await fanout.run(claims)
+
+        assert result.complete
+        assert [c.id for c in result.results] == [c.id for c in claims]
+        assert all(c.evidence and c.assessed for c in result.results)
+        assert agents.peak == 3
+        # Claims retrieved together are assessed together
+        assert len(agents.batches) < len(claims)
+
+    @pytest.mark.asyncio
+    async def test_slow_claim_times_out_with_partial_results(self):
+        """Test a claim past its deadline is cancelled and the rest returned."""
+        agents = FakeAgents()
+        fanout = ClaimFanOut(
+            agents.retrieve, agents.assess_batch,
+            claim_timeout_seconds=0.25, nli_max_wait_seconds=0.001
+        )
+        claims = [FakeClaim('fast'), FakeClaim('slow', delay=5), FakeClaim('fast2')]
+
+        result = await asyncio.wait_for(fanout.run(claims), 1)
+
+        assert result.timed_out == [1]
+        assert result.results[1] is None
+        assert [result.results[0].id, result.results[2].id] == ['fast', 'fast2']
+        assert not claims[1].evidence
+        assert agents.running == 0
+
+    @pytest.mark.asyncio
+    async def test_overall_deadline_cancels_queued_claims(self):
+        """Test claims still queued at the overall deadline are cancelled."""
+        agents = FakeAgents()
+        fanout = ClaimFanOut(
+            agents.retrieve, agents.assess_batch,
+            max_concurrency=1, claim_timeout_seconds=1, timeout_seconds=0.1,
+            nli_max_wait_seconds=0.001
+        )
+        claims = [FakeClaim('c0', delay=0.01)] + [FakeClaim(f"c{i}", delay=0.5) for i in range(1, 4)]
+
+        result = await asyncio.wait_for(fanout.run(claims), 1)
+
+        assert result.results[0].id == 'c0'
+        assert result.timed_out == [1, 2, 3]
+        assert agents.running == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_claim_does_not_fail_the_others(self):
+        """Test a failing claim is reported alongside the successful ones."""
+        agents = FakeAgents()
+        fanout = ClaimFanOut(agents.retrieve, agents.assess_batch, nli_max_wait_seconds=0.001)
+
+        result = await fanout.run([FakeClaim('ok'), FakeClaim('bad', fail=True)])
+
+        assert result.results[0].assessed
+        assert result.failed == {1: 'search unavailable'}
+        assert not result.complete
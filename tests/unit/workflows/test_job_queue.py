@@ -0,0 +1,153 @@
+"""
+Unit tests for the workflow job queue and workers.
+"""
+import asyncio
+import sys
+import types
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from workflows.job_queue import WorkflowJobQueue, WorkflowWorker
+
+# Stream idle times are real, so tests wait out a short visibility timeout
+VISIBILITY_SECONDS = 0.2
+
+
+def make_queue(redis, **kwargs):
+    return WorkflowJobQueue(redis_client=redis, visibility_timeout_seconds=VISIBILITY_SECONDS, **kwargs)
+
+
+async def pending_count(redis, queue):
+    return (await redis.xpending(queue.stream, queue.group))['pending']
+
+
+def fake_executor(run=None):
+    """Module standing in for workflows.executor inside workers."""
+    executor = types.SimpleNamespace(
+        run_queued_workflow=AsyncMock(side_effect=run),
+        fail_workflow=AsyncMock()
+    )
+    return patch.dict(sys.modules, {
+        'workflows.executor': types.SimpleNamespace(workflow_executor=executor)
+    }), executor
+
+
+@pytest.mark.unit
+class TestWorkflowJobQueue:
+    """Test suite for claiming, heartbeating and reclaiming jobs."""
+
+    @pytest.mark.asyncio
+    async def test_claim_and_ack(self, fake_text_redis):
+        """Test a queued job is delivered once and dropped when acked."""
+        queue = make_queue(fake_text_redis)
+        await queue.enqueue('wf-1')
+
+        jobs = await queue.claim('worker-a', count=5)
+        assert [(j.workflow_id, j.deliveries) for j in jobs] == [('wf-1', 1)]
+        assert await queue.claim('worker-b', count=5) == []
+
+        await queue.ack(jobs[0])
+        assert await queue.stats() == {'pending': 0, 'lag': 0}
+        assert await fake_text_redis.xlen(queue.stream) == 0
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_keeps_job_visible_to_its_worker(self, fake_text_redis):
+        """Test a heartbeated job is not handed to another worker."""
+        queue = make_queue(fake_text_redis)
+        await queue.enqueue('wf-1')
+        job, = await queue.claim('worker-a')
+
+        await asyncio.sleep(VISIBILITY_SECONDS * 0.6)
+        assert await queue.heartbeat(job, 'worker-a')
+        await asyncio.sleep(VISIBILITY_SECONDS * 0.6)
+
+        assert await queue.claim('worker-b') == []
+
+    @pytest.mark.asyncio
+    async def test_abandoned_job_is_reclaimed(self, fake_text_redis):
+        """Test a job idle past the visibility timeout moves to another worker."""
+        queue = make_queue(fake_text_redis)
+        await queue.enqueue('wf-1')
+        job, = await queue.claim('worker-a')
+
+        await asyncio.sleep(VISIBILITY_SECONDS * 1.2)
+        reclaimed, = await queue.claim('worker-b')
+
+        assert reclaimed.workflow_id == 'wf-1'
+        assert reclaimed.deliveries == 2
+        assert not await queue.heartbeat(job, 'worker-a')
+
+
+@pytest.mark.unit
+class TestWorkflowWorker:
+    """Test suite for workers running queued workflows."""
+
+    @pytest.mark.asyncio
+    async def test_runs_and_acks_jobs(self, fake_text_redis):
+        """Test a worker runs every queued workflow and acknowledges it."""
+        queue = make_queue(fake_text_redis)
+        for i in range(3):
+            await queue.enqueue(f"wf-{i}")
+
+        patcher, executor = fake_executor()
+        worker = WorkflowWorker(queue, concurrency=2, consumer='worker-a', block_ms=1)
+        with patcher:
+            running = asyncio.create_task(worker.run())
+            for _ in range(100):
+                if worker.processed == 3:
+                    break
+                await asyncio.sleep(0.005)
+            worker.stop()
+            await asyncio.wait_for(running, 1)
+
+        ran = sorted(call.args[0] for call in executor.run_queued_workflow.await_args_list)
+        assert ran == ['wf-0', 'wf-1', 'wf-2']
+        assert await pending_count(fake_text_redis, queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_deliveries(self, fake_text_redis):
+        """Test a job redelivered too often fails its workflow instead of running."""
+        queue = make_queue(fake_text_redis, max_deliveries=1)
+        await queue.enqueue('wf-poison')
+        await queue.claim('worker-a')
+        await asyncio.sleep(VISIBILITY_SECONDS * 1.2)
+        job, = await queue.claim('worker-b')
+
+        patcher, executor = fake_executor()
+        with patcher:
+            await WorkflowWorker(queue, consumer='worker-b')._handle(job)
+
+        executor.run_queued_workflow.assert_not_awaited()
+        executor.fail_workflow.assert_awaited_once()
+        assert await pending_count(fake_text_redis, queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_run_leaves_job_pending(self, fake_text_redis):
+        """Test an unexpected failure is retried through the visibility timeout."""
+        queue = make_queue(fake_text_redis)
+        await queue.enqueue('wf-1')
+        job, = await queue.claim('worker-a')
+
+        patcher, executor = fake_executor(run=ConnectionError('redis down'))
+        with patcher:
+            await WorkflowWorker(queue, consumer='worker-a')._handle(job)
+
+        executor.run_queued_workflow.assert_awaited_once_with('wf-1', retry=True)
+        assert await pending_count(fake_text_redis, queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_last_delivery_is_not_retried(self, fake_text_redis):
+        """Test the final delivery runs the workflow without a retry."""
+        queue = make_queue(fake_text_redis, max_deliveries=2)
+        await queue.enqueue('wf-1')
+        await queue.claim('worker-a')
+        await asyncio.sleep(VISIBILITY_SECONDS * 1.2)
+        job, = await queue.claim('worker-b')
+
+        patcher, executor = fake_executor()
+        with patcher:
+            await WorkflowWorker(queue, consumer='worker-b')._handle(job)
+
+        executor.run_queued_workflow.assert_awaited_once_with('wf-1', retry=False)
+        assert await pending_count(fake_text_redis, queue) == 0
@@ -0,0 +1,120 @@
+"""
+Unit tests for the parallel claim processing node.
+"""
+import asyncio
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+
+from workflows import parallel_executor
+from workflows.fanout import ClaimFanOut
+
+
+class FakeAgents:
+    """Evidence retrieval and batched NLI that hang or fail on chosen claims."""
+
+    def __init__(self, hang=(), fail=()):
+        self.hang = set(hang)
+        self.fail = set(fail)
+        self.retrieved = []
+
+    async def retrieve(self, claim):
+        self.retrieved.append(claim.id)
+        if claim.id in self.hang:
+            await asyncio.sleep(10)
+        if claim.id in self.fail:
+            raise RuntimeError('search unavailable')
+        return claim
+
+    async def assess_batch(self, claims, batch_size=16):
+        for claim in claims:
+            claim.veracity_likelihood = 0.9
+        return claims
+
+
+def make_state(claim_ids, checkworthy=None):
+    state = {
+        'claims': [
+            {'id': claim_id, 'text': f'Claim {claim_id}', 'normalized_item_id': 'item-1'}
+            for claim_id in claim_ids
+        ],
+        'veracity_scores': {},
+        'errors': []
+    }
+    if checkworthy is not None:
+        state['cascade'] = {'enabled': True, 'checkworthy': checkworthy}
+    return state
+
+
+def fanout_for(agents):
+    return ClaimFanOut(
+        retrieve=agents.retrieve,
+        assess_batch=agents.assess_batch,
+        claim_timeout_seconds=0.25,
+        timeout_seconds=1.0,
+        nli_max_wait_seconds=0.001
+    )
+
+
+@pytest.mark.unit
+class TestProcessClaimsParallel:
+    """Test suite for the fan-out workflow node."""
+
+    @pytest.mark.asyncio
+    async def test_incomplete_claims_keep_their_data(self):
+        """Test timed-out and failed claims are reported and left unchanged."""
+        agents = FakeAgents(hang={'c2'}, fail={'c3'})
+        state = make_state(['c1', 'c2', 'c3'])
+
+        with patch.object(parallel_executor, 'get_claim_fanout', return_value=fanout_for(agents)):
+            state = await parallel_executor.process_claims_parallel(state)
+
+        assert state['veracity_scores'] == {'c1': 0.9}
+        assert state['claims_incomplete'] == ['c2', 'c3']
+        assert state['errors'] == [
+            'Veracity: claim c2 timed out',
+            'Veracity: claim c3 failed: search unavailable'
+        ]
+        assert state['claims'][0]['veracity_likelihood'] == 0.9
+        assert 'veracity_likelihood' not in state['claims'][1]
+
+    @pytest.mark.asyncio
+    async def test_skipped_claims_get_default_scores(self):
+        """Test claims gated out by the cascade are not processed."""
+        agents = FakeAgents()
+        state = make_state(['c1', 'c2'], checkworthy=['c1'])
+
+        with patch.object(parallel_executor, 'get_claim_fanout', return_value=fanout_for(agents)):
+            state = await parallel_executor.process_claims_parallel(state)
+
+        assert agents.retrieved == ['c1']
+        assert state['veracity_scores'] == {'c1': 0.9, 'c2': 0.5}
+        assert state['claims_incomplete'] == []
+        assert state['errors'] == []
+
+
+@pytest.mark.unit
+class TestGetClaimFanOut:
+    """Test suite for the per-loop fan-out."""
+
+    def test_each_event_loop_gets_its_own_fanout(self):
+        """Test a second asyncio.run does not reuse the first loop's fan-out."""
+        agents = FakeAgents()
+        workflow = types.ModuleType('workflows.verification_workflow')
+        workflow.evidence_agent = types.SimpleNamespace(run=agents.retrieve)
+        workflow.nli_agent = types.SimpleNamespace(assess_veracity_batch=agents.assess_batch)
+
+        async def run():
+            fanout = parallel_executor.get_claim_fanout()
+            assert parallel_executor.get_claim_fanout() is fanout
+            state = await parallel_executor.process_claims_parallel(make_state(['c1', 'c2']))
+            assert state['veracity_scores'] == {'c1': 0.9, 'c2': 0.9}
+            return fanout
+
+        with patch.dict(sys.modules, {'workflows.verification_workflow': workflow}):
+            first = asyncio.run(run())
+            second = asyncio.run(run())
+
+        assert first is not second
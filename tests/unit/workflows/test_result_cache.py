@@ -0,0 +1,94 @@
+"""
+Unit tests for the content-fingerprint result cache.
+"""
+import pytest
+
+from workflows.result_cache import CACHED_NODES, ResultCache, content_fingerprint
+from workflows.state import new_workflow_state
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+
+def finished_state(item_id, title='Bridge collapsed', text='Officials confirm 3 dead.'):
+    state = new_workflow_state(f'wf-{item_id}', {'id': item_id, 'title': title, 'text': text})
+    state.update(
+        entities=[{'text': 'Bridge', 'label': 'FAC'}],
+        claims=[{'id': f'{item_id}_claim_1', 'text': 'Officials confirm 3 dead.',
+                 'normalized_item_id': item_id}],
+        topics=['collapse'],
+        evidence=[{'url': 'http://news.example.com/1'}],
+        veracity_scores={f'{item_id}_claim_1': 0.8},
+        cascade={
+            'enabled': True, 'threshold': 0.5, 'claims': 2,
+            'checkworthy': [f'{item_id}_claim_1'],
+            'skipped': {'retrieve_evidence': 1, 'assess_veracity': 1}
+        },
+        completed_nodes=['normalize', *CACHED_NODES, 'calculate_risk'],
+        risk_score=0.4
+    )
+    return state
+
+
+@pytest.mark.unit
+class TestResultCache:
+    """Test suite for reusing results across duplicate items."""
+
+    def test_fingerprint_ignores_case_whitespace_and_urls(self):
+        """Test reposts with different links and spacing match."""
+        original = {'title': 'Bridge  collapsed', 'text': 'See https://a.example/x  NOW'}
+        repost = {'title': 'bridge collapsed', 'text': 'see\nnow www.b.example/y'}
+
+        assert content_fingerprint(original) == content_fingerprint(repost)
+        assert content_fingerprint(original) != content_fingerprint({'title': 'Bridge open'})
+        assert content_fingerprint({'title': '', 'text': None}) is None
+
+    @pytest.mark.asyncio
+    async def test_hit_reuses_results_under_new_item_ids(self):
+        """Test a duplicate gets the cached results and skips their nodes."""
+        cache = ResultCache(use_redis=False)
+        await cache.store(finished_state('gdelt-1'))
+
+        state = new_workflow_state('wf-2', {
+            'id': 'reddit-9', 'title': 'BRIDGE COLLAPSED', 'text': 'Officials confirm 3 dead. http://x.example'
+        })
+        assert await cache.apply(state)
+
+        assert state['claims'][0]['id'] == 'reddit-9_claim_1'
+        assert state['claims'][0]['normalized_item_id'] == 'reddit-9'
+        assert state['veracity_scores'] == {'reddit-9_claim_1': 0.8}
+        assert state['cascade']['checkworthy'] == ['reddit-9_claim_1']
+        assert set(state['completed_nodes']) == set(CACHED_NODES)
+        assert 'score_claims' in state['completed_nodes']
+        # Source-specific results are computed again
+        assert state['risk_score'] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_failed_or_reused_results_are_not_cached(self):
+        """Test only clean, freshly computed results are stored."""
+        cache = ResultCache(use_redis=False)
+        failed = finished_state('gdelt-1')
+        failed['errors'] = ['Claims: model unavailable']
+        await cache.store(failed)
+
+        assert not await cache.apply(new_workflow_state('wf-2', dict(failed['raw_item'])))
+
+    @pytest.mark.asyncio
+    async def test_eviction_ttl_and_redis_errors(self):
+        """Test the LRU is bounded, TTL 0 disables and Redis errors are misses."""
+        cache = ResultCache(redis_client=BrokenRedis(), max_entries=1)
+        first, second = finished_state('a', title='first'), finished_state('b', title='second')
+        await cache.store(first)
+        await cache.store(second)
+
+        assert not await cache.apply(new_workflow_state('wf', dict(first['raw_item'])))
+        assert await cache.apply(new_workflow_state('wf', dict(second['raw_item'])))
+
+        disabled = ResultCache(use_redis=False, ttl_seconds=0)
+        await disabled.store(finished_state('a'))
+        assert not await disabled.apply(new_workflow_state('wf', finished_state('a')['raw_item']))
@@ -0,0 +1,216 @@
+"""
+Unit tests for hash-based workflow state persistence.
+"""
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from workflows import state_manager as state_manager_module
+from workflows.state_manager import (
+    JSON_FIELD,
+    PENDING_REVIEW,
+    StateManager,
+    decode_field,
+    encode_field
+)
+
+
+def make_state(workflow_id='wf-1', minute=0):
+    return {
+        'workflow_id': workflow_id,
+        'raw_item': {'id': 'item-1', 'text': 'river flooding downtown ' * 200},
+        'claims': [],
+        'errors': [],
+        'status': 'running',
+        'started_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow().replace(minute=minute, second=0, microsecond=0),
+    }
+
+
+@pytest.mark.unit
+class TestStateManager:
+    """Test suite for delta state persistence."""
+
+    def test_large_fields_are_compressed(self):
+        """Test small values stay JSON and large ones are compressed."""
+        small = encode_field({'status': 'running'})
+        large = encode_field({'text': 'flood ' * 1000})
+
+        assert small.startswith(JSON_FIELD)
+        assert not large.startswith(JSON_FIELD)
+        assert len(large) < 1000
+        assert decode_field(large) == {'text': 'flood ' * 1000}
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, fake_redis):
+        """Test a saved state loads back with its datetimes."""
+        manager = StateManager(redis_client=fake_redis)
+        state = make_state()
+
+        await manager.save_state('wf-1', state)
+
+        assert await manager.load_state('wf-1') == state
+
+    @pytest.mark.asyncio
+    async def test_saves_only_changed_fields(self, fake_redis):
+        """Test later saves write the changed fields and drop removed ones."""
+        manager = StateManager(redis_client=fake_redis)
+        state = make_state()
+        await manager.save_state('wf-1', state)
+        full_bytes = manager.bytes_written
+        # An unchanged field rewritten by the save would lose this marker
+        await fake_redis.hset('workflow:state:wf-1', 'errors', encode_field(['marker']))
+
+        state['status'] = 'paused'
+        state['updated_at'] = datetime(2024, 1, 1, 13)
+        del state['claims']
+        await manager.save_state('wf-1', state)
+
+        assert manager.bytes_written - full_bytes < 100
+        loaded = await StateManager(redis_client=fake_redis).load_state('wf-1')
+        assert loaded['status'] == 'paused'
+        assert loaded['errors'] == ['marker']
+        assert 'claims' not in loaded
+
+    @pytest.mark.asyncio
+    async def test_default_client_comes_from_redis_service(self, fake_redis):
+        """Test a manager without a client connects through redis_service."""
+        from services import redis_service as redis_module
+
+        with patch.object(redis_module.redis, 'from_url', AsyncMock(return_value=fake_redis)), \
+                patch.object(redis_module.redis_service, 'binary_redis', None):
+            manager = StateManager()
+            state = make_state()
+            await manager.save_state('wf-1', state)
+
+            assert await manager.load_state('wf-1') == state
+            assert await manager.list_workflows() == (['wf-1'], None)
+
+    @pytest.mark.asyncio
+    async def test_unseen_workflow_is_rewritten_in_full(self, fake_redis):
+        """Test a manager without history replaces the whole hash."""
+        await StateManager(redis_client=fake_redis).save_state('wf-1', make_state())
+
+        state = make_state()
+        del state['claims']
+        await StateManager(redis_client=fake_redis).save_state('wf-1', state)
+
+        assert not await fake_redis.hexists('workflow:state:wf-1', 'claims')
+
+
+@pytest.mark.unit
+class TestWorkflowIndexes:
+    """Test suite for status indexes and listing."""
+
+    @pytest.mark.asyncio
+    async def test_status_changes_move_workflows_between_indexes(self, fake_redis):
+        """Test each workflow is listed under its current status only."""
+        manager = StateManager(redis_client=fake_redis)
+        state = make_state()
+        await manager.save_state('wf-1', state)
+
+        state['status'] = 'completed'
+        await manager.save_state('wf-1', state)
+
+        assert await manager.list_workflows('completed') == (['wf-1'], None)
+        assert await manager.list_workflows('running') == ([], None)
+        counts = await manager.count_by_status()
+        assert counts['completed'] == 1
+        assert counts['running'] == 0
+
+        await manager.delete_state('wf-1')
+        assert await manager.count_workflows() == 0
+
+    @pytest.mark.asyncio
+    async def test_pages_newest_first(self, fake_redis):
+        """Test listing pages through workflows by updated_at."""
+        manager = StateManager(redis_client=fake_redis)
+        for i in range(5):
+            await manager.save_state(f'wf-{i}', make_state(f'wf-{i}', minute=i))
+
+        first, cursor = await manager.list_workflows('running', limit=2)
+        second, cursor = await manager.list_workflows('running', cursor=cursor, limit=2)
+        last, end = await manager.list_workflows('running', cursor=cursor, limit=2)
+
+        assert first + second + last == ['wf-4', 'wf-3', 'wf-2', 'wf-1', 'wf-0']
+        assert end is None
+        assert await manager.count_workflows('running') == 5
+
+    @pytest.mark.asyncio
+    async def test_rescored_workflows_are_not_skipped_or_repeated(self, fake_redis):
+        """Test workflows updated between pages do not shift later pages."""
+        manager = StateManager(redis_client=fake_redis)
+        for i in range(5):
+            await manager.save_state(f'wf-{i}', make_state(f'wf-{i}', minute=i))
+
+        first, cursor = await manager.list_workflows(limit=2)
+        # wf-1 is updated and moves ahead of the page already listed
+        await manager.save_state('wf-1', make_state('wf-1', minute=30))
+        rest, end = await manager.list_workflows(cursor=cursor, limit=5)
+
+        assert first == ['wf-4', 'wf-3']
+        assert rest == ['wf-2', 'wf-0']
+        assert end is None
+
+    @pytest.mark.asyncio
+    async def test_ties_page_by_id(self, fake_redis):
+        """Test workflows updated at the same time are each listed once."""
+        manager = StateManager(redis_client=fake_redis)
+        for workflow_id in ['a', 'b', 'c', 'd']:
+            await manager.save_state(workflow_id, make_state(workflow_id))
+
+        listed, cursor = [], None
+        while True:
+            page, cursor = await manager.list_workflows(cursor=cursor, limit=1)
+            listed += page
+            if cursor is None:
+                break
+
+        assert listed == ['d', 'c', 'b', 'a']
+        with pytest.raises(ValueError):
+            await manager.list_workflows(cursor='not-a-cursor')
+
+    @pytest.mark.asyncio
+    async def test_expired_workflows_are_not_listed_or_counted(self, fake_redis):
+        """Test states past their TTL drop out of every index without new saves."""
+        manager = StateManager(redis_client=fake_redis, ttl_seconds=3600)
+        state = make_state('stale')
+        state.update(
+            status='paused', needs_human_review=True,
+            human_review_status='pending', risk_score=0.9
+        )
+        await manager.save_state('stale', state)
+        await manager.save_state('fresh', make_state('fresh'))
+        assert await manager.count_workflows(PENDING_REVIEW) == 1
+
+        later = state_manager_module.time.time() + 2 * 3600
+        with patch.object(state_manager_module.time, 'time', return_value=later):
+            assert await manager.count_workflows() == 0
+            assert await manager.list_workflows('running') == ([], None)
+            # The review queue is scored by risk, so it relies on pruning
+            await manager.prune_expired()
+            assert (await manager.count_by_status())[PENDING_REVIEW] == 0
+
+        assert await fake_redis.zcard(state_manager_module.ALL_INDEX) == 0
+
+    @pytest.mark.asyncio
+    async def test_review_queue_is_ordered_by_risk(self, fake_redis):
+        """Test paused workflows awaiting review are listed highest risk first."""
+        manager = StateManager(redis_client=fake_redis)
+        for workflow_id, risk in [('low', 0.75), ('high', 0.95)]:
+            state = make_state(workflow_id)
+            state.update(
+                status='paused', needs_human_review=True,
+                human_review_status='pending', risk_score=risk
+            )
+            await manager.save_state(workflow_id, state)
+
+        assert (await manager.list_workflows(PENDING_REVIEW))[0] == ['high', 'low']
+
+        state = await manager.load_state('high')
+        state.update(status='running', human_review_status='approved')
+        await manager.save_state('high', state)
+
+        assert (await manager.list_workflows(PENDING_REVIEW))[0] == ['low']
+        assert await manager.load_fields('low', ['risk_score', 'missing']) == {'risk_score': 0.75}
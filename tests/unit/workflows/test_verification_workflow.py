@@ -0,0 +1,209 @@
+"""
+Unit tests for entering and resuming the verification workflow graph.
+"""
+import contextlib
+import importlib
+import sys
+import types
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from schemas.advisory import Advisory
+from schemas.item import NormalizedItem
+from workflows.state import new_workflow_state
+
+# Agent modules the workflow builds its agents from, and their classes
+AGENT_MODULES = {
+    'agents.ingestion.normalization': 'NormalizationService',
+    'agents.digestion.entity_extraction': 'EntityExtractionAgent',
+    'agents.digestion.claim_extraction': 'ClaimExtractionAgent',
+    'agents.digestion.checkworthiness': 'CheckworthinessAgent',
+    'agents.digestion.topic_assignment': 'TopicAssignmentAgent',
+    'agents.digestion.evidence_retrieval': 'EvidenceRetrievalAgent',
+    'agents.digestion.nli_veracity': 'NliVeracityAgent',
+    'agents.scoring.risk_scoring': 'RiskScoringAgent',
+    'agents.publishing.advisory_drafting': 'AdvisoryDraftingAgent',
+    'agents.publishing.translation': 'AdvisoryTranslationAgent',
+}
+
+ANALYSIS = [
+    'normalize', 'extract_entities', 'extract_claims', 'score_claims',
+    'assign_topics', 'retrieve_evidence', 'assess_veracity', 'calculate_risk'
+]
+
+
+@pytest.fixture
+def workflow():
+    """Verification workflow and executor modules built on mock agents."""
+    fakes = {}
+    for name, cls in AGENT_MODULES.items():
+        fakes[name] = types.ModuleType(name)
+        setattr(fakes[name], cls, MagicMock)
+
+    with patch.dict(sys.modules, fakes):
+        for name in ('workflows.verification_workflow', 'workflows.batch_executor', 'workflows.executor'):
+            sys.modules.pop(name, None)
+        executor = importlib.import_module('workflows.executor')
+        yield sys.modules['workflows.verification_workflow'], executor
+
+
+def paused_state(decision=None):
+    """State of a workflow waiting for human review."""
+    raw_item = {
+        'id': 'item-1',
+        'source': 'test',
+        'source_id': '1',
+        'url': 'http://test.com/item/1',
+        'title': 'Bridge collapsed',
+        'text': 'Officials say the bridge collapsed.',
+        'timestamp': '2024-01-01T00:00:00Z'
+    }
+    state = new_workflow_state('wf-1', raw_item)
+    state.update(
+        normalized_item=NormalizedItem(**raw_item).model_dump(),
+        completed_nodes=ANALYSIS + ['human_review'],
+        needs_human_review=True,
+        human_review_status=decision or 'pending',
+        status='paused'
+    )
+    return state
+
+
+@pytest.mark.unit
+class TestRouteEntry:
+    """Test suite for picking where a run enters the graph."""
+
+    def test_new_workflow_starts_at_normalization(self, workflow):
+        """Test a workflow without review starts from the first node."""
+        verification, _ = workflow
+        state = paused_state()
+        state['completed_nodes'] = ['normalize']
+
+        assert verification.route_entry(state) == 'normalize'
+
+    def test_approved_workflow_resumes_after_review(self, workflow):
+        """Test an approved workflow enters at the first unfinished publishing node."""
+        verification, _ = workflow
+        state = paused_state('approved')
+        assert verification.route_entry(state) == 'draft_advisory'
+
+        state['completed_nodes'].append('draft_advisory')
+        assert verification.route_entry(state) == 'translate_advisory'
+
+    def test_rejected_workflow_completes(self, workflow):
+        """Test a rejected workflow skips the advisory."""
+        verification, _ = workflow
+        assert verification.route_entry(paused_state('rejected')) == 'complete'
+
+
+@pytest.mark.unit
+class TestResumeWorkflow:
+    """Test suite for resuming workflows after human review."""
+
+    async def resume(self, workflow, decision):
+        verification, executor = workflow
+        advisory = Advisory(
+            id='adv-1', claim_id='item-1', title='Bridge collapsed', summary='s',
+            narrative_what_happened='w', narrative_verified='v', narrative_action='a'
+        )
+        verification.advisory_agent.run = AsyncMock(return_value=advisory)
+        verification.translation_agent.run = AsyncMock(
+            return_value=types.SimpleNamespace(translations={'es': {'title': 'Puente'}})
+        )
+        verification.normalization_service.normalize = AsyncMock()
+        save_state = AsyncMock()
+
+        with patch.object(executor.state_manager, 'load_state', AsyncMock(return_value=paused_state())), \
+             patch.object(executor.state_manager, 'save_state', save_state):
+            await executor.WorkflowExecutor.resume_workflow('wf-1', decision)
+
+        # Analysis is never rerun
+        verification.normalization_service.normalize.assert_not_awaited()
+        return verification, save_state.await_args_list[-1].args[1]
+
+    @pytest.mark.asyncio
+    async def test_approved_workflow_drafts_advisory(self, workflow):
+        """Test approval runs drafting, translation and completion."""
+        verification, final = await self.resume(workflow, 'approved')
+
+        verification.advisory_agent.run.assert_awaited_once()
+        assert final['status'] == 'completed'
+        assert final['advisory_draft']['id'] == 'adv-1'
+        assert final['advisory_translations'] == {'es': {'title': 'Puente'}}
+        assert final['completed_nodes'][-3:] == ['draft_advisory', 'translate_advisory', 'complete']
+
+    @pytest.mark.asyncio
+    async def test_rejected_workflow_completes_without_advisory(self, workflow):
+        """Test rejection completes the workflow without drafting."""
+        verification, final = await self.resume(workflow, 'rejected')
+
+        verification.advisory_agent.run.assert_not_awaited()
+        assert final['status'] == 'completed'
+        assert final['human_review_status'] == 'rejected'
+        assert not final.get('advisory_draft')
+        assert 'draft_advisory' not in final['completed_nodes']
+        assert final['completed_nodes'][-1] == 'complete'
+
+
+@pytest.mark.unit
+class TestRunQueuedWorkflow:
+    """Test suite for running queued workflows in workers."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('retry,status', [(True, 'retrying'), (False, 'failed')])
+    async def test_failed_run_is_retried_until_the_last_delivery(self, workflow, retry, status):
+        """Test a failing run is left to redelivery, except on its last delivery."""
+        _, executor = workflow
+        state = paused_state()
+        state.update(status='queued', completed_nodes=[])
+        saved = []
+        admission = types.SimpleNamespace(slot=lambda raw_item: contextlib.nullcontext())
+
+        with patch.object(executor, 'get_workflow_admission', return_value=admission), \
+             patch.object(executor.state_manager, 'load_state', AsyncMock(side_effect=lambda _: dict(state))), \
+             patch.object(executor.state_manager, 'save_state', AsyncMock(side_effect=lambda _, s: saved.append(dict(s)))), \
+             patch.object(executor.WorkflowExecutor, '_run_graph', AsyncMock(side_effect=ConnectionError('redis down'))):
+            if retry:
+                with pytest.raises(ConnectionError):
+                    await executor.WorkflowExecutor.run_queued_workflow('wf-1', retry=True)
+            else:
+                await executor.WorkflowExecutor.run_queued_workflow('wf-1')
+
+        assert saved[-1]['status'] == status
+        assert saved[-1]['errors'][-1] == 'redis down'
+
+    @pytest.mark.asyncio
+    async def test_expired_workflow_is_not_run(self, workflow):
+        """Test a job whose state expired is dropped without raising."""
+        _, executor = workflow
+        missing = AsyncMock(side_effect=ValueError('Workflow state not found: wf-1'))
+
+        with patch.object(executor.state_manager, 'load_state', missing):
+            assert await executor.WorkflowExecutor.run_queued_workflow('wf-1') is None
+
+
+@pytest.mark.unit
+class TestScoreClaimsNode:
+    """Test suite for the cascade gate node."""
+
+    @pytest.mark.asyncio
+    async def test_reused_results_do_not_count_as_cascade_savings(self, workflow):
+        """Test only workflows that ran the gated stages themselves record the cascade."""
+        verification, _ = workflow
+        verification.checkworthiness_agent.process_claims = AsyncMock()
+        verification.checkworthiness_agent.gate_score = MagicMock(return_value=0.0)
+
+        recorded = []
+        with patch.object(verification, 'record_cascade', recorded.append):
+            for cache_hit in (None, 'fingerprint'):
+                state = paused_state()
+                state.update(
+                    claims=[{'id': 'item-1_claim_0', 'text': 'c', 'normalized_item_id': 'item-1'}],
+                    completed_nodes=[],
+                    result_cache_hit=cache_hit
+                )
+                await verification.score_claims_node(state)
+                assert state['cascade']['claims'] == 1
+
+        assert len(recorded) == 1
@@ -0,0 +1,177 @@
+"""
+Unit tests for dependency-driven workflow wiring.
+"""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from workflows.dag import NodeSpec, add_dag, build_dependencies, parallel_stages, partial_update
+from workflows.state import latest, merge_dicts
+
+
+async def noop(state):
+    return state
+
+
+def spec(name, reads=(), writes=()):
+    return NodeSpec(name, noop, reads=set(reads), writes=set(writes))
+
+
+ANALYSIS = [
+    spec('normalize', reads={'raw_item'}, writes={'normalized_item'}),
+    spec('extract_entities', reads={'normalized_item'}, writes={'entities'}),
+    spec('extract_claims', reads={'normalized_item'}, writes={'claims'}),
+    spec('assign_topics', reads={'normalized_item'}, writes={'topics'}),
+    spec('retrieve_evidence', reads={'claims'}, writes={'evidence'}),
+    spec('assess_veracity', reads={'claims'}, writes={'veracity_scores'}),
+    spec('calculate_risk', reads={'normalized_item'}, writes={'risk_score'}),
+]
+
+
+class RecordingGraph:
+    """Records the StateGraph calls made by add_dag."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.edges = []
+
+    def add_node(self, name, fn):
+        self.nodes[name] = fn
+
+    def add_edge(self, source, target):
+        self.edges.append((source, target))
+
+
+@pytest.mark.unit
+class TestDagBuilder:
+    """Test suite for deriving edges from read/write sets."""
+
+    def test_independent_nodes_fan_out_and_join(self):
+        """Test nodes reading only normalized_item share a step."""
+        assert parallel_stages(ANALYSIS) == [
+            ['normalize'],
+            ['extract_entities', 'extract_claims', 'assign_topics'],
+            ['retrieve_evidence', 'assess_veracity'],
+            ['calculate_risk'],
+        ]
+
+        depends = build_dependencies(ANALYSIS)
+        assert depends['extract_claims'] == {'normalize'}
+        assert depends['calculate_risk'] == {
+            'extract_entities', 'assign_topics', 'retrieve_evidence', 'assess_veracity'
+        }
+
+    def test_conflicting_writes_are_ordered(self):
+        """Test nodes writing or overwriting the same key never run together."""
+        specs = [
+            spec('a', writes={'x'}),
+            spec('b', reads={'x'}, writes={'y'}),
+            spec('c', writes={'x'}),
+            spec('d', reads={'x', 'y'}),
+        ]
+
+        depends = build_dependencies(specs)
+
+        assert depends['c'] == {'b'}
+        assert depends['d'] == {'c'}
+        assert parallel_stages(specs) == [['a'], ['b'], ['c'], ['d']]
+
+    def test_add_dag_wires_fan_in_as_one_edge(self):
+        """Test a node with several predecessors waits for all of them."""
+        graph = RecordingGraph()
+
+        entry, exit_node = add_dag(graph, ANALYSIS)
+
+        assert (entry, exit_node) == ('normalize', 'calculate_risk')
+        assert set(graph.nodes) == {s.name for s in ANALYSIS}
+        assert ('normalize', 'extract_claims') in graph.edges
+        assert (
+            ['extract_entities', 'assign_topics', 'retrieve_evidence', 'assess_veracity'],
+            'calculate_risk'
+        ) in graph.edges
+
+    def test_rejects_invalid_specs(self):
+        """Test merged keys and multiple roots are rejected."""
+        with pytest.raises(ValueError):
+            spec('a', writes={'errors'})
+        with pytest.raises(ValueError):
+            add_dag(RecordingGraph(), [
+                spec('a', writes={'x'}),
+                spec('b', writes={'y'}),
+                spec('c', reads={'x', 'y'})
+            ])
+
+
+@pytest.mark.unit
+class TestPartialUpdate:
+    """Test suite for node update merging."""
+
+    @pytest.mark.asyncio
+    async def test_returns_only_declared_writes_and_new_errors(self):
+        """Test a mutating node is reduced to its own updates and checkpoint."""
+        async def node(state):
+            state['claims'] = ['c1']
+            state['entities'] = ['not declared']
+            state['errors'].append('Claims: boom')
+            state['updated_at'] = datetime(2024, 1, 1, 12)
+            return state
+
+        state = {'errors': ['Normalization: earlier'], 'normalized_item': {}}
+        update = await partial_update(NodeSpec('extract_claims', node, writes={'claims'}))(state)
+
+        assert update.pop('node_timings')['extract_claims'] >= 0
+        assert update == {
+            'claims': ['c1'],
+            'errors': ['Claims: boom'],
+            'completed_nodes': ['extract_claims'],
+            'updated_at': datetime(2024, 1, 1, 12)
+        }
+        assert state['errors'] == ['Normalization: earlier']
+
+    @pytest.mark.asyncio
+    async def test_skips_completed_nodes(self):
+        """Test a node prefilled or resumed past is not run again."""
+        async def node(state):
+            raise AssertionError("should not run")
+
+        wrapped = partial_update(NodeSpec('extract_claims', node, writes={'claims'}))
+
+        assert await wrapped({'completed_nodes': ['extract_claims'], 'errors': []}) == {}
+
+    @pytest.mark.asyncio
+    async def test_counts_recorded_and_raised_errors_per_node(self):
+        """Test node errors are counted whether recorded in state or raised."""
+        async def recording(state):
+            state['errors'].append('Topics: model missing')
+            return state
+
+        async def raising(state):
+            raise RuntimeError('boom')
+
+        with patch('services.metrics.crisislen_workflow_node_errors_total') as errors, \
+                patch('services.metrics.crisislen_workflow_node_duration_seconds') as durations:
+            await partial_update(NodeSpec('assign_topics', recording))({'errors': []})
+            with pytest.raises(RuntimeError):
+                await partial_update(NodeSpec('calculate_risk', raising))({'errors': []})
+
+        errors.labels.assert_any_call(node='assign_topics')
+        errors.labels.assert_any_call(node='calculate_risk')
+        assert errors.labels.return_value.inc.call_count == 2
+        assert durations.labels.return_value.observe.call_count == 2
+
+    def test_merge_dicts_reducer(self):
+        """Test concurrent node timings are combined."""
+        assert merge_dicts({'normalize': 0.1}, {'assign_topics': 0.2}) == {
+            'normalize': 0.1, 'assign_topics': 0.2
+        }
+        assert merge_dicts(None, {'normalize': 0.1}) == {'normalize': 0.1}
+
+    def test_latest_reducer(self):
+        """Test concurrent timestamps merge to the newest one."""
+        early, late = datetime(2024, 1, 1), datetime(2024, 1, 2)
+
+        assert latest(early, late) == late
+        assert latest(late, early) == late
+        assert latest(None, early) == early
+        assert latest(early, None) == early
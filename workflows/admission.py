@@ -0,0 +1,251 @@
+"""
+Admission control for verification workflows.
+
+Workflows run CPU-bound models, so running too many at once oversubscribes
+the CPU and running them unbounded starves everything. WorkflowAdmission
+caps how many run at once, caps each source separately, and queues the
+rest by priority:
+
+- sources with higher reliability come first;
+- items with early risk signals (crisis keywords, or a burst of items
+  sharing a keyword or content fingerprint) jump the queue;
+- waiting items slowly gain priority, so low-priority items still run.
+
+Queue depth and admission wait time are exported as metrics.
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+from config import settings
+from workflows.result_cache import content_fingerprint, normalize_content
+
+DEFAULT_RELIABILITY = 0.5
+KEYWORD_BOOST = 0.5  # items mentioning a crisis keyword
+BURST_BOOST = 0.5  # items whose keyword or content is bursting
+BURST_WINDOW_SECONDS = 300.0
+BURST_THRESHOLD = 5  # arrivals within the window that make a burst
+
+
+class BurstTracker:
+    """Counts recent arrivals per signal in a sliding window."""
+
+    def __init__(self, window_seconds: float = BURST_WINDOW_SECONDS, threshold: int = BURST_THRESHOLD):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self._arrivals: Dict[str, Deque[float]] = {}
+
+    def record(self, signals: Iterable[str], now: Optional[float] = None) -> bool:
+        """
+        Record an arrival carrying the given signals.
+
+        Returns:
+            Whether any of the signals is bursting
+        """
+        now = time.monotonic() if now is None else now
+        horizon = now - self.window_seconds
+        bursting = False
+        for signal in signals:
+            arrivals = self._arrivals.setdefault(signal, deque())
+            while arrivals and arrivals[0] < horizon:
+                arrivals.popleft()
+            arrivals.append(now)
+            bursting = bursting or len(arrivals) >= self.threshold
+
+        # Forget signals that went quiet
+        for signal in [s for s, a in self._arrivals.items() if a[-1] < horizon]:
+            del self._arrivals[signal]
+        return bursting
+
+
+class WorkflowAdmission:
+    """Concurrency cap, per-source quotas and a priority queue for workflows."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        default_source_quota: int = 6,
+        source_quotas: Optional[Dict[str, int]] = None,
+        source_reliability: Optional[Dict[str, float]] = None,
+        keywords: Iterable[str] = (),
+        aging_per_second: float = 0.01,
+        burst_tracker: Optional[BurstTracker] = None
+    ):
+        """
+        Initialize admission control.
+
+        Args:
+            max_concurrency: Workflows running at once
+            default_source_quota: Workflows running at once per source
+            source_quotas: Per-source overrides of the quota
+            source_reliability: Source -> reliability in [0, 1]
+            keywords: Crisis keywords that raise an item's priority
+            aging_per_second: Priority a waiting item gains per second
+            burst_tracker: Tracker of bursting keywords and fingerprints
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_source_quota = max(1, default_source_quota)
+        self.source_quotas = dict(source_quotas or {})
+        self.source_reliability = dict(source_reliability or {})
+        self.keywords = [k.lower() for k in keywords]
+        self.aging_per_second = aging_per_second
+        self.bursts = burst_tracker or BurstTracker()
+
+        self._active = 0
+        self._active_by_source: Dict[str, int] = {}
+        # source -> heap of (sort key, sequence, waiter)
+        self._queues: Dict[str, List[Tuple[float, int, asyncio.Future]]] = {}
+        self._sequence = itertools.count()
+
+    def quota(self, source: str) -> int:
+        return max(1, self.source_quotas.get(source, self.default_source_quota))
+
+    def priority(self, raw_item: Dict[str, Any]) -> float:
+        """
+        Priority of an item from its source and early risk signals.
+
+        Also records the item's signals for burst detection, so call it
+        once per arriving item.
+        """
+        score = self.source_reliability.get(raw_item.get('source'), DEFAULT_RELIABILITY)
+
+        content = normalize_content(f"{raw_item.get('title') or ''} {raw_item.get('text') or ''}")
+        hits = [k for k in self.keywords if k in content]
+        if hits:
+            score += KEYWORD_BOOST
+
+        signals = [f"keyword:{k}" for k in hits]
+        fingerprint = content_fingerprint(raw_item)
+        if fingerprint:
+            signals.append(f"content:{fingerprint}")
+        if self.bursts.record(signals):
+            score += BURST_BOOST
+
+        return score
+
+    def _can_run(self, source: str) -> bool:
+        return (
+            self._active < self.max_concurrency
+            and self._active_by_source.get(source, 0) < self.quota(source)
+        )
+
+    def _start(self, source: str):
+        self._active += 1
+        self._active_by_source[source] = self._active_by_source.get(source, 0) + 1
+
+    def _grant(self):
+        """Admit the best waiters whose source is under its quota."""
+        while self._active < self.max_concurrency:
+            heads = [
+                (queue[0], source) for source, queue in self._queues.items()
+                if queue and self._can_run(source)
+            ]
+            if not heads:
+                return
+            _, source = min(heads)
+            _, _, waiter = heapq.heappop(self._queues[source])
+            if waiter.done():
+                continue  # Cancelled while waiting
+            self._start(source)
+            waiter.set_result(None)
+
+    async def acquire(self, raw_item: Dict[str, Any]) -> str:
+        """
+        Wait until the item's workflow may run.
+
+        Returns:
+            The source whose quota the workflow holds; pass it to release()
+        """
+        from services.metrics import (
+            crisislen_workflow_admission_wait_seconds,
+            crisislen_workflows_active
+        )
+
+        source = raw_item.get('source') or 'unknown'
+        priority = self.priority(raw_item)
+        started = time.monotonic()
+
+        if self._can_run(source) and not any(self._queues.values()):
+            self._start(source)
+        else:
+            # Aging: a higher key for items queued earlier; heapq pops lowest
+            key = -(priority - self.aging_per_second * started)
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queues.setdefault(source, []), (key, next(self._sequence), waiter))
+            self._update_depth(source)
+            try:
+                self._grant()
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Admitted just before the cancellation landed
+                    self.release(source)
+                raise
+            finally:
+                self._update_depth(source)
+
+        crisislen_workflow_admission_wait_seconds.labels(source=source).observe(
+            time.monotonic() - started
+        )
+        crisislen_workflows_active.set(self._active)
+        return source
+
+    def release(self, source: str):
+        """Free the slot of a finished workflow."""
+        from services.metrics import crisislen_workflows_active
+
+        self._active -= 1
+        self._active_by_source[source] -= 1
+        if not self._active_by_source[source]:
+            del self._active_by_source[source]
+        self._grant()
+        crisislen_workflows_active.set(self._active)
+        for queued_source in self._queues:
+            self._update_depth(queued_source)
+
+    def _update_depth(self, source: str):
+        from services.metrics import crisislen_workflow_queue_depth
+
+        crisislen_workflow_queue_depth.labels(source=source).set(self.queued().get(source, 0))
+
+    @asynccontextmanager
+    async def slot(self, raw_item: Dict[str, Any]) -> AsyncIterator[None]:
+        """Hold an admission slot for the duration of the block."""
+        source = await self.acquire(raw_item)
+        try:
+            yield
+        finally:
+            self.release(source)
+
+    @property
+    def active(self) -> int:
+        """Workflows currently admitted."""
+        return self._active
+
+    def queued(self) -> Dict[str, int]:
+        """Waiting workflows per source."""
+        return {
+            source: sum(1 for _, _, waiter in queue if not waiter.done())
+            for source, queue in self._queues.items()
+        }
+
+
+@lru_cache(maxsize=1)
+def get_workflow_admission() -> WorkflowAdmission:
+    """Get singleton admission control configured from settings."""
+    from agents.digestion.claim_extraction import CLAIM_KEYWORDS
+    from agents.digestion.source_reliability import SOURCE_RELIABILITY
+
+    return WorkflowAdmission(
+        max_concurrency=settings.WORKFLOW_MAX_CONCURRENCY,
+        default_source_quota=settings.WORKFLOW_DEFAULT_SOURCE_QUOTA,
+        source_quotas=settings.WORKFLOW_SOURCE_QUOTAS,
+        source_reliability=SOURCE_RELIABILITY,
+        keywords=CLAIM_KEYWORDS,
+        aging_per_second=settings.WORKFLOW_PRIORITY_AGING
+    )
@@ -0,0 +1,271 @@
+"""
+Micro-batched execution of the verification workflow.
+
+The LangGraph workflow runs one item at a time, so every model sees batch
+size 1. BatchWorkflowExecutor runs many workflows stage by stage instead:
+all items are normalized, then entities are extracted for all of them with
+one nlp.pipe pass, topics are assigned from one embedding batch, NLI scores
+every claim/evidence pair in batched forward passes, and so on.
+
+Each item keeps its own state. Stages without a batched model call reuse
+the workflow's node functions, which record failures in that item's
+errors. A batched call that fails falls back to the per-item node, so one
+bad item never fails the rest of its batch.
+
+Each batch holds one admission slot while it runs, so batched runs count
+against the same concurrency cap as single workflows. A batch is a single
+CPU-bound workload however many items it carries; taking a slot per item
+would also deadlock once a batch is larger than the cap.
+
+Stages are observed like graph nodes: per-item nodes are timed for each
+item, and a batched stage is timed once, its duration recorded in the
+node_timings of every item in the batch and its span tagged with every
+item's workflow ID.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+import asyncio
+import uuid
+
+from config import settings
+from services.observability import observability_service
+from workflows.admission import get_workflow_admission
+from workflows.cascade import split_claims
+from workflows.instrumentation import NodeTiming, observe_node
+from workflows.state import WorkflowState, new_workflow_state
+from workflows.state_manager import state_manager
+from workflows.verification_workflow import (
+    assess_veracity_node,
+    assign_topics_node,
+    calculate_risk_node,
+    check_human_review_needed,
+    complete_workflow_node,
+    draft_advisory_node,
+    entity_agent,
+    extract_claims_node,
+    extract_entities_node,
+    human_review_node,
+    nli_agent,
+    normalize_node,
+    retrieve_evidence_node,
+    score_claims_node,
+    topic_agent,
+    translate_advisory_node,
+)
+
+Node = Callable[[WorkflowState], Awaitable[WorkflowState]]
+
+
+class BatchWorkflowExecutor:
+    """Run verification workflows for many items stage by stage"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        nli_batch_size: Optional[int] = None
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            batch_size: Items run through the stages together
+            nli_batch_size: Claim/evidence pairs per NLI forward pass
+        """
+        self.batch_size = max(1, batch_size or settings.WORKFLOW_BATCH_SIZE)
+        self.nli_batch_size = max(1, nli_batch_size or settings.WORKFLOW_NLI_BATCH_SIZE)
+
+    async def run(self, raw_items: List[Dict[str, Any]]) -> List[WorkflowState]:
+        """
+        Run one workflow per raw item.
+
+        Args:
+            raw_items: Raw item data
+
+        Returns:
+            Final state of each workflow, in input order
+        """
+        states = [new_workflow_state(str(uuid.uuid4()), raw_item) for raw_item in raw_items]
+        # Workflows are queued until their batch is admitted
+        for state in states:
+            state['status'] = 'queued'
+        await asyncio.gather(*(
+            state_manager.save_state(state['workflow_id'], state) for state in states
+        ))
+
+        for start in range(0, len(states), self.batch_size):
+            batch = states[start:start + self.batch_size]
+            try:
+                # Queued and prioritized by the batch's first item
+                async with get_workflow_admission().slot(batch[0]['raw_item']):
+                    for state in batch:
+                        state['status'] = 'running'
+                        state['updated_at'] = datetime.utcnow()
+                    await asyncio.gather(*(
+                        state_manager.save_state(state['workflow_id'], state) for state in batch
+                    ))
+                    await self._run_batch(batch)
+            except Exception as e:
+                # Stages record per-item errors; this only catches a broken stage
+                observability_service.log_error(f"Workflow batch failed: {e}")
+                for state in batch:
+                    state['status'] = 'failed'
+                    state['errors'].append(str(e))
+
+            await asyncio.gather(*(
+                state_manager.save_state(state['workflow_id'], state) for state in batch
+            ))
+
+        observability_service.log_info(f"Ran {len(states)} workflows in batches of {self.batch_size}")
+        return states
+
+    async def _run_batch(self, states: List[WorkflowState]):
+        # Same stages as the verification workflow graph
+        await self._each('normalize', normalize_node, states)
+        await self._extract_entities(states)
+        await self._each('extract_claims', extract_claims_node, states)
+        await self._each('score_claims', score_claims_node, states)
+        await self._assign_topics(states)
+        await self._each('retrieve_evidence', retrieve_evidence_node, states)
+        await self._assess_veracity(states)
+        await self._each('calculate_risk', calculate_risk_node, states)
+
+        reviewed, unreviewed = [], []
+        for state in states:
+            if await check_human_review_needed(state) == 'human_review':
+                reviewed.append(state)
+            else:
+                unreviewed.append(state)
+
+        # Reviewed items pause here and resume through WorkflowExecutor
+        await self._each('human_review', human_review_node, reviewed)
+
+        await self._each('draft_advisory', draft_advisory_node, unreviewed)
+        await self._each('translate_advisory', translate_advisory_node, unreviewed)
+        await self._each('complete', complete_workflow_node, unreviewed)
+
+    @staticmethod
+    def _completed(name: str, states: List[WorkflowState]):
+        """Record a node as completed, as the graph's node wrapper does"""
+        for state in states:
+            state.setdefault('completed_nodes', []).append(name)
+
+    @staticmethod
+    @contextmanager
+    def _observe(
+        name: str,
+        states: List[WorkflowState],
+        workflow_id: Optional[str] = None
+    ) -> Iterator[NodeTiming]:
+        """
+        Observe a node run over states, as dag.partial_update does
+
+        A batched run without a workflow_id is linked to every workflow
+        of the batch through the span's workflow.ids.
+        """
+        previous = [len(state['errors']) for state in states]
+        workflow_ids = None if workflow_id else [state['workflow_id'] for state in states]
+        with observe_node(name, workflow_id, workflow_ids) as timing:
+            yield timing
+            timing.record_errors([
+                error for state, count in zip(states, previous) for error in state['errors'][count:]
+            ])
+        for state in states:
+            state.setdefault('node_timings', {})[name] = round(timing.seconds, 6)
+
+    async def _each(self, name: str, node: Node, states: List[WorkflowState]):
+        """Run a per-item node for every state concurrently"""
+        async def run(state: WorkflowState):
+            with self._observe(name, [state], state['workflow_id']):
+                await node(state)
+
+        await asyncio.gather(*(run(state) for state in states))
+        self._completed(name, states)
+
+    @staticmethod
+    def _normalized_items(states: List[WorkflowState], label: str) -> list:
+        """NormalizedItem per state; states that cannot build one get an error"""
+        from schemas.item import NormalizedItem
+
+        items = []
+        for state in states:
+            try:
+                items.append((state, NormalizedItem(**state['normalized_item'])))
+            except Exception as e:
+                state['errors'].append(f"{label}: {str(e)}")
+        return items
+
+    async def _extract_entities(self, states: List[WorkflowState]):
+        # Like the graph, a node counts as completed even when it failed
+        self._completed('extract_entities', states)
+        with self._observe('extract_entities', states):
+            items = self._normalized_items(states, 'Entities')
+            if not items:
+                return
+
+            try:
+                await entity_agent.process_batch([item for _, item in items])
+            except Exception as e:
+                observability_service.log_error(f"Batched entity extraction failed: {e}")
+                await asyncio.gather(*(extract_entities_node(state) for state, _ in items))
+                return
+
+            for state, item in items:
+                state['entities'] = item.entities
+                state['updated_at'] = datetime.utcnow()
+
+    async def _assign_topics(self, states: List[WorkflowState]):
+        self._completed('assign_topics', states)
+        with self._observe('assign_topics', states):
+            items = self._normalized_items(states, 'Topics')
+            if not items:
+                return
+
+            try:
+                # Transform only, like the per-item node
+                await topic_agent.assign_topics_batch([item for _, item in items], fit=False)
+            except Exception as e:
+                observability_service.log_error(f"Batched topic assignment failed: {e}")
+                await asyncio.gather(*(assign_topics_node(state) for state, _ in items))
+                return
+
+            for state, item in items:
+                state['topics'] = item.topics
+                state['updated_at'] = datetime.utcnow()
+
+    async def _assess_veracity(self, states: List[WorkflowState]):
+        from schemas.claim import Claim
+
+        self._completed('assess_veracity', states)
+        with self._observe('assess_veracity', states):
+            state_claims = []
+            for state in states:
+                try:
+                    # Only checkworthy claims go through NLI; the rest keep defaults
+                    checkworthy, skipped = split_claims(state)
+                    state_claims.append((
+                        state,
+                        [Claim(**c) for c in checkworthy],
+                        [Claim(**c) for c in skipped]
+                    ))
+                except Exception as e:
+                    state['errors'].append(f"Veracity: {str(e)}")
+
+            all_claims = [claim for _, claims, _ in state_claims for claim in claims]
+            if all_claims:
+                try:
+                    await nli_agent.assess_veracity_batch(all_claims, batch_size=self.nli_batch_size)
+                except Exception as e:
+                    observability_service.log_error(f"Batched veracity assessment failed: {e}")
+                    await asyncio.gather(*(assess_veracity_node(state) for state, _, _ in state_claims))
+                    return
+
+            for state, claims, skipped in state_claims:
+                state['veracity_scores'] = {
+                    claim.id: claim.veracity_likelihood for claim in claims + skipped
+                }
+                state['updated_at'] = datetime.utcnow()
+
+
+# Singleton
+batch_workflow_executor = BatchWorkflowExecutor()
@@ -0,0 +1,116 @@
+"""
+Checkworthiness-gated verification cascade.
+
+Claim extraction is deliberately loose, so many extracted claims are
+throwaway sentences that only contain a number. In cascade mode the
+score_claims node rates every claim with the cheap CheckworthinessAgent
+first, and only claims whose gate score reaches the threshold go on to
+evidence retrieval and NLI. The rest keep their default scores. An item
+left without any checkworthy claim gets no advisory draft, unless a
+reviewer approved it.
+
+The decision is kept in the workflow's cascade field together with the
+work it skipped, and the skipped work is counted in metrics, so the
+compute saved by gating is visible per workflow and overall.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Per-claim stages the gate skips for claims below the threshold
+GATED_STAGES = ('retrieve_evidence', 'assess_veracity')
+
+
+def gate_claims(
+    claims: Sequence[Dict[str, Any]],
+    scores: Sequence[float],
+    threshold: float,
+    enabled: bool = True,
+    completed: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    Decide which claims the expensive stages process.
+
+    Args:
+        claims: Claims of the item
+        scores: Gate score of each claim
+        threshold: Lowest gate score that is checked further
+        enabled: Whether cascade mode is on; if not, every claim passes
+        completed: Nodes already completed, whose work is not skipped
+
+    Returns:
+        Cascade summary: the checkworthy claim IDs and, per skipped stage,
+        how many claims it will not process
+    """
+    checkworthy = [
+        claim['id'] for claim, score in zip(claims, scores)
+        if not enabled or score >= threshold
+    ]
+    skipped = len(claims) - len(checkworthy)
+    return {
+        'enabled': enabled,
+        'threshold': threshold,
+        'claims': len(claims),
+        'checkworthy': checkworthy,
+        'skipped': {
+            stage: skipped for stage in GATED_STAGES
+            if skipped and stage not in completed
+        },
+    }
+
+
+def split_claims(state: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split a workflow's claims by the cascade decision.
+
+    Returns:
+        Checkworthy claims and skipped claims; every claim is checkworthy
+        when the workflow has no cascade decision
+    """
+    claims = list(state.get('claims') or [])
+    cascade = state.get('cascade')
+    if not cascade:
+        return claims, []
+
+    checkworthy = set(cascade.get('checkworthy') or ())
+    return (
+        [claim for claim in claims if claim.get('id') in checkworthy],
+        [claim for claim in claims if claim.get('id') not in checkworthy],
+    )
+
+
+def should_draft_advisory(state: Dict[str, Any]) -> bool:
+    """Whether the cascade lets an item's advisory be drafted"""
+    cascade = state.get('cascade')
+    if not cascade or not cascade.get('enabled'):
+        return True
+    if state.get('human_review_status') == 'approved':
+        return True
+    return bool(cascade.get('checkworthy'))
+
+
+def record_cascade(cascade: Dict[str, Any]):
+    """Count a gating decision and the claim work it skipped"""
+    from services.metrics import (
+        crisislen_workflow_cascade_claims_total,
+        crisislen_workflow_cascade_skipped_total
+    )
+
+    if not cascade.get('enabled'):
+        return
+    checked = len(cascade['checkworthy'])
+    crisislen_workflow_cascade_claims_total.labels(decision='checked').inc(checked)
+    crisislen_workflow_cascade_claims_total.labels(decision='skipped').inc(cascade['claims'] - checked)
+    for stage, count in cascade['skipped'].items():
+        crisislen_workflow_cascade_skipped_total.labels(stage=stage).inc(count)
+
+
+def record_skipped_advisory(cascade: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Count an advisory draft the cascade skipped.
+
+    Returns:
+        Updated cascade summary
+    """
+    from services.metrics import crisislen_workflow_cascade_skipped_total
+
+    crisislen_workflow_cascade_skipped_total.labels(stage='draft_advisory').inc()
+    return {**cascade, 'skipped': {**cascade.get('skipped', {}), 'draft_advisory': 1}}
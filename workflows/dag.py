@@ -0,0 +1,201 @@
+"""
+Dependency-driven wiring for workflow graphs.
+
+Each node declares the state keys it reads and writes in a NodeSpec. The
+builder derives the edges from those sets, so nodes that do not depend on
+each other's output run in the same LangGraph step, and a node with
+several upstream branches waits for all of them (fan-in).
+
+Nodes run on a copy of the state and only their declared writes are
+returned to the graph. Keys in MERGED_KEYS are returned by every node and
+combined by the reducers declared on WorkflowState, so concurrent branches
+never write the same plain key and their updates merge deterministically.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+import functools
+
+from workflows.instrumentation import observe_node
+
+# State keys every node may update; merged by the reducers on WorkflowState
+MERGED_KEYS = ('errors', 'updated_at', 'completed_nodes', 'node_timings')
+
+NodeFn = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class NodeSpec:
+    """
+    A workflow node and the state keys it depends on.
+
+    Args:
+        name: Node name in the graph
+        fn: Async node function taking and returning the state
+        reads: State keys the node reads
+        writes: State keys the node sets (besides MERGED_KEYS)
+    """
+    name: str
+    fn: NodeFn
+    reads: FrozenSet[str] = field(default_factory=frozenset)
+    writes: FrozenSet[str] = field(default_factory=frozenset)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'reads', frozenset(self.reads))
+        object.__setattr__(self, 'writes', frozenset(self.writes))
+        merged = self.writes.intersection(MERGED_KEYS)
+        if merged:
+            raise ValueError(
+                f"Node '{self.name}' declares merged keys {sorted(merged)} as writes"
+            )
+
+
+def partial_update(spec: NodeSpec) -> NodeFn:
+    """
+    Wrap a state-mutating node so it returns only its own updates.
+
+    Args:
+        spec: Node to wrap
+
+    Returns:
+        Async node function returning the declared writes, the errors the
+        node appended, its updated_at and its name as a completed node.
+        A node already in completed_nodes (resumed, or prefilled from the
+        result cache) is skipped and returns no updates. Each run is timed
+        and traced by observe_node; its duration is returned in
+        node_timings.
+    """
+    @functools.wraps(spec.fn)
+    async def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        if spec.name in (state.get('completed_nodes') or ()):
+            return {}
+
+        scratch = dict(state)
+        previous_errors = list(state.get('errors') or [])
+        scratch['errors'] = list(previous_errors)
+
+        with observe_node(spec.name, state.get('workflow_id')) as timing:
+            result = await spec.fn(scratch)
+            if result is not None:
+                scratch = result
+            new_errors = scratch.get('errors', [])[len(previous_errors):]
+            timing.record_errors(new_errors)
+
+        update = {key: scratch[key] for key in spec.writes if key in scratch}
+        update['errors'] = new_errors
+        update['completed_nodes'] = [spec.name]
+        update['node_timings'] = {spec.name: round(timing.seconds, 6)}
+        if scratch.get('updated_at') is not None:
+            update['updated_at'] = scratch['updated_at']
+        return update
+
+    return node
+
+
+def build_dependencies(specs: Sequence[NodeSpec]) -> Dict[str, Set[str]]:
+    """
+    Derive each node's direct predecessors from the read/write sets.
+
+    Declaration order decides which node runs first when two nodes conflict.
+    A node depends on the latest earlier writer of each key it reads, on
+    earlier nodes writing the same keys, and on earlier nodes reading a key
+    it overwrites. The last node joins every branch, so the DAG has a single
+    exit. Edges implied by others are dropped.
+
+    Args:
+        specs: Nodes in declaration order
+
+    Returns:
+        Mapping of node name to the names of its direct predecessors
+    """
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate node names in {names}")
+
+    depends: Dict[str, Set[str]] = {}
+    for i, spec in enumerate(specs):
+        preds = set()
+        for key in spec.reads:
+            writers = [s.name for s in specs[:i] if key in s.writes]
+            if writers:
+                preds.add(writers[-1])
+        for earlier in specs[:i]:
+            if spec.writes & (earlier.writes | earlier.reads):
+                preds.add(earlier.name)
+        depends[spec.name] = preds
+
+    # Everything without dependents feeds the exit node
+    if len(specs) > 1:
+        exit_name = names[-1]
+        has_dependents = set().union(*depends.values())
+        depends[exit_name] |= {
+            name for name in names[:-1] if name not in has_dependents
+        }
+
+    # Transitive reduction; names are in topological order already
+    ancestors: Dict[str, Set[str]] = {}
+    for name in names:
+        ancestors[name] = set().union(
+            *(ancestors[p] | {p} for p in depends[name])
+        ) if depends[name] else set()
+        depends[name] = {
+            p for p in depends[name]
+            if not any(p in ancestors[q] for q in depends[name] if q != p)
+        }
+
+    return depends
+
+
+def add_dag(workflow: Any, specs: Sequence[NodeSpec]) -> Tuple[str, str]:
+    """
+    Add nodes and their dependency edges to a StateGraph.
+
+    The first node must be the only one without predecessors; wire it as
+    the entry point or after an upstream node. Edges out of the last node
+    are left to the caller.
+
+    Args:
+        workflow: StateGraph to add to
+        specs: Nodes in declaration order
+
+    Returns:
+        Names of the root and exit node
+    """
+    depends = build_dependencies(specs)
+    roots = [spec.name for spec in specs if not depends[spec.name]]
+    if roots != [specs[0].name]:
+        raise ValueError(f"DAG must have a single root, found {roots}")
+
+    for spec in specs:
+        workflow.add_node(spec.name, partial_update(spec))
+
+    for spec in specs:
+        preds = sorted(depends[spec.name], key=[s.name for s in specs].index)
+        if len(preds) == 1:
+            workflow.add_edge(preds[0], spec.name)
+        elif preds:
+            # A list of sources waits for all of them
+            workflow.add_edge(preds, spec.name)
+
+    return specs[0].name, specs[-1].name
+
+
+def parallel_stages(specs: Iterable[NodeSpec]) -> List[List[str]]:
+    """
+    Group nodes into the steps they run in, for logging and docs.
+
+    Args:
+        specs: Nodes in declaration order
+
+    Returns:
+        Node names per step; nodes in one step run concurrently
+    """
+    specs = list(specs)
+    depends = build_dependencies(specs)
+    level: Dict[str, int] = {}
+    for spec in specs:
+        level[spec.name] = max((level[p] + 1 for p in depends[spec.name]), default=0)
+
+    stages: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for spec in specs:
+        stages[level[spec.name]].append(spec.name)
+    return stages
@@ -1,18 +1,27 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import uuid
-from workflows.verification_workflow import verification_workflow
-from workflows.state import WorkflowState
+from workflows.verification_workflow import route_entry, verification_workflow
+from workflows.batch_executor import batch_workflow_executor
+from workflows.state import WorkflowState, new_workflow_state
 from workflows.state_manager import state_manager
+from workflows.result_cache import get_result_cache
+from workflows.admission import get_workflow_admission
+from workflows.instrumentation import workflow_span
+from workflows.job_queue import get_job_queue
 from services.observability import observability_service
 
+# States a queued job may (re)start from; a redelivered job whose worker
+# died mid-run finds its workflow still running or retrying
+RUNNABLE_STATUSES = ('queued', 'running', 'retrying')
+
 class WorkflowExecutor:
     """Execute and manage workflows"""
     
     @staticmethod
     async def start_workflow(raw_item: dict) -> str:
         """
-        Start a new verification workflow
+        Start a new verification workflow and run it to the end
         
         Args:
             raw_item: Raw item data
@@ -21,48 +30,117 @@ class WorkflowExecutor:
             Workflow ID
         """
         workflow_id = str(uuid.uuid4())
+        initial_state = await WorkflowExecutor._queue(workflow_id, raw_item)
+        await WorkflowExecutor._execute(workflow_id, initial_state)
+        return workflow_id
+    
+    @staticmethod
+    async def enqueue_workflow(raw_item: dict) -> str:
+        """
+        Queue a new verification workflow for the worker pool
         
-        # Initialize state
-        initial_state: WorkflowState = {
-            'workflow_id': workflow_id,
-            'raw_item_id': raw_item.get('id'),
-            'raw_item': raw_item,
-            'normalized_item': None,
-            'entities': [],
-            'claims': [],
-            'topics': [],
-            'evidence': [],
-            'veracity_scores': {},
-            'risk_score': 0.0,
-            'needs_human_review': False,
-            'errors': [],
-            'retry_count': 0,
-            'started_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow(),
-            'status': 'running'
-        }
+        Args:
+            raw_item: Raw item data
+            
+        Returns:
+            Workflow ID, available as soon as the workflow is queued
+        """
+        workflow_id = str(uuid.uuid4())
+        await WorkflowExecutor._queue(workflow_id, raw_item)
+        await get_job_queue().enqueue(workflow_id)
+        observability_service.log_info(f"Queued workflow {workflow_id}")
+        return workflow_id
+    
+    @staticmethod
+    async def run_queued_workflow(workflow_id: str, retry: bool = False) -> Optional[WorkflowState]:
+        """
+        Run a queued workflow in a worker
         
-        # Save initial state
-        await state_manager.save_state(workflow_id, initial_state)
+        A job redelivered after its worker died continues from the last
+        checkpoint; one whose workflow already finished, paused or was
+        cancelled does nothing.
         
-        observability_service.log_info(f"Started workflow {workflow_id}")
+        Args:
+            workflow_id: Workflow ID
+            retry: Whether the job is delivered again if this run fails;
+                if so a failed run marks the workflow retrying and raises,
+                otherwise it marks it failed
         
-        # Execute workflow
+        Returns:
+            Workflow state after the run, or None if its state expired
+        """
         try:
-            final_state = await verification_workflow.ainvoke(initial_state)
+            state = await state_manager.load_state(workflow_id)
+        except ValueError as e:
+            # The workflow state expired or was deleted; nothing to run
+            observability_service.log_error(f"Not running workflow {workflow_id}: {e}")
+            return None
+        if state['status'] not in RUNNABLE_STATUSES:
+            observability_service.log_info(f"Workflow {workflow_id} is {state['status']}, not running it")
+            return state
+        
+        return await WorkflowExecutor._execute(workflow_id, state, retry=retry)
+    
+    @staticmethod
+    async def _queue(workflow_id: str, raw_item: dict) -> WorkflowState:
+        """Create and save the queued state of a new workflow"""
+        # Initialize state, reusing the results of an identical item
+        initial_state = new_workflow_state(workflow_id, raw_item)
+        if await get_result_cache().apply(initial_state):
+            observability_service.log_info(
+                f"Workflow {workflow_id} reuses cached results for item {raw_item.get('id')}"
+            )
+        
+        # Save initial state; it stays queued until admitted
+        initial_state['status'] = 'queued'
+        await state_manager.save_state(workflow_id, initial_state)
+        return initial_state
+    
+    @staticmethod
+    async def _execute(workflow_id: str, state: WorkflowState, retry: bool = False) -> WorkflowState:
+        """
+        Run a queued workflow once admitted, recording failures in its state
+        
+        A failed run marks the workflow failed, or retrying and re-raises
+        when retry is set.
+        """
+        final_state = state
+        try:
+            async with get_workflow_admission().slot(state['raw_item']):
+                state['status'] = 'running'
+                state['updated_at'] = datetime.utcnow()
+                await state_manager.save_state(workflow_id, state)
+                observability_service.log_info(f"Started workflow {workflow_id}")
+                
+                final_state = await WorkflowExecutor._run_graph(workflow_id, state)
             
-            # Save final state
-            await state_manager.save_state(workflow_id, final_state)
+            await get_result_cache().store(final_state)
             
-            observability_service.log_info(f"Workflow {workflow_id} completed")
+            observability_service.log_info(f"Workflow {workflow_id} {final_state['status']}")
             
         except Exception as e:
+            if retry:
+                observability_service.log_error(f"Workflow {workflow_id} failed, retrying: {e}")
+                await WorkflowExecutor._mark_failed(workflow_id, e, status='retrying')
+                raise
             observability_service.log_error(f"Workflow {workflow_id} failed: {e}")
-            initial_state['status'] = 'failed'
-            initial_state['errors'].append(str(e))
-            await state_manager.save_state(workflow_id, initial_state)
+            await WorkflowExecutor._mark_failed(workflow_id, e)
         
-        return workflow_id
+        return final_state
+    
+    @staticmethod
+    async def start_workflows_batch(raw_items: List[dict]) -> List[str]:
+        """
+        Run verification workflows for many items in micro-batches
+        
+        Args:
+            raw_items: Raw item data
+            
+        Returns:
+            Workflow IDs, in input order
+        """
+        states = await batch_workflow_executor.run(raw_items)
+        return [state['workflow_id'] for state in states]
     
     @staticmethod
     async def resume_workflow(workflow_id: str, human_decision: Optional[str] = None):
@@ -86,21 +164,58 @@ class WorkflowExecutor:
         state['status'] = 'running'
         state['updated_at'] = datetime.utcnow()
         
-        # Continue execution
+        # Continue execution; the graph re-enters after human review
+        # using the completed nodes recorded in the saved state
         try:
-            # In LangGraph, we'd use streaming or continue from checkpoint
-            # For simplicity, we'll re-execute from current state
-            final_state = await verification_workflow.ainvoke(state)
-            
-            await state_manager.save_state(workflow_id, final_state)
+            observability_service.log_info(
+                f"Resuming workflow {workflow_id} at {route_entry(state)}"
+            )
+            await state_manager.save_state(workflow_id, state)
+            final_state = await WorkflowExecutor._run_graph(workflow_id, state)
             
-            observability_service.log_info(f"Workflow {workflow_id} resumed and completed")
+            observability_service.log_info(f"Workflow {workflow_id} resumed and {final_state['status']}")
             
         except Exception as e:
             observability_service.log_error(f"Workflow {workflow_id} resume failed: {e}")
-            state['status'] = 'failed'
-            state['errors'].append(str(e))
-            await state_manager.save_state(workflow_id, state)
+            await WorkflowExecutor._mark_failed(workflow_id, e)
+    
+    @staticmethod
+    async def _run_graph(workflow_id: str, state: WorkflowState) -> WorkflowState:
+        """
+        Run the verification graph, checkpointing after every step
+        
+        The saved state carries completed_nodes, so a paused or interrupted
+        workflow resumes from the last completed node.
+        
+        Returns:
+            Final workflow state
+        """
+        final_state = state
+        saved_nodes = len(state.get('completed_nodes') or [])
+        
+        with workflow_span(workflow_id):
+            async for final_state in verification_workflow.astream(state, stream_mode="values"):
+                completed = len(final_state.get('completed_nodes') or [])
+                if completed != saved_nodes:
+                    await state_manager.save_state(workflow_id, final_state)
+                    saved_nodes = completed
+        
+        return final_state
+    
+    @staticmethod
+    async def fail_workflow(workflow_id: str, reason: str):
+        """Mark a workflow failed without running it"""
+        observability_service.log_error(f"Workflow {workflow_id} failed: {reason}")
+        await WorkflowExecutor._mark_failed(workflow_id, RuntimeError(reason))
+    
+    @staticmethod
+    async def _mark_failed(workflow_id: str, error: Exception, status: str = 'failed'):
+        """Mark the last checkpoint of a workflow as failed (or retrying)"""
+        state = await state_manager.load_state(workflow_id)
+        state['status'] = status
+        state['errors'] = list(state.get('errors') or []) + [str(error)]
+        state['updated_at'] = datetime.utcnow()
+        await state_manager.save_state(workflow_id, state)
     
     @staticmethod
     async def get_workflow_status(workflow_id: str) -> dict:
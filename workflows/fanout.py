@@ -0,0 +1,173 @@
+"""
+Bounded, cancellable fan-out over the claims of an item.
+
+Each claim goes through evidence retrieval and then NLI. ClaimFanOut runs
+claims concurrently but never more than max_concurrency at once across
+the process, gives each claim a deadline and the whole fan-out another,
+and cancels whatever is still running when a deadline passes. Claims that
+finish are returned even when others timed out or failed.
+
+NLI calls that are in flight at the same moment are coalesced by a
+MicroBatcher into one batched call, so concurrently processed claims share
+forward passes instead of running them one pair at a time.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+
+BatchFn = Callable[[List[Any]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into batched calls"""
+
+    def __init__(self, fn: BatchFn, max_batch: int = 16, max_wait_seconds: float = 0.01):
+        """
+        Initialize batcher.
+
+        Args:
+            fn: Async function mapping a list of items to results in the
+                same order
+            max_batch: Items per call; a full batch is sent at once
+            max_wait_seconds: How long the first item of a batch waits
+                for others to join it
+        """
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Process one item as part of the next batch.
+
+        Cancelling the caller before its batch is sent drops the item from
+        the batch; cancelling it later only discards the result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        try:
+            results = await self.fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of a fan-out, aligned with the input claims"""
+
+    results: List[Optional[Any]]  # processed claim, or None if it did not finish
+    timed_out: List[int] = field(default_factory=list)  # indexes of claims past a deadline
+    failed: Dict[int, str] = field(default_factory=dict)  # index -> error
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out and not self.failed
+
+
+class ClaimFanOut:
+    """Evidence retrieval and NLI over many claims with bounded concurrency"""
+
+    def __init__(
+        self,
+        retrieve: Callable[[Any], Awaitable[Any]],
+        assess_batch: BatchFn,
+        max_concurrency: int = 8,
+        claim_timeout_seconds: float = 20.0,
+        timeout_seconds: float = 60.0,
+        nli_batch_size: int = 16,
+        nli_max_wait_seconds: float = 0.01
+    ):
+        """
+        Initialize fan-out.
+
+        Args:
+            retrieve: Attach evidence to one claim
+            assess_batch: Assess the veracity of a list of claims
+            max_concurrency: Claims processed at once, across all fan-outs
+            claim_timeout_seconds: Deadline of one claim once it starts
+            timeout_seconds: Deadline of a whole fan-out, queueing included
+            nli_batch_size: Claims per batched NLI call
+            nli_max_wait_seconds: How long an NLI call waits for others
+                to batch with
+        """
+        self.retrieve = retrieve
+        self.claim_timeout_seconds = claim_timeout_seconds
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.nli = MicroBatcher(assess_batch, nli_batch_size, nli_max_wait_seconds)
+
+    async def _pipeline(self, claim: Any) -> Any:
+        claim = await self.retrieve(claim)
+        return await self.nli.submit(claim)
+
+    async def _process(self, claim: Any) -> Any:
+        async with self._semaphore:
+            return await asyncio.wait_for(self._pipeline(claim), self.claim_timeout_seconds)
+
+    async def run(self, claims: List[Any]) -> FanOutResult:
+        """
+        Process claims concurrently.
+
+        Returns:
+            Processed claims in input order, with the claims that timed
+            out or failed recorded instead of raised
+        """
+        tasks = [asyncio.create_task(self._process(claim)) for claim in claims]
+        if not tasks:
+            return FanOutResult(results=[])
+
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=self.timeout_seconds)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        outcome = FanOutResult(results=[None] * len(tasks))
+        for index, task in enumerate(tasks):
+            if task in pending or isinstance(task.exception(), asyncio.TimeoutError):
+                outcome.timed_out.append(index)
+            elif task.exception() is not None:
+                outcome.failed[index] = str(task.exception())
+            else:
+                outcome.results[index] = task.result()
+        return outcome
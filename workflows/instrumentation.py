@@ -0,0 +1,104 @@
+"""
+Latency and error instrumentation of workflow nodes.
+
+Every graph node runs inside observe_node (see dag.partial_update), which
+records its duration and errors as Prometheus metrics labelled by node and
+opens an OpenTelemetry span carrying the workflow ID; a stage run once
+for a batch of workflows carries all their IDs instead. The durations are
+also kept in the workflow's node_timings, so a single slow workflow can be
+broken down by stage.
+
+Tracing is optional: without OpenTelemetry installed only the metrics are
+recorded.
+"""
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import time
+
+
+@lru_cache(maxsize=1)
+def _tracer() -> Any:
+    try:
+        from services.tracing import tracer
+    except ImportError:
+        return None
+    return tracer
+
+
+@contextmanager
+def _span(name: str, attributes: Dict[str, Any]) -> Iterator[Any]:
+    tracer = _tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+@contextmanager
+def workflow_span(workflow_id: Optional[str]) -> Iterator[Any]:
+    """Span around a workflow run; node spans become its children"""
+    with _span('workflow', {'workflow.id': workflow_id or ''}) as span:
+        yield span
+
+
+class NodeTiming:
+    """Duration of one node run, filled in when the node finishes"""
+
+    def __init__(self, node: str):
+        self.node = node
+        self.seconds = 0.0
+        self._span = None
+
+    def record_errors(self, errors: List[str]):
+        """Count errors the node recorded in the state instead of raising"""
+        from services.metrics import crisislen_workflow_node_errors_total
+
+        if not errors:
+            return
+        crisislen_workflow_node_errors_total.labels(node=self.node).inc(len(errors))
+        if self._span is not None:
+            self._span.set_attribute('workflow.node.errors', len(errors))
+
+
+@contextmanager
+def observe_node(
+    node: str,
+    workflow_id: Optional[str] = None,
+    workflow_ids: Optional[Sequence[str]] = None
+) -> Iterator[NodeTiming]:
+    """
+    Time a node run and count it as an error if it raises.
+
+    Args:
+        node: Node name, used as the metric label
+        workflow_id: Workflow the node runs for, set on the span
+        workflow_ids: Workflows a batched node runs for at once, set on
+            the span so it can be found from any of them
+
+    Yields:
+        NodeTiming whose seconds are set on exit
+    """
+    from services.metrics import (
+        crisislen_workflow_node_duration_seconds,
+        crisislen_workflow_node_errors_total
+    )
+
+    attributes = {'workflow.id': workflow_id or '', 'workflow.node': node}
+    if workflow_ids:
+        attributes['workflow.ids'] = list(workflow_ids)
+        attributes['workflow.batch_size'] = len(workflow_ids)
+
+    timing = NodeTiming(node)
+    with _span(f"workflow.{node}", attributes) as span:
+        timing._span = span
+        started = time.perf_counter()
+        try:
+            yield timing
+        except Exception:
+            crisislen_workflow_node_errors_total.labels(node=node).inc()
+            raise
+        finally:
+            timing.seconds = time.perf_counter() - started
+            crisislen_workflow_node_duration_seconds.labels(node=node).observe(timing.seconds)
@@ -0,0 +1,348 @@
+"""
+Redis stream work queue for verification workflows.
+
+In async mode the API queues a workflow and returns its ID at once, and a
+pool of WorkflowWorker processes, on any number of nodes, runs it. Jobs are
+entries of one Redis stream read through one consumer group, so each job
+is delivered to a single worker:
+
+- a worker claims new jobs with XREADGROUP; a claimed job stays pending
+  until the worker acknowledges it;
+- while a job runs, the worker heartbeats it by re-claiming it, which
+  resets its idle time; the ownership check and the claim run as one
+  script, so a heartbeat never takes back a job reclaimed meanwhile;
+- a job idle for longer than the visibility timeout belongs to a worker
+  that died or hung, and XAUTOCLAIM hands it to another worker, which
+  continues the workflow from its last checkpoint;
+- a workflow whose run fails is marked retrying and its job left pending,
+  so it is delivered again once the visibility timeout lapses; its last
+  delivery marks it failed instead;
+- a job delivered more than max_deliveries times is failed and dropped,
+  so an item that kills its worker cannot loop forever.
+
+Stream entries carry only the workflow ID; the queued state saved by
+StateManager holds the item.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+import os
+import socket
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Reset the idle time of a job only while the consumer still holds it.
+# Checking and claiming in one script leaves no gap in which another
+# worker's XAUTOCLAIM could take the job and have it claimed back.
+HEARTBEAT_SCRIPT = """
+local pending = redis.call('XPENDING', KEYS[1], ARGV[1], ARGV[3], ARGV[3], 1)
+if #pending == 0 or pending[1][2] ~= ARGV[2] then
+    return 0
+end
+redis.call('XCLAIM', KEYS[1], ARGV[1], ARGV[2], 0, ARGV[3], 'JUSTID')
+return 1
+"""
+
+
+@dataclass
+class Job:
+    """A claimed workflow job"""
+
+    message_id: str
+    workflow_id: str
+    deliveries: int = 1
+
+
+class WorkflowJobQueue:
+    """Workflow jobs in a Redis stream consumed by one consumer group"""
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        stream: str = 'workflow:jobs',
+        group: str = 'workflow-workers',
+        visibility_timeout_seconds: float = 300.0,
+        max_deliveries: int = 3,
+        max_length: int = 1_000_000
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            redis_client: Async Redis client decoding responses
+                (defaults to redis_service)
+            stream: Stream key
+            group: Consumer group shared by all workers
+            visibility_timeout_seconds: Idle time after which a claimed
+                job is handed to another worker
+            max_deliveries: Deliveries after which a job is failed
+            max_length: Approximate cap on stream entries kept
+        """
+        self._redis = redis_client
+        self.stream = stream
+        self.group = group
+        self.visibility_timeout_seconds = visibility_timeout_seconds
+        self.max_deliveries = max(1, max_deliveries)
+        self.max_length = max_length
+        self._group_ready = False
+        self._heartbeat_script = None
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            from services.redis_service import redis_service
+            await redis_service.connect()
+            self._redis = redis_service.redis
+        return self._redis
+
+    @property
+    def _visibility_ms(self) -> int:
+        return int(self.visibility_timeout_seconds * 1000)
+
+    async def ensure_group(self):
+        """Create the stream and consumer group if they do not exist"""
+        if self._group_ready:
+            return
+        redis = await self._get_redis()
+        try:
+            await redis.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except Exception as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, workflow_id: str) -> str:
+        """
+        Queue a workflow whose queued state is already saved
+
+        Returns:
+            Stream entry ID of the job
+        """
+        from services.metrics import crisislen_workflow_jobs_total
+
+        redis = await self._get_redis()
+        message_id = await redis.xadd(
+            self.stream, {'workflow_id': workflow_id},
+            maxlen=self.max_length, approximate=True
+        )
+        crisislen_workflow_jobs_total.labels(event='enqueued').inc()
+        return message_id
+
+    async def claim(self, consumer: str, count: int = 1, block_ms: int = 5000) -> List[Job]:
+        """
+        Claim jobs for a worker
+
+        Jobs abandoned by other workers are reclaimed first; otherwise
+        waits up to block_ms for new jobs.
+
+        Args:
+            consumer: Name of the claiming worker, unique across the pool
+            count: Most jobs to claim
+            block_ms: How long to wait for new jobs
+
+        Returns:
+            Claimed jobs, possibly none
+        """
+        await self.ensure_group()
+        jobs = await self._reclaim(consumer, count)
+        if jobs:
+            return jobs
+
+        redis = await self._get_redis()
+        response = await redis.xreadgroup(
+            self.group, consumer, {self.stream: '>'}, count=count, block=block_ms
+        )
+        return [
+            Job(message_id, fields['workflow_id'])
+            for _, messages in response or []
+            for message_id, fields in messages
+        ]
+
+    async def _reclaim(self, consumer: str, count: int) -> List[Job]:
+        from services.metrics import crisislen_workflow_jobs_total
+
+        redis = await self._get_redis()
+        result = await redis.xautoclaim(
+            self.stream, self.group, consumer,
+            min_idle_time=self._visibility_ms, start_id='0-0', count=count
+        )
+
+        jobs = []
+        for message_id, fields in result[1]:
+            if not fields:
+                continue  # Trimmed from the stream while pending
+            pending = await redis.xpending_range(
+                self.stream, self.group, min=message_id, max=message_id, count=1
+            )
+            deliveries = pending[0]['times_delivered'] if pending else 1
+            jobs.append(Job(message_id, fields['workflow_id'], deliveries))
+
+        if jobs:
+            crisislen_workflow_jobs_total.labels(event='reclaimed').inc(len(jobs))
+            logger.warning(f"Reclaimed {len(jobs)} abandoned workflow jobs")
+        return jobs
+
+    async def heartbeat(self, job: Job, consumer: str) -> bool:
+        """
+        Extend the visibility of a running job
+
+        Returns:
+            Whether the worker still holds the job; False if it was idle
+            long enough to be handed to another worker
+        """
+        redis = await self._get_redis()
+        if self._heartbeat_script is None:
+            self._heartbeat_script = redis.register_script(HEARTBEAT_SCRIPT)
+        held = await self._heartbeat_script(
+            keys=[self.stream], args=[self.group, consumer, job.message_id]
+        )
+        return bool(held)
+
+    async def ack(self, job: Job):
+        """Acknowledge a finished job and drop it from the stream"""
+        redis = await self._get_redis()
+        pipe = redis.pipeline()
+        pipe.xack(self.stream, self.group, job.message_id)
+        pipe.xdel(self.stream, job.message_id)
+        await pipe.execute()
+
+    async def stats(self) -> Dict[str, int]:
+        """Jobs claimed but unacknowledged, and jobs not yet claimed"""
+        await self.ensure_group()
+        redis = await self._get_redis()
+        for info in await redis.xinfo_groups(self.stream):
+            if info['name'] == self.group:
+                return {'pending': info.get('pending') or 0, 'lag': info.get('lag') or 0}
+        return {'pending': 0, 'lag': 0}
+
+
+class WorkflowWorker:
+    """Claim and run queued workflows until stopped"""
+
+    def __init__(
+        self,
+        queue: Optional[WorkflowJobQueue] = None,
+        concurrency: Optional[int] = None,
+        consumer: Optional[str] = None,
+        block_ms: int = 5000,
+        shutdown_grace_seconds: float = 60.0
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            queue: Job queue (defaults to the configured one)
+            concurrency: Workflows run at once by this worker
+            consumer: Worker name in the consumer group; must be unique
+                across hosts (defaults to hostname and PID)
+            block_ms: How long one claim waits for new jobs
+            shutdown_grace_seconds: How long stop() lets running jobs
+                finish; unfinished ones are reclaimed by other workers
+        """
+        self.queue = queue or get_job_queue()
+        self.concurrency = max(1, concurrency or settings.WORKFLOW_WORKER_CONCURRENCY)
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.block_ms = block_ms
+        self.shutdown_grace_seconds = shutdown_grace_seconds
+        self.heartbeat_seconds = self.queue.visibility_timeout_seconds / 3
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = False
+        self.processed = 0
+
+    def stop(self):
+        """Stop claiming jobs; run() returns once running jobs finish"""
+        self._running = False
+
+    async def run(self):
+        """Claim and run jobs until stop() is called"""
+        self._running = True
+        logger.info(f"Workflow worker {self.consumer} started (concurrency {self.concurrency})")
+
+        while self._running:
+            free = self.concurrency - len(self._tasks)
+            if free <= 0:
+                await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                jobs = await self.queue.claim(self.consumer, count=free, block_ms=self.block_ms)
+            except Exception as e:
+                logger.error(f"Claiming workflow jobs failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for job in jobs:
+                task = asyncio.create_task(self._handle(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+        if self._tasks:
+            logger.info(f"Waiting for {len(self._tasks)} running workflows")
+            _, unfinished = await asyncio.wait(self._tasks, timeout=self.shutdown_grace_seconds)
+            # Left pending in the stream; another worker reclaims them
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+        logger.info(f"Workflow worker {self.consumer} stopped")
+
+    async def _handle(self, job: Job):
+        from services.metrics import crisislen_workflow_jobs_total
+        from workflows.executor import workflow_executor
+
+        if job.deliveries > self.queue.max_deliveries:
+            await workflow_executor.fail_workflow(
+                job.workflow_id, f"Gave up after {job.deliveries - 1} deliveries"
+            )
+            await self.queue.ack(job)
+            crisislen_workflow_jobs_total.labels(event='dead_lettered').inc()
+            return
+
+        # The last delivery fails the workflow instead of leaving it pending
+        run = asyncio.create_task(workflow_executor.run_queued_workflow(
+            job.workflow_id, retry=job.deliveries < self.queue.max_deliveries
+        ))
+        try:
+            while not run.done():
+                await asyncio.wait({run}, timeout=self.heartbeat_seconds)
+                if run.done():
+                    break
+                try:
+                    held = await self.queue.heartbeat(job, self.consumer)
+                except Exception as e:
+                    logger.warning(f"Heartbeat of workflow {job.workflow_id} failed: {e}")
+                    continue
+                if not held:
+                    # Another worker took over; stop so only it runs the workflow
+                    logger.warning(f"Lost workflow job {job.workflow_id} to another worker")
+                    crisislen_workflow_jobs_total.labels(event='lost').inc()
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                    return
+            await run
+        except asyncio.CancelledError:
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            raise
+        except Exception as e:
+            # The workflow is retrying: leave the job pending, so it is
+            # delivered again once its visibility lapses
+            logger.error(f"Workflow job {job.workflow_id} failed: {e}")
+            return
+
+        await self.queue.ack(job)
+        self.processed += 1
+        crisislen_workflow_jobs_total.labels(event='completed').inc()
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> WorkflowJobQueue:
+    """Get singleton job queue configured from settings."""
+    return WorkflowJobQueue(
+        stream=settings.WORKFLOW_QUEUE_STREAM,
+        group=settings.WORKFLOW_QUEUE_GROUP,
+        visibility_timeout_seconds=settings.WORKFLOW_JOB_VISIBILITY_TIMEOUT_SECONDS,
+        max_deliveries=settings.WORKFLOW_JOB_MAX_DELIVERIES
+    )
@@ -1,38 +1,87 @@
 from langgraph.graph import StateGraph, END
+from config import settings
+from workflows.cascade import split_claims
+from workflows.fanout import ClaimFanOut
 from workflows.state import WorkflowState
+from datetime import datetime
 from typing import List
 import asyncio
+import weakref
+
+# One fan-out per event loop: its semaphore and NLI batcher are bound to
+# the loop they first run on, so a later asyncio.run needs its own
+_fanouts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ClaimFanOut]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _create_claim_fanout() -> ClaimFanOut:
+    from workflows.verification_workflow import evidence_agent, nli_agent
+
+    async def assess_batch(claims):
+        return await nli_agent.assess_veracity_batch(
+            claims, batch_size=settings.WORKFLOW_NLI_BATCH_SIZE
+        )
+
+    return ClaimFanOut(
+        retrieve=evidence_agent.run,
+        assess_batch=assess_batch,
+        max_concurrency=settings.WORKFLOW_CLAIM_CONCURRENCY,
+        claim_timeout_seconds=settings.WORKFLOW_CLAIM_TIMEOUT_SECONDS,
+        timeout_seconds=settings.WORKFLOW_FANOUT_TIMEOUT_SECONDS,
+        nli_batch_size=settings.WORKFLOW_NLI_BATCH_SIZE,
+        nli_max_wait_seconds=settings.WORKFLOW_NLI_MAX_WAIT_MS / 1000
+    )
+
+def get_claim_fanout() -> ClaimFanOut:
+    """Get the running loop's claim fan-out, sharing the workflow's agents"""
+    loop = asyncio.get_running_loop()
+    fanout = _fanouts.get(loop)
+    if fanout is None:
+        fanout = _fanouts[loop] = _create_claim_fanout()
+    return fanout
 
 # Parallel processing nodes
 async def process_claims_parallel(state: WorkflowState) -> WorkflowState:
-    """Process multiple claims in parallel"""
+    """
+    Retrieve evidence and assess veracity for all claims concurrently
+
+    Claims that miss their deadline or fail keep their previous data and
+    are listed in claims_incomplete; the rest are updated. Claims gated
+    out by the cascade are not processed and keep their default scores.
+    """
     from schemas.claim import Claim
-    from agents.digestion.evidence_retrieval import EvidenceRetrievalAgent
-    from agents.digestion.nli_veracity import NliVeracityAgent
-    
-    evidence_agent = EvidenceRetrievalAgent()
-    nli_agent = NliVeracityAgent()
     
-    claims = [Claim(**c) for c in state.get('claims', [])]
+    checkworthy, skipped = split_claims(state)
+    try:
+        claims = [Claim(**c) for c in checkworthy]
+        defaults = {c['id']: Claim(**c).veracity_likelihood for c in skipped}
+    except Exception as e:
+        state['errors'].append(f"Veracity: {str(e)}")
+        return state
     
-    # Process all claims concurrently
-    tasks = []
-    for claim in claims:
-        # Create task for evidence + NLI for each claim
-        async def process_claim(c):
-            # Retrieve evidence
-            c_with_evidence = await evidence_agent.run(c)
-            # Assess veracity
-            c_final = await nli_agent.run(c_with_evidence)
-            return c_final
-        
-        tasks.append(process_claim(claim))
+    result = await get_claim_fanout().run(claims)
     
-    # Wait for all claims to be processed
-    processed_claims = await asyncio.gather(*tasks)
+    processed = {
+        claim.id: claim for claim in result.results if claim is not None
+    }
+    state['claims'] = [
+        processed[c['id']].dict() if c.get('id') in processed else c
+        for c in state.get('claims', [])
+    ]
+    state['veracity_scores'] = {
+        **defaults,
+        **{claim_id: claim.veracity_likelihood for claim_id, claim in processed.items()}
+    }
     
-    # Update state
-    state['claims'] = [c.dict() for c in processed_claims]
+    # Prefixed like assess_veracity errors, so partial results are not cached
+    for index in result.timed_out:
+        state['errors'].append(f"Veracity: claim {claims[index].id} timed out")
+    for index, error in result.failed.items():
+        state['errors'].append(f"Veracity: claim {claims[index].id} failed: {error}")
+    state['claims_incomplete'] = [
+        claims[index].id for index in sorted(result.timed_out + list(result.failed))
+    ]
+    state['updated_at'] = datetime.utcnow()
     
     return state
 
@@ -0,0 +1,233 @@
+"""
+Content-fingerprint cache of verification results.
+
+Viral misinformation arrives as many near-identical items from different
+sources. Items whose title and text match after normalization share a
+fingerprint, and the content-derived results of the first one (entities,
+claims, the cascade decision, topics, evidence and NLI verdicts) are
+reused for the rest. A reused workflow still runs normalization, risk
+scoring and everything after it, since those depend on the source.
+
+Results are kept in a bounded in-process LRU and in Redis, both expiring
+after the configured TTL. The cache is best effort: Redis errors only
+cost a miss.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+
+from config import settings
+from workflows.state import WorkflowState
+
+logger = logging.getLogger(__name__)
+
+# Cached analysis nodes: state field each one writes, and its error prefix
+CACHED_NODES = {
+    'extract_entities': ('entities', 'Entities'),
+    'extract_claims': ('claims', 'Claims'),
+    'score_claims': ('cascade', 'Scoring'),
+    'assign_topics': ('topics', 'Topics'),
+    'retrieve_evidence': ('evidence', 'Evidence'),
+    'assess_veracity': ('veracity_scores', 'Veracity'),
+}
+
+_URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_content(text: str) -> str:
+    """Case-fold, drop URLs and collapse whitespace"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = _URL_RE.sub(' ', text).casefold()
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def content_fingerprint(raw_item: Dict[str, Any]) -> Optional[str]:
+    """
+    Fingerprint of an item's title and text
+
+    Returns:
+        Hex digest, or None for items without content
+    """
+    title = normalize_content(raw_item.get('title') or '')
+    text = normalize_content(raw_item.get('text') or '')
+    if not title and not text:
+        return None
+    return hashlib.sha256(f"{title}\n{text}".encode('utf-8')).hexdigest()
+
+
+def _rename_item(value: str, old_id: str, new_id: str) -> str:
+    if old_id and isinstance(value, str) and value.startswith(f"{old_id}_"):
+        return f"{new_id}{value[len(old_id):]}"
+    return value
+
+
+class ResultCache:
+    """Two-tier cache of content-derived workflow results"""
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        ttl_seconds: int = 6 * 3600,
+        max_entries: int = 10_000,
+        namespace: str = 'workflow:result',
+        use_redis: bool = True
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            redis_client: Async Redis client (defaults to redis_service)
+            ttl_seconds: How long a result is reused; 0 disables the cache
+            max_entries: Results kept in process, least recently used
+                evicted first
+            namespace: Redis key prefix
+            use_redis: Disable to cache within this process only
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.namespace = namespace
+        self.use_redis = use_redis
+        self._redis = redis_client
+        # fingerprint -> (expires_at, entry)
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            from services.redis_service import redis_service
+            await redis_service.connect()
+            self._redis = redis_service.redis
+        return self._redis
+
+    def _key(self, fingerprint: str) -> str:
+        return f"{self.namespace}:{fingerprint}"
+
+    def _remember(self, fingerprint: str, entry: Dict[str, Any]):
+        self._local[fingerprint] = (time.monotonic() + self.ttl_seconds, entry)
+        self._local.move_to_end(fingerprint)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _lookup(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        cached = self._local.get(fingerprint)
+        if cached is not None:
+            expires_at, entry = cached
+            if time.monotonic() < expires_at:
+                self._local.move_to_end(fingerprint)
+                return entry
+            del self._local[fingerprint]
+
+        if not self.use_redis:
+            return None
+        try:
+            redis = await self._get_redis()
+            data = await redis.get(self._key(fingerprint))
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            return None
+        if not data:
+            return None
+
+        entry = json.loads(data)
+        self._remember(fingerprint, entry)
+        return entry
+
+    async def apply(self, state: WorkflowState) -> bool:
+        """
+        Prefill a new workflow state from a cached result
+
+        Cached nodes are marked completed, so the graph skips them.
+
+        Returns:
+            Whether the cache had a result for the item
+        """
+        from services.metrics import crisislen_workflow_cache_requests_total
+
+        fingerprint = content_fingerprint(state.get('raw_item') or {})
+        if not self.enabled or fingerprint is None:
+            return False
+
+        entry = await self._lookup(fingerprint)
+        crisislen_workflow_cache_requests_total.labels(
+            result='hit' if entry else 'miss'
+        ).inc()
+        if not entry:
+            return False
+
+        # Claim IDs embed the item ID; rename them to the new item
+        old_id, new_id = entry.get('item_id'), state.get('raw_item_id')
+        results = json.loads(json.dumps(entry['results']))
+        for claim in results.get('claims', []):
+            claim['id'] = _rename_item(claim.get('id'), old_id, new_id)
+            if claim.get('normalized_item_id') == old_id:
+                claim['normalized_item_id'] = new_id
+        if results.get('cascade'):
+            results['cascade']['checkworthy'] = [
+                _rename_item(claim_id, old_id, new_id)
+                for claim_id in results['cascade'].get('checkworthy') or []
+            ]
+        if 'veracity_scores' in results:
+            results['veracity_scores'] = {
+                _rename_item(claim_id, old_id, new_id): score
+                for claim_id, score in results['veracity_scores'].items()
+            }
+
+        state.update(results)
+        state['completed_nodes'] = list(state.get('completed_nodes') or []) + [
+            node for node, (field, _) in CACHED_NODES.items() if field in results
+        ]
+        state['result_cache_hit'] = fingerprint
+        return True
+
+    async def store(self, state: WorkflowState):
+        """
+        Cache the content-derived results of a finished workflow
+
+        Nothing is cached for reused results or when a cached node failed.
+        """
+        fingerprint = content_fingerprint(state.get('raw_item') or {})
+        if not self.enabled or fingerprint is None or state.get('result_cache_hit'):
+            return
+
+        completed = set(state.get('completed_nodes') or [])
+        errors = state.get('errors') or []
+        if not all(node in completed for node in CACHED_NODES):
+            return
+        if any(e.startswith(f"{prefix}:") for e in errors for _, prefix in CACHED_NODES.values()):
+            return
+
+        entry = {
+            'item_id': state.get('raw_item_id'),
+            'results': json.loads(json.dumps(
+                {field: state.get(field) for field, _ in CACHED_NODES.values()},
+                default=str
+            ))
+        }
+        self._remember(fingerprint, entry)
+
+        if not self.use_redis:
+            return
+        try:
+            redis = await self._get_redis()
+            await redis.set(self._key(fingerprint), json.dumps(entry), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCache:
+    """Get singleton result cache configured from settings."""
+    return ResultCache(
+        ttl_seconds=settings.WORKFLOW_RESULT_CACHE_TTL_SECONDS,
+        max_entries=settings.WORKFLOW_RESULT_CACHE_SIZE
+    )
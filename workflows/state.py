@@ -1,5 +1,19 @@
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 from datetime import datetime
+import operator
+
+
+def latest(current: Optional[datetime], update: Optional[datetime]) -> Optional[datetime]:
+    """Reducer keeping the most recent timestamp of concurrent updates"""
+    if current is None or update is None:
+        return update or current
+    return max(current, update)
+
+
+def merge_dicts(current: Optional[Dict[str, Any]], update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer combining the keys of concurrent dict updates"""
+    return {**(current or {}), **(update or {})}
+
 
 class WorkflowState(TypedDict, total=False):
     """State for the verification workflow"""
@@ -15,6 +29,7 @@ class WorkflowState(TypedDict, total=False):
     # Entities & Claims
     entities: List[Dict[str, Any]]
     claims: List[Dict[str, Any]]
+    cascade: Optional[Dict[str, Any]]  # checkworthiness gate decision and work it skipped
     
     # Topics & Analysis
     topics: List[str]
@@ -29,6 +44,7 @@ class WorkflowState(TypedDict, total=False):
     source_reliability: float
     corroboration_score: float
     veracity_scores: Dict[str, float]  # claim_id -> score
+    claims_incomplete: List[str]  # claim IDs that timed out or failed in the fan-out
     risk_score: float
     
     # Advisory
@@ -40,13 +56,41 @@ class WorkflowState(TypedDict, total=False):
     needs_human_review: bool
     human_review_status: Optional[str]  # pending, approved, rejected
     human_feedback: Optional[str]
+    completed_nodes: Annotated[List[str], operator.add]  # checkpoint for resume
+    result_cache_hit: Optional[str]  # fingerprint whose cached results were reused
+    node_timings: Annotated[Dict[str, float], merge_dicts]  # node -> seconds of its last run
     
-    # Error handling
-    errors: List[str]
+    # Error handling (appended to by parallel branches)
+    errors: Annotated[List[str], operator.add]
     retry_count: int
     
     # Metadata
     workflow_id: str
     started_at: datetime
-    updated_at: datetime
-    status: str  # running, paused, completed, failed
+    updated_at: Annotated[datetime, latest]
+    status: str  # queued, running, paused, completed, failed
+
+
+def new_workflow_state(workflow_id: str, raw_item: Dict[str, Any]) -> WorkflowState:
+    """Initial state for a workflow over one raw item"""
+    now = datetime.utcnow()
+    return {
+        'workflow_id': workflow_id,
+        'raw_item_id': raw_item.get('id'),
+        'raw_item': raw_item,
+        'normalized_item': None,
+        'entities': [],
+        'claims': [],
+        'topics': [],
+        'evidence': [],
+        'veracity_scores': {},
+        'risk_score': 0.0,
+        'needs_human_review': False,
+        'completed_nodes': [],
+        'node_timings': {},
+        'errors': [],
+        'retry_count': 0,
+        'started_at': now,
+        'updated_at': now,
+        'status': 'running'
+    }
@@ -1,74 +1,430 @@
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
 import json
-from services.redis_service import redis_service
+import time
+import zlib
 from workflows.state import WorkflowState
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Field encodings: one marker byte, then the payload
+JSON_FIELD = b'j'  # JSON text
+ZLIB_JSON_FIELD = b'z'  # zlib-compressed JSON
+ZLIB_MSGPACK_FIELD = b'm'  # zlib-compressed MessagePack
+
+try:
+    import msgpack
+except ImportError:  # optional; large fields fall back to compressed JSON
+    msgpack = None
+
+DATETIME_FIELDS = ('started_at', 'updated_at')
+
+# Secondary indexes, all sorted sets of workflow IDs
+WORKFLOW_STATUSES = ('queued', 'running', 'retrying', 'paused', 'completed', 'failed', 'cancelled')
+PENDING_REVIEW = 'pending_review'  # pseudo-status listing the review queue
+ALL_INDEX = 'workflow:index:all'  # scored by updated_at
+REVIEW_INDEX = 'workflow:index:review'  # scored by risk_score
+REVIEW_FIELDS = {'status', 'needs_human_review', 'human_review_status', 'risk_score'}
+
+def status_index(status: str) -> str:
+    """Sorted set of workflows in a status, scored by updated_at"""
+    return f"workflow:index:status:{status}"
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return time.time()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def encode_field(value: Any, compress_threshold: int = 1024) -> bytes:
+    """
+    Encode one top-level state value
+
+    Small values stay JSON. Values whose JSON exceeds compress_threshold
+    bytes (raw item, claims, evidence, translations) are packed with
+    MessagePack when available and compressed.
+    """
+    text = json.dumps(value, default=str, separators=(',', ':')).encode('utf-8')
+    if len(text) <= compress_threshold:
+        return JSON_FIELD + text
+
+    if msgpack is not None:
+        packed = msgpack.packb(value, default=str, use_bin_type=True)
+        return ZLIB_MSGPACK_FIELD + zlib.compress(packed, 6)
+    return ZLIB_JSON_FIELD + zlib.compress(text, 6)
+
+def decode_field(data: bytes) -> Any:
+    """Decode a value written by encode_field"""
+    marker, payload = data[:1], data[1:]
+    if marker == JSON_FIELD:
+        return json.loads(payload)
+    if marker == ZLIB_JSON_FIELD:
+        return json.loads(zlib.decompress(payload))
+    if marker == ZLIB_MSGPACK_FIELD:
+        if msgpack is None:
+            raise ValueError("msgpack is required to read this workflow state")
+        return msgpack.unpackb(zlib.decompress(payload), raw=False, strict_map_key=False)
+    raise ValueError(f"Unknown state field encoding: {marker!r}")
 
 class StateManager:
-    """Manage workflow state persistence in Redis"""
-    
+    """
+    Manage workflow state persistence in Redis
+
+    State is stored as a Redis hash with one field per top-level key, and
+    each save writes only the fields that changed since this process last
+    saved or loaded the workflow. A workflow this process has not seen yet
+    is written in full.
+
+    The same save maintains sorted-set indexes: one per status and one of
+    all workflows, scored by updated_at, and a review queue of paused
+    workflows awaiting review, scored by risk. Listing and counting read
+    only these indexes, never the states themselves, and skip workflows
+    whose state has expired.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        ttl_seconds: int = 86400 * 7,
+        compress_threshold: int = 1024,
+        max_tracked: int = 10_000,
+        prune_interval: float = 60.0
+    ):
+        """
+        Initialize manager
+
+        Args:
+            redis_client: Async Redis client returning bytes
+                (defaults to redis_service's binary client)
+            ttl_seconds: Expiry of saved state
+            compress_threshold: Encoded JSON size above which a field is
+                stored compressed
+            max_tracked: Workflows whose written fields are remembered
+            prune_interval: Minimum seconds between index prunes on reads
+        """
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.compress_threshold = compress_threshold
+        self.max_tracked = max_tracked
+        # workflow_id -> field -> digest of the encoded value in Redis
+        self._written: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self.bytes_written = 0
+        self.prune_interval = prune_interval
+        self._pruned_at = float('-inf')
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            from services.redis_service import redis_service
+            await redis_service.connect_binary()
+            self._redis = redis_service.binary_redis
+        return self._redis
+
     @staticmethod
-    async def save_state(workflow_id: str, state: WorkflowState):
-        """Save workflow state to Redis"""
-        # Convert datetime objects to strings
-        state_copy = state.copy()
-        if 'started_at' in state_copy and isinstance(state_copy['started_at'], datetime):
-            state_copy['started_at'] = state_copy['started_at'].isoformat()
-        if 'updated_at' in state_copy and isinstance(state_copy['updated_at'], datetime):
-            state_copy['updated_at'] = state_copy['updated_at'].isoformat()
-        
-        await redis_service.set(
-            f"workflow:state:{workflow_id}",
-            state_copy,
-            ttl=86400 * 7  # 7 days
-        )
-    
+    def _key(workflow_id: str) -> str:
+        return f"workflow:state:{workflow_id}"
+
     @staticmethod
-    async def load_state(workflow_id: str) -> WorkflowState:
+    def _digest(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=8).digest()
+
+    def _remember(self, workflow_id: str, digests: Dict[str, bytes]):
+        self._written[workflow_id] = digests
+        self._written.move_to_end(workflow_id)
+        while len(self._written) > self.max_tracked:
+            self._written.popitem(last=False)
+
+    async def save_state(self, workflow_id: str, state: WorkflowState):
+        """Save the fields of a workflow state that changed"""
+        encoded = {}
+        for field, value in state.items():
+            if field in DATETIME_FIELDS and isinstance(value, datetime):
+                value = value.isoformat()
+            encoded[field] = encode_field(value, self.compress_threshold)
+        digests = {field: self._digest(data) for field, data in encoded.items()}
+
+        previous = self._written.get(workflow_id, {})
+        changed = {
+            field: data for field, data in encoded.items()
+            if previous.get(field) != digests[field]
+        }
+        removed = [field for field in previous if field not in encoded]
+
+        redis = await self._get_redis()
+        key = self._key(workflow_id)
+        pipe = redis.pipeline()
+        if workflow_id not in self._written:
+            # Full write: replace stale fields or a pre-hash JSON blob
+            pipe.delete(key)
+        if changed:
+            pipe.hset(key, mapping=changed)
+        if removed:
+            pipe.hdel(key, *removed)
+        pipe.expire(key, self.ttl_seconds)
+        self._update_indexes(pipe, workflow_id, state, set(changed) | set(removed))
+        await pipe.execute()
+
+        self.bytes_written += sum(len(f) + len(d) for f, d in changed.items())
+        self._remember(workflow_id, digests)
+
+    async def load_state(self, workflow_id: str) -> WorkflowState:
         """Load workflow state from Redis"""
-        state = await redis_service.get(f"workflow:state:{workflow_id}")
-        
-        if not state:
+        redis = await self._get_redis()
+        legacy = False
+        try:
+            fields = await redis.hgetall(self._key(workflow_id))
+        except Exception as e:
+            if 'WRONGTYPE' not in str(e):
+                raise
+            # Saved as a single JSON blob before states became hashes;
+            # the next save rewrites it as a hash
+            legacy = True
+            fields = {
+                field: encode_field(value, self.compress_threshold)
+                for field, value in json.loads(await redis.get(self._key(workflow_id))).items()
+            }
+
+        if not fields:
             raise ValueError(f"Workflow state not found: {workflow_id}")
-        
+
+        state = {}
+        digests = {}
+        for field, data in fields.items():
+            if isinstance(field, bytes):
+                field = field.decode('utf-8')
+            state[field] = decode_field(data)
+            digests[field] = self._digest(data)
+
         # Convert string dates back to datetime
-        if 'started_at' in state and isinstance(state['started_at'], str):
-            state['started_at'] = datetime.fromisoformat(state['started_at'])
-        if 'updated_at' in state and isinstance(state['updated_at'], str):
-            state['updated_at'] = datetime.fromisoformat(state['updated_at'])
-        
+        for field in DATETIME_FIELDS:
+            if isinstance(state.get(field), str):
+                state[field] = datetime.fromisoformat(state[field])
+
+        if legacy:
+            self._written.pop(workflow_id, None)
+        else:
+            self._remember(workflow_id, digests)
         return state
-    
-    @staticmethod
-    async def delete_state(workflow_id: str):
+
+    async def delete_state(self, workflow_id: str):
         """Delete workflow state"""
-        await redis_service.delete(f"workflow:state:{workflow_id}")
-    
+        redis = await self._get_redis()
+        pipe = redis.pipeline()
+        pipe.delete(self._key(workflow_id))
+        for index in self._indexes():
+            pipe.zrem(index, workflow_id)
+        await pipe.execute()
+        self._written.pop(workflow_id, None)
+
+    @staticmethod
+    def _indexes() -> List[str]:
+        return [ALL_INDEX, REVIEW_INDEX] + [status_index(s) for s in WORKFLOW_STATUSES]
+
+    @staticmethod
+    def _awaiting_review(state: WorkflowState) -> bool:
+        return (
+            state.get('status') == 'paused'
+            and bool(state.get('needs_human_review'))
+            and state.get('human_review_status') in (None, 'pending')
+        )
+
+    def _update_indexes(self, pipe: Any, workflow_id: str, state: WorkflowState, fields: set):
+        """Queue index updates for the fields a save changed"""
+        status = state.get('status')
+
+        if fields & {'status', 'updated_at'}:
+            score = _timestamp(state.get('updated_at'))
+            expired = time.time() - self.ttl_seconds
+            if 'status' in fields:
+                for other in WORKFLOW_STATUSES:
+                    if other != status:
+                        pipe.zrem(status_index(other), workflow_id)
+            indexes = [ALL_INDEX] + ([status_index(status)] if status else [])
+            for index in indexes:
+                pipe.zadd(index, {workflow_id: score})
+                # States expire ttl_seconds after their last save
+                pipe.zremrangebyscore(index, '-inf', expired)
+
+        if fields & REVIEW_FIELDS:
+            if self._awaiting_review(state):
+                pipe.zadd(REVIEW_INDEX, {workflow_id: float(state.get('risk_score') or 0.0)})
+            else:
+                pipe.zrem(REVIEW_INDEX, workflow_id)
+
+    async def load_fields(self, workflow_id: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        Load selected top-level fields of a workflow state
+
+        Returns:
+            Mapping of the requested fields that exist
+        """
+        fields = list(fields)
+        redis = await self._get_redis()
+        values = await redis.hmget(self._key(workflow_id), fields)
+
+        loaded = {}
+        for field, data in zip(fields, values):
+            if data is None:
+                continue
+            loaded[field] = decode_field(data)
+            if field in DATETIME_FIELDS and isinstance(loaded[field], str):
+                loaded[field] = datetime.fromisoformat(loaded[field])
+        return loaded
+
     @staticmethod
     async def create_checkpoint(workflow_id: str, checkpoint_name: str, state: WorkflowState):
         """Create a named checkpoint"""
+        from services.redis_service import redis_service
         await redis_service.set(
             f"workflow:checkpoint:{workflow_id}:{checkpoint_name}",
             state,
             ttl=86400 * 7
         )
-    
+
     @staticmethod
     async def restore_checkpoint(workflow_id: str, checkpoint_name: str) -> WorkflowState:
         """Restore from a checkpoint"""
+        from services.redis_service import redis_service
         state = await redis_service.get(f"workflow:checkpoint:{workflow_id}:{checkpoint_name}")
-        
+
         if not state:
             raise ValueError(f"Checkpoint not found: {checkpoint_name}")
-        
+
         return state
-    
+
+    @staticmethod
+    def _index_for(status: Optional[str]) -> str:
+        if status is None:
+            return ALL_INDEX
+        if status == PENDING_REVIEW:
+            return REVIEW_INDEX
+        if status not in WORKFLOW_STATUSES:
+            raise ValueError(f"Unknown workflow status: {status}")
+        return status_index(status)
+
+    def _live_scores(self, index: str) -> Tuple[Any, Any]:
+        """Score range of an index's unexpired members (newest first)"""
+        if index == REVIEW_INDEX:
+            # Scored by risk; expired entries are dropped by prune_expired
+            return '+inf', '-inf'
+        # States expire ttl_seconds after their last save
+        return '+inf', f"({time.time() - self.ttl_seconds}"
+
+    async def prune_expired(self) -> int:
+        """
+        Remove workflows whose state has expired from every index
+
+        Saves prune the indexes they touch, but without writes expired
+        workflows would stay listed; listing and counting call this at most
+        every prune_interval seconds.
+
+        Returns:
+            Number of expired workflows removed
+        """
+        redis = await self._get_redis()
+        expired = time.time() - self.ttl_seconds
+        self._pruned_at = time.monotonic()
+
+        members = await redis.zrangebyscore(ALL_INDEX, '-inf', expired)
+        pipe = redis.pipeline()
+        if members:
+            # The review queue is scored by risk, so remove its members by ID
+            pipe.zrem(REVIEW_INDEX, *members)
+        for index in [ALL_INDEX] + [status_index(s) for s in WORKFLOW_STATUSES]:
+            pipe.zremrangebyscore(index, '-inf', expired)
+        await pipe.execute()
+        return len(members)
+
+    async def _prune_if_due(self):
+        if time.monotonic() - self._pruned_at >= self.prune_interval:
+            await self.prune_expired()
+
     @staticmethod
-    async def list_workflows(status: str = None) -> list[str]:
-        """List all workflow IDs (simplified - in production use Redis SCAN)"""
-        # This is a simplified version
-        # In production, maintain a separate index
-        return []
+    def _parse_cursor(cursor: str) -> Tuple[float, str]:
+        score, sep, workflow_id = cursor.partition(':')
+        try:
+            if not sep:
+                raise ValueError
+            return float(score), workflow_id
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}") from None
+
+    async def list_workflows(
+        self,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        List workflow IDs from the indexes, one page at a time
+
+        Pages are keyed by the score and ID of the last workflow returned,
+        so workflows re-scored between pages are neither skipped nor
+        repeated; ties on score are broken by ID, in Redis' order.
+
+        Args:
+            status: Workflow status, PENDING_REVIEW for the review queue
+                (highest risk first), or None for all workflows
+            cursor: next_cursor of the previous page; None for the first page
+            limit: Page size
+
+        Returns:
+            Workflow IDs, most recently updated first, and the cursor of
+            the next page (None on the last page)
+        """
+        redis = await self._get_redis()
+        index = self._index_for(status)
+        limit = max(1, limit)
+        await self._prune_if_due()
+        high, low = self._live_scores(index)
+
+        pipe = redis.pipeline()
+        if cursor is not None:
+            score, last_id = self._parse_cursor(cursor)
+            # Members tied with the last one returned, then strictly lower scores
+            pipe.zrevrangebyscore(index, repr(score), repr(score), withscores=True)
+            high = f"({score!r}"
+        # One extra member tells whether another page exists
+        pipe.zrevrangebyscore(index, high, low, start=0, num=limit + 1, withscores=True)
+        results = await pipe.execute()
+
+        entries = [
+            (m.decode('utf-8') if isinstance(m, bytes) else m, float(s))
+            for result in results for m, s in result
+        ]
+        if cursor is not None:
+            # Equal scores are listed in reverse ID order
+            tied = len(results[0])
+            entries = [e for e in entries[:tied] if e[0] < last_id] + entries[tied:]
+
+        page = entries[:limit]
+        next_cursor = None
+        if len(entries) > limit:
+            last_id, score = page[-1]
+            next_cursor = f"{score!r}:{last_id}"
+        return [workflow_id for workflow_id, _ in page], next_cursor
+
+    async def count_workflows(self, status: Optional[str] = None) -> int:
+        """Count unexpired workflows in a status (see list_workflows)"""
+        redis = await self._get_redis()
+        index = self._index_for(status)
+        await self._prune_if_due()
+        high, low = self._live_scores(index)
+        return await redis.zcount(index, low, high)
+
+    async def count_by_status(self) -> Dict[str, int]:
+        """Count workflows per status and in the review queue, in one round trip"""
+        redis = await self._get_redis()
+        await self._prune_if_due()
+        names = list(WORKFLOW_STATUSES) + [PENDING_REVIEW]
+        pipe = redis.pipeline()
+        for name in names:
+            index = self._index_for(name)
+            high, low = self._live_scores(index)
+            pipe.zcount(index, low, high)
+        return dict(zip(names, await pipe.execute()))
 
 # Singleton
 state_manager = StateManager()
@@ -3,6 +3,15 @@ from typing import Dict, Any
 from datetime import datetime
 import uuid
 
+from config import settings
+from workflows.cascade import (
+    gate_claims,
+    record_cascade,
+    record_skipped_advisory,
+    should_draft_advisory,
+    split_claims,
+)
+from workflows.dag import NodeSpec, add_dag, partial_update
 from workflows.state import WorkflowState
 from workflows.state_manager import state_manager
 from services.observability import observability_service
@@ -11,6 +20,7 @@ from services.observability import observability_service
 from agents.ingestion.normalization import NormalizationService
 from agents.digestion.entity_extraction import EntityExtractionAgent
 from agents.digestion.claim_extraction import ClaimExtractionAgent
+from agents.digestion.checkworthiness import CheckworthinessAgent
 from agents.digestion.topic_assignment import TopicAssignmentAgent
 from agents.digestion.evidence_retrieval import EvidenceRetrievalAgent
 from agents.digestion.nli_veracity import NliVeracityAgent
@@ -22,6 +32,7 @@ from agents.publishing.translation import AdvisoryTranslationAgent
 normalization_service = NormalizationService()
 entity_agent = EntityExtractionAgent()
 claim_agent = ClaimExtractionAgent()
+checkworthiness_agent = CheckworthinessAgent()
 topic_agent = TopicAssignmentAgent()
 evidence_agent = EvidenceRetrievalAgent()
 nli_agent = NliVeracityAgent()
@@ -91,6 +102,36 @@ async def extract_claims_node(state: WorkflowState) -> WorkflowState:
     
     return state
 
+async def score_claims_node(state: WorkflowState) -> WorkflowState:
+    """Score claim checkworthiness and gate the expensive stages"""
+    observability_service.log_info("Scoring claims")
+    
+    try:
+        from schemas.claim import Claim
+        
+        claims = [Claim(**c) for c in state.get('claims', [])]
+        await checkworthiness_agent.process_claims(claims)
+        
+        state['claims'] = [c.dict() for c in claims]
+        state['cascade'] = gate_claims(
+            state['claims'],
+            [checkworthiness_agent.gate_score(c) for c in claims],
+            threshold=settings.WORKFLOW_CHECKWORTHINESS_THRESHOLD,
+            enabled=settings.WORKFLOW_CASCADE_ENABLED,
+            completed=state.get('completed_nodes') or []
+        )
+        if not state.get('result_cache_hit'):
+            # Reused evidence and verdicts were not skipped by this run
+            record_cascade(state['cascade'])
+        state['updated_at'] = datetime.utcnow()
+        
+    except Exception as e:
+        # Without a decision every claim is checked
+        observability_service.log_error(f"Claim scoring failed: {e}")
+        state['errors'].append(f"Scoring: {str(e)}")
+    
+    return state
+
 async def assign_topics_node(state: WorkflowState) -> WorkflowState:
     """Assign topics to item"""
     observability_service.log_info("Assigning topics")
@@ -118,8 +159,9 @@ async def retrieve_evidence_node(state: WorkflowState) -> WorkflowState:
         from schemas.claim import Claim
         
         all_evidence = []
+        checkworthy, _ = split_claims(state)
         
-        for claim_data in state.get('claims', []):
+        for claim_data in checkworthy:
             claim_obj = Claim(**claim_data)
             result = await evidence_agent.run(claim_obj)
             all_evidence.extend([e.dict() for e in result.evidence])
@@ -141,12 +183,17 @@ async def assess_veracity_node(state: WorkflowState) -> WorkflowState:
         from schemas.claim import Claim
         
         veracity_scores = {}
+        checkworthy, skipped = split_claims(state)
         
-        for claim_data in state.get('claims', []):
+        for claim_data in checkworthy:
             claim_obj = Claim(**claim_data)
             result = await nli_agent.run(claim_obj)
             veracity_scores[claim_obj.id] = result.veracity_likelihood
         
+        # Claims gated out by the cascade keep their default score
+        for claim_data in skipped:
+            veracity_scores[claim_data['id']] = Claim(**claim_data).veracity_likelihood
+        
         state['veracity_scores'] = veracity_scores
         state['updated_at'] = datetime.utcnow()
         
@@ -182,25 +229,21 @@ async def check_human_review_needed(state: WorkflowState) -> str:
     
     # High risk items need human review
     if risk_score > 0.7:
-        state['needs_human_review'] = True
-        state['human_review_status'] = 'pending'
         return 'human_review'
     else:
-        state['needs_human_review'] = False
         return 'draft_advisory'
 
 async def human_review_node(state: WorkflowState) -> WorkflowState:
     """Pause for human review"""
     observability_service.log_info("Waiting for human review")
     
+    state['needs_human_review'] = True
+    state['human_review_status'] = 'pending'
     state['status'] = 'paused'
     state['updated_at'] = datetime.utcnow()
     
-    # Save state and wait for external input
-    await state_manager.save_state(state['workflow_id'], state)
-    
-    # In a real system, this would send a notification
-    # and the workflow would resume when a reviewer approves/rejects
+    # The graph ends here; WorkflowExecutor.resume_workflow re-enters it
+    # at the first node after review once a reviewer decides
     
     return state
 
@@ -208,6 +251,12 @@ async def draft_advisory_node(state: WorkflowState) -> WorkflowState:
     """Draft advisory"""
     observability_service.log_info("Drafting advisory")
     
+    if not should_draft_advisory(state):
+        observability_service.log_info("No checkworthy claims, skipping advisory drafting")
+        state['cascade'] = record_skipped_advisory(state['cascade'])
+        state['updated_at'] = datetime.utcnow()
+        return state
+    
     try:
         from schemas.item import NormalizedItem
         
@@ -254,39 +303,90 @@ async def complete_workflow_node(state: WorkflowState) -> WorkflowState:
     
     return state
 
+# Node read/write sets. The analysis stage is wired from these, so a new
+# node only needs a spec to run concurrently with the nodes it does not
+# depend on. The last analysis node joins every branch.
+ANALYSIS_NODES = [
+    NodeSpec("normalize", normalize_node,
+             reads={'raw_item', 'raw_item_id'},
+             writes={'normalized_item', 'language_detected'}),
+    NodeSpec("extract_entities", extract_entities_node,
+             reads={'normalized_item'}, writes={'entities'}),
+    NodeSpec("extract_claims", extract_claims_node,
+             reads={'normalized_item'}, writes={'claims'}),
+    NodeSpec("score_claims", score_claims_node,
+             reads={'claims'}, writes={'claims', 'cascade'}),
+    NodeSpec("assign_topics", assign_topics_node,
+             reads={'normalized_item'}, writes={'topics'}),
+    NodeSpec("retrieve_evidence", retrieve_evidence_node,
+             reads={'claims', 'cascade'}, writes={'evidence'}),
+    NodeSpec("assess_veracity", assess_veracity_node,
+             reads={'claims', 'cascade'}, writes={'veracity_scores'}),
+    NodeSpec("calculate_risk", calculate_risk_node,
+             reads={'normalized_item'}, writes={'risk_score'}),
+]
+
+PUBLISHING_NODES = [
+    NodeSpec("human_review", human_review_node,
+             reads={'risk_score'},
+             writes={'status', 'needs_human_review', 'human_review_status'}),
+    NodeSpec("draft_advisory", draft_advisory_node,
+             reads={'normalized_item', 'cascade', 'human_review_status'},
+             writes={'advisory_draft', 'cascade'}),
+    NodeSpec("translate_advisory", translate_advisory_node,
+             reads={'advisory_draft'}, writes={'advisory_translations'}),
+    NodeSpec("complete", complete_workflow_node,
+             reads={'workflow_id'}, writes={'status'}),
+]
+
+# Nodes a reviewed workflow runs after human review, in order
+AFTER_REVIEW_NODES = ["draft_advisory", "translate_advisory", "complete"]
+
+def route_entry(state: WorkflowState) -> str:
+    """
+    Pick where a run enters the graph.
+    
+    New workflows start at normalization. A workflow resumed after human
+    review re-enters at the first node after review that has not completed,
+    so nothing before the review runs again. Rejected items skip the
+    advisory and complete directly.
+    """
+    completed = set(state.get('completed_nodes') or [])
+    if 'human_review' not in completed:
+        return ANALYSIS_NODES[0].name
+    
+    if state.get('human_review_status') == 'rejected':
+        return 'complete'
+    
+    for name in AFTER_REVIEW_NODES:
+        if name not in completed:
+            return name
+    return 'complete'
+
 # Build the graph
 def create_verification_workflow() -> StateGraph:
     """Create the verification workflow graph"""
     
     workflow = StateGraph(WorkflowState)
     
-    # Add nodes
-    workflow.add_node("normalize", normalize_node)
-    workflow.add_node("extract_entities", extract_entities_node)
-    workflow.add_node("extract_claims", extract_claims_node)
-    workflow.add_node("assign_topics", assign_topics_node)
-    workflow.add_node("retrieve_evidence", retrieve_evidence_node)
-    workflow.add_node("assess_veracity", assess_veracity_node)
-    workflow.add_node("calculate_risk", calculate_risk_node)
-    workflow.add_node("human_review", human_review_node)
-    workflow.add_node("draft_advisory", draft_advisory_node)
-    workflow.add_node("translate_advisory", translate_advisory_node)
-    workflow.add_node("complete", complete_workflow_node)
-    
-    # Set entry point
-    workflow.set_entry_point("normalize")
-    
-    # Add edges (sequential flow)
-    workflow.add_edge("normalize", "extract_entities")
-    workflow.add_edge("extract_entities", "extract_claims")
-    workflow.add_edge("extract_claims", "assign_topics")
-    workflow.add_edge("assign_topics", "retrieve_evidence")
-    workflow.add_edge("retrieve_evidence", "assess_veracity")
-    workflow.add_edge("assess_veracity", "calculate_risk")
+    # Analysis stage: normalize, then fan out to independent nodes and
+    # fan back in at risk calculation
+    entry, analysis_exit = add_dag(workflow, ANALYSIS_NODES)
+    
+    # Publishing nodes return partial updates too, so the merged keys
+    # are not appended twice
+    for spec in PUBLISHING_NODES:
+        workflow.add_node(spec.name, partial_update(spec))
+    
+    # Resumed workflows skip the nodes they already completed
+    workflow.set_conditional_entry_point(
+        route_entry,
+        {name: name for name in [entry, *AFTER_REVIEW_NODES]}
+    )
     
     # Conditional routing after risk calculation
     workflow.add_conditional_edges(
-        "calculate_risk",
+        analysis_exit,
         check_human_review_needed,
         {
             "human_review": "human_review",
@@ -294,8 +394,8 @@ def create_verification_workflow() -> StateGraph:
         }
     )
     
-    # Human review can lead to advisory or end
-    workflow.add_edge("human_review", "draft_advisory")
+    # Human review pauses the workflow until a reviewer resumes it
+    workflow.add_edge("human_review", END)
     
     # Continue to translation and completion
     workflow.add_edge("draft_advisory", "translate_advisory")